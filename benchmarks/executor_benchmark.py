@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Executor overhead benchmark: LangGraph runtime vs. the native pipeline.
+
+Usage:
+    python -m benchmarks.executor_benchmark [--tickets N] [--variant sequential|parallel] [--kb-size N]
+
+Runs the same tickets through support_agent_graph-style LangGraph graphs and
+through NativePipeline against a zero-latency stubbed LLM, so almost all of
+the time left is pipeline work. For each backend it reports:
+
+  * per-ticket latency and framework overhead (latency minus the time spent
+    inside node functions, measured at concurrency 1)
+  * tickets/s at --concurrency
+  * tracemalloc peak and retained memory per ticket
+"""
+
+import argparse
+import asyncio
+import logging
+import sys
+import threading
+import time
+import tracemalloc
+from collections import defaultdict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, List
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from benchmarks.run_benchmarks import summarize, working_directory
+from benchmarks.stub_llm import stub_llm
+from benchmarks.synthetic_kb import create_workspace, remove_workspace, sample_tickets
+
+class NodeTimer:
+    """Stand-in for the ticket profiler that only sums node time per ticket."""
+
+    def __init__(self):
+        self.seconds = defaultdict(float)
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def node(self, ticket_id: str, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self.seconds[ticket_id] += elapsed
+
+@contextmanager
+def timed_nodes():
+    """Route profiled_node wrappers (used by both backends) to a NodeTimer."""
+    import utils.profiling as profiling
+
+    timer = NodeTimer()
+    original = profiling.get_profiler
+    profiling.get_profiler = lambda: timer
+    try:
+        yield timer
+    finally:
+        profiling.get_profiler = original
+
+def build_backends(variant: str) -> Dict[str, Any]:
+    """Both executors for one graph variant."""
+    from langgraph_graph.graph import GRAPH_VARIANTS
+    from langgraph_graph.native_executor import NativePipeline
+
+    return {"langgraph": GRAPH_VARIANTS[variant](), "native": NativePipeline(variant)}
+
+def _states(tickets: List[Dict[str, str]], prefix: str) -> List[Dict[str, Any]]:
+    from langgraph_graph.graph import create_initial_state
+
+    return [create_initial_state(ticket["subject"], ticket["description"], f"{prefix}-{i:05d}")
+            for i, ticket in enumerate(tickets)]
+
+async def measure_latency(backend: Any, tickets: List[Dict[str, str]], prefix: str) -> Dict[str, float]:
+    """Latency and framework overhead per ticket, one ticket at a time."""
+    latencies = []
+    overheads = []
+    with timed_nodes() as timer:
+        for state in _states(tickets, prefix):
+            start = time.perf_counter()
+            await backend.ainvoke(state)
+            elapsed = time.perf_counter() - start
+            latencies.append(elapsed)
+            overheads.append(max(0.0, elapsed - timer.seconds[state["ticket_id"]]))
+
+    summary = summarize(latencies)
+    overhead = summarize(overheads)
+    summary["overhead_mean_ms"] = overhead["mean_ms"]
+    summary["overhead_p50_ms"] = overhead["p50_ms"]
+    del summary["ops_per_sec"]
+    return summary
+
+async def measure_throughput(backend: Any, tickets: List[Dict[str, str]], prefix: str, concurrency: int) -> float:
+    """Tickets per second with concurrency tickets in flight."""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run_one(state):
+        async with semaphore:
+            await backend.ainvoke(state)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(run_one(state) for state in _states(tickets, prefix)))
+    return len(tickets) / (time.perf_counter() - start)
+
+async def measure_memory(backend: Any, tickets: List[Dict[str, str]], prefix: str) -> Dict[str, float]:
+    """tracemalloc peak (above the pre-ticket level) and retained bytes per ticket, in KiB."""
+    peaks = []
+    retained = []
+    tracemalloc.start()
+    try:
+        for state in _states(tickets, prefix):
+            before = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            await backend.ainvoke(state)
+            current, peak = tracemalloc.get_traced_memory()
+            peaks.append(peak - before)
+            retained.append(current - before)
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "peak_kib_per_ticket": sum(peaks) / len(peaks) / 1024,
+        "retained_kib_per_ticket": sum(retained) / len(retained) / 1024,
+    }
+
+async def run_comparison(variant: str, num_tickets: int, concurrency: int) -> Dict[str, Dict[str, float]]:
+    """Measure both backends on the same tickets."""
+    tickets = sample_tickets(num_tickets)
+    results = {}
+    for name, backend in build_backends(variant).items():
+        # Warm caches, snapshots and lazily built clients outside the measurement
+        await measure_latency(backend, tickets[:4], f"WARM-{name}")
+        result = await measure_latency(backend, tickets, f"LAT-{name}")
+        result["throughput_tps"] = await measure_throughput(backend, tickets, f"TPS-{name}", concurrency)
+        result.update(await measure_memory(backend, tickets[:max(4, num_tickets // 4)], f"MEM-{name}"))
+        results[name] = result
+    return results
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Compare LangGraph and native executor overhead")
+    parser.add_argument("--tickets", type=int, default=200, help="Tickets per measurement")
+    parser.add_argument("--variant", choices=["sequential", "parallel"], default="sequential")
+    parser.add_argument("--kb-size", type=int, default=100, help="Synthetic KB size (documents)")
+    parser.add_argument("--concurrency", type=int, default=16, help="Tickets in flight for the throughput run")
+    parser.add_argument("--verbose", action="store_true", help="Keep INFO logging enabled")
+    args = parser.parse_args(argv)
+
+    if not args.verbose:
+        logging.disable(logging.INFO)
+
+    workspace = create_workspace(args.kb_size)
+    try:
+        with working_directory(workspace), stub_llm(latency=0.0):
+            results = asyncio.run(run_comparison(args.variant, args.tickets, args.concurrency))
+    finally:
+        remove_workspace(workspace)
+
+    print(f"{args.variant} pipeline, {args.tickets} tickets, KB of {args.kb_size} documents, stubbed LLM")
+    for name, result in results.items():
+        print(f"  {name:<10} p50={result['p50_ms']:.2f}ms overhead={result['overhead_mean_ms']:.2f}ms "
+              f"throughput={result['throughput_tps']:.1f}/s (c{args.concurrency}) "
+              f"peak={result['peak_kib_per_ticket']:.1f}KiB retained={result['retained_kib_per_ticket']:.1f}KiB")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
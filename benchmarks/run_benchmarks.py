@@ -0,0 +1,357 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for the support ticket agent.
+
+Usage:
+    python -m benchmarks.run_benchmarks run [--quick] [--save-baseline]
+    python -m benchmarks.run_benchmarks compare [--baseline PATH] [--current PATH]
+
+`run` executes per-node microbenchmarks and full-graph throughput/latency
+runs against a stubbed LLM for each synthetic KB size and writes the results
+as JSON. `compare` checks a results file against the stored baseline and
+exits non-zero when any metric regressed beyond the threshold.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from benchmarks.stub_llm import stub_llm
+from benchmarks.synthetic_kb import create_workspace, remove_workspace, sample_tickets
+from utils.metrics import percentile
+
+DEFAULT_RESULTS = PROJECT_ROOT / "benchmarks" / "results" / "latest.json"
+DEFAULT_BASELINE = PROJECT_ROOT / "benchmarks" / "baseline.json"
+
+DEFAULT_KB_SIZES = [10, 1000, 100000]
+QUICK_KB_SIZES = [10, 1000]
+DEFAULT_CONCURRENCY = [1, 4, 16]
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    """Summarize timing samples given in seconds."""
+    total = sum(samples)
+    return {
+        "iterations": len(samples),
+        "mean_ms": total / len(samples) * 1000,
+        "p50_ms": percentile(samples, 50) * 1000,
+        "p95_ms": percentile(samples, 95) * 1000,
+        "p99_ms": percentile(samples, 99) * 1000,
+        "ops_per_sec": len(samples) / total if total > 0 else 0.0,
+    }
+
+def time_calls(fn: Callable[[], Any], iterations: int, warmup: int = 2) -> List[float]:
+    """Run fn repeatedly and return per-call durations in seconds."""
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+@contextmanager
+def working_directory(path: Path):
+    """Temporarily switch the working directory."""
+    previous = os.getcwd()
+    os.chdir(path)
+    try:
+        yield
+    finally:
+        os.chdir(previous)
+
+def _ticket_state(ticket: Dict[str, str], category: str = "General") -> Dict[str, Any]:
+    return {
+        "ticket_id": "BENCH-0001",
+        "subject": ticket["subject"],
+        "description": ticket["description"],
+        "category": category,
+        "context": "",
+        "context_docs": [],
+        "draft_response": "Thank you for contacting support.",
+        "review_approved": False,
+        "reviewer_feedback": "Please cite the refund policy.",
+        "attempt_count": 1,
+        "failed_attempts": [],
+    }
+
+def run_node_microbenchmarks(iterations: int) -> Dict[str, Dict[str, float]]:
+    """Benchmark the KB-independent nodes and helpers."""
+    from nodes.input_handler import process_input
+    from nodes.retry_logic import update_retry_state
+    from utils.helpers import load_config, save_to_escalation_log
+    from utils.llm import build_messages
+
+    ticket = sample_tickets(1)[0]
+    results = {}
+
+    results["micro.process_input"] = summarize(time_calls(
+        lambda: process_input({"subject": f"  {ticket['subject']}  ", "description": ticket["description"]}),
+        iterations
+    ))
+
+    results["micro.update_retry_state"] = summarize(time_calls(
+        lambda: update_retry_state(_ticket_state(ticket)),
+        iterations
+    ))
+
+    fields = {
+        "subject": ticket["subject"],
+        "description": ticket["description"],
+        "category": "Billing",
+        "context": "Refunds are processed within 5-7 business days.",
+        "draft_response": "Thank you for contacting support.",
+        "attempts": 2,
+        "failed_attempts": "Attempt 1: Too vague",
+        "reviewer_feedback": "Too vague",
+    }
+
+    config = load_config()
+
+    def format_prompts():
+        for name in ["classifier", "generator", "reviewer", "escalation"]:
+            build_messages(name, config, **fields)
+
+    results["micro.prompt_formatting"] = summarize(time_calls(format_prompts, iterations))
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        log_file = os.path.join(tmp_dir, "escalation_log.csv")
+        escalation_data = {**_ticket_state(ticket), "failed_attempts": 2, "escalation_message": "Needs review"}
+        results["micro.save_to_escalation_log"] = summarize(time_calls(
+            lambda: save_to_escalation_log(escalation_data, log_file),
+            iterations
+        ))
+
+    return results
+
+def run_retrieval_microbenchmark(kb_size: int, iterations: int) -> Dict[str, Dict[str, float]]:
+    """Benchmark retrieve_context against the current workspace KB."""
+    from nodes.retriever import retrieve_context
+
+    tickets = sample_tickets(4)
+    categories = ["Billing", "Technical", "Security", "General"]
+    states = [_ticket_state(ticket, category) for ticket, category in zip(tickets, categories)]
+    counter = {"i": 0}
+
+    def retrieve():
+        state = states[counter["i"] % len(states)]
+        counter["i"] += 1
+        retrieve_context(state)
+
+    # Large KBs are slow per call; keep total runtime bounded
+    scaled_iterations = max(3, iterations // max(1, kb_size // 1000))
+    return {f"micro.retrieve_context.kb_{kb_size}": summarize(time_calls(retrieve, scaled_iterations, warmup=1))}
+
+def run_batch_retrieval_microbenchmark(kb_size: int, batch_size: int = 1000) -> Dict[str, Dict[str, float]]:
+    """Benchmark retrieve_context_batch on batch_size tickets against the current workspace KB."""
+    from nodes.retriever import retrieve_context_batch
+
+    categories = ["Billing", "Technical", "Security", "General"]
+    states = [_ticket_state(ticket, categories[i % len(categories)]) for i, ticket in enumerate(sample_tickets(batch_size))]
+
+    samples = time_calls(lambda: retrieve_context_batch(states), iterations=3, warmup=1)
+    return {f"micro.retrieve_context_batch_{batch_size}.kb_{kb_size}": summarize(samples)}
+
+async def _run_graph_load(tickets: List[Dict[str, str]], concurrency: int) -> Dict[str, float]:
+    from main import process_ticket
+
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def run_one(ticket):
+        async with semaphore:
+            start = time.perf_counter()
+            await process_ticket(ticket["subject"], ticket["description"])
+            latencies.append(time.perf_counter() - start)
+
+    wall_start = time.perf_counter()
+    await asyncio.gather(*(run_one(ticket) for ticket in tickets))
+    wall = time.perf_counter() - wall_start
+
+    summary = summarize(latencies)
+    summary["throughput_tps"] = len(tickets) / wall if wall > 0 else 0.0
+    summary["concurrency"] = concurrency
+    del summary["ops_per_sec"]
+    return summary
+
+def run_graph_benchmarks(kb_size: int, concurrency_levels: List[int], num_tickets: int) -> Dict[str, Dict[str, float]]:
+    """Benchmark full-graph throughput and latency for one KB size."""
+    tickets = sample_tickets(num_tickets)
+    results = {}
+    for concurrency in concurrency_levels:
+        results[f"graph.kb_{kb_size}.c{concurrency}"] = asyncio.run(_run_graph_load(tickets, concurrency))
+    return results
+
+def run_suite(args: argparse.Namespace) -> Dict[str, Any]:
+    """Run every benchmark and return the results document."""
+    kb_sizes = args.kb_sizes or (QUICK_KB_SIZES if args.quick else DEFAULT_KB_SIZES)
+    benchmarks = {}
+
+    with stub_llm(latency=args.llm_latency, reject_rate=args.reject_rate):
+        for index, kb_size in enumerate(kb_sizes):
+            print(f"Preparing synthetic KB with {kb_size} documents...")
+            workspace = create_workspace(kb_size)
+            try:
+                with working_directory(workspace):
+                    if index == 0:
+                        benchmarks.update(run_node_microbenchmarks(args.iterations))
+                    benchmarks.update(run_retrieval_microbenchmark(kb_size, args.iterations))
+                    benchmarks.update(run_batch_retrieval_microbenchmark(kb_size))
+                    tickets = args.tickets if kb_size < 100000 else max(4, args.tickets // 4)
+                    benchmarks.update(run_graph_benchmarks(kb_size, args.concurrency, tickets))
+            finally:
+                remove_workspace(workspace)
+
+    return {
+        "meta": {
+            "timestamp": datetime.now().isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "llm_latency": args.llm_latency,
+            "reject_rate": args.reject_rate,
+            "kb_sizes": kb_sizes,
+            "concurrency": args.concurrency,
+        },
+        "benchmarks": benchmarks,
+    }
+
+def _higher_is_better(metric: str) -> bool:
+    return metric in ("throughput_tps", "ops_per_sec")
+
+def compare_results(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float,
+                    min_delta_ms: float = 0.05) -> List[Dict[str, Any]]:
+    """
+    Compare two results documents.
+
+    Args:
+        baseline: Stored baseline results
+        current: Freshly produced results
+        threshold: Relative change treated as a regression (0.2 = 20%)
+        min_delta_ms: Absolute change in milliseconds below which timings are noise
+
+    Returns:
+        List of regressions, one entry per regressed metric
+    """
+
+    regressions = []
+    base_benchmarks = baseline.get("benchmarks", {})
+
+    for name, metrics in current.get("benchmarks", {}).items():
+        base_metrics = base_benchmarks.get(name)
+        if not base_metrics:
+            continue
+
+        for metric, value in metrics.items():
+            if not (metric.endswith("_ms") or _higher_is_better(metric)):
+                continue
+            base_value = base_metrics.get(metric)
+            if not base_value:
+                continue
+
+            if _higher_is_better(metric):
+                change = (base_value - value) / base_value
+            else:
+                if value - base_value < min_delta_ms:
+                    continue
+                change = (value - base_value) / base_value
+
+            if change > threshold:
+                regressions.append({
+                    "benchmark": name,
+                    "metric": metric,
+                    "baseline": base_value,
+                    "current": value,
+                    "change_pct": change * 100,
+                })
+
+    return regressions
+
+def _write_json(path: Path, data: Dict[str, Any]):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(data, file, indent=2)
+
+def _load_json(path: Path) -> Dict[str, Any]:
+    with open(path, "r", encoding="utf-8") as file:
+        return json.load(file)
+
+def cmd_run(args: argparse.Namespace) -> int:
+    if not args.verbose:
+        logging.disable(logging.INFO)
+
+    results = run_suite(args)
+    _write_json(Path(args.output), results)
+    print(f"Results written to {args.output}")
+
+    for name, metrics in results["benchmarks"].items():
+        extra = f" throughput={metrics['throughput_tps']:.1f}/s" if "throughput_tps" in metrics else ""
+        print(f"  {name:<45} p50={metrics['p50_ms']:.3f}ms p95={metrics['p95_ms']:.3f}ms{extra}")
+
+    if args.save_baseline:
+        _write_json(Path(args.baseline), results)
+        print(f"Baseline saved to {args.baseline}")
+
+    return 0
+
+def cmd_compare(args: argparse.Namespace) -> int:
+    if not Path(args.baseline).exists():
+        print(f"No baseline found at {args.baseline}; run with --save-baseline first")
+        return 2
+
+    regressions = compare_results(_load_json(Path(args.baseline)), _load_json(Path(args.current)), args.threshold)
+
+    if not regressions:
+        print(f"No regressions beyond {args.threshold:.0%}")
+        return 0
+
+    print(f"{len(regressions)} regression(s) beyond {args.threshold:.0%}:")
+    for regression in regressions:
+        print(f"  {regression['benchmark']} {regression['metric']}: "
+              f"{regression['baseline']:.3f} -> {regression['current']:.3f} ({regression['change_pct']:+.1f}%)")
+    return 1
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Support agent benchmark suite")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="Run the benchmark suite")
+    run_parser.add_argument("--kb-sizes", type=int, nargs="+", help="Synthetic KB sizes (documents)")
+    run_parser.add_argument("--quick", action="store_true", help="Skip the 100k document KB")
+    run_parser.add_argument("--concurrency", type=int, nargs="+", default=DEFAULT_CONCURRENCY)
+    run_parser.add_argument("--tickets", type=int, default=32, help="Tickets per graph run")
+    run_parser.add_argument("--iterations", type=int, default=200, help="Iterations per microbenchmark")
+    run_parser.add_argument("--llm-latency", type=float, default=0.02, help="Stubbed seconds per LLM call")
+    run_parser.add_argument("--reject-rate", type=float, default=0.0, help="Fraction of stubbed reviews that reject")
+    run_parser.add_argument("--output", default=str(DEFAULT_RESULTS))
+    run_parser.add_argument("--baseline", default=str(DEFAULT_BASELINE))
+    run_parser.add_argument("--save-baseline", action="store_true", help="Also store results as the baseline")
+    run_parser.add_argument("--verbose", action="store_true", help="Keep INFO logging enabled")
+    run_parser.set_defaults(func=cmd_run)
+
+    compare_parser = subparsers.add_parser("compare", help="Compare results against the baseline")
+    compare_parser.add_argument("--baseline", default=str(DEFAULT_BASELINE))
+    compare_parser.add_argument("--current", default=str(DEFAULT_RESULTS))
+    compare_parser.add_argument("--threshold", type=float, default=0.2, help="Relative regression threshold")
+    compare_parser.set_defaults(func=cmd_compare)
+
+    return parser
+
+def main(argv: List[str] = None) -> int:
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,81 @@
+"""
+Synthetic benchmark workspaces.
+
+The nodes resolve config, prompts and knowledge base paths relative to the
+working directory, so each benchmark KB size gets its own workspace with a
+copy of config/ and prompts/ plus a generated data/knowledge_base tree.
+"""
+
+import random
+import shutil
+import tempfile
+from pathlib import Path
+from typing import List
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+CATEGORIES = ["Billing", "Technical", "Security", "General"]
+
+VOCABULARY = {
+    "Billing": ["refund", "invoice", "charge", "subscription", "payment", "plan", "credit", "billing", "prorated", "dispute"],
+    "Technical": ["api", "endpoint", "timeout", "integration", "error", "latency", "webhook", "token", "request", "server"],
+    "Security": ["password", "login", "suspicious", "authentication", "compromised", "session", "device", "lockout", "breach", "alert"],
+    "General": ["account", "feature", "settings", "support", "profile", "notification", "export", "language", "team", "question"],
+}
+
+FILLER = ["the", "customer", "should", "verify", "their", "contact", "within", "hours", "policy", "steps", "please", "review"]
+
+def _synthetic_document(rng: random.Random, category: str, index: int) -> str:
+    words = VOCABULARY[category] + FILLER
+    sentences = []
+    for _ in range(rng.randint(5, 9)):
+        sentence = " ".join(rng.choice(words) for _ in range(rng.randint(8, 16)))
+        sentences.append(sentence.capitalize() + ".")
+    return f"{category} article {index}\n" + " ".join(sentences)
+
+def create_workspace(num_documents: int, seed: int = 7, base_dir: str = None) -> Path:
+    """
+    Create a benchmark workspace with a synthetic knowledge base.
+
+    Args:
+        num_documents: Total documents, split evenly across categories
+        seed: Seed for document generation
+        base_dir: Optional parent directory for the workspace
+
+    Returns:
+        Path to the workspace root
+    """
+
+    workspace = Path(tempfile.mkdtemp(prefix=f"kb_{num_documents}_", dir=base_dir))
+    shutil.copytree(PROJECT_ROOT / "config", workspace / "config")
+    shutil.copytree(PROJECT_ROOT / "prompts", workspace / "prompts")
+    (workspace / "logs").mkdir()
+
+    rng = random.Random(seed)
+    per_category = max(1, num_documents // len(CATEGORIES))
+
+    for category in CATEGORIES:
+        kb_dir = workspace / "data" / "knowledge_base" / f"{category.lower()}_docs"
+        kb_dir.mkdir(parents=True)
+        for index in range(per_category):
+            document = _synthetic_document(rng, category, index)
+            (kb_dir / f"doc_{index:06d}.txt").write_text(document, encoding="utf-8")
+
+    return workspace
+
+def remove_workspace(workspace: Path):
+    """Delete a workspace created by create_workspace."""
+    shutil.rmtree(workspace, ignore_errors=True)
+
+def sample_tickets(count: int, seed: int = 11) -> List[dict]:
+    """Generate benchmark tickets spread across all categories."""
+    rng = random.Random(seed)
+    tickets = []
+    for i in range(count):
+        category = CATEGORIES[i % len(CATEGORIES)]
+        words = [rng.choice(VOCABULARY[category]) for _ in range(12)]
+        tickets.append({
+            "subject": f"{category} issue: {' '.join(words[:4])}",
+            "description": "I need help with " + " ".join(words) + ". Please advise on next steps."
+        })
+    return tickets
@@ -1,4 +1,4 @@
-from typing import Dict, Any, Literal
+from typing import Dict, Any, List, Literal
 from langgraph.graph import StateGraph, END
 from langgraph.graph.state import CompiledStateGraph
 from pydantic import BaseModel, Field
@@ -7,13 +7,18 @@ from typing_extensions import TypedDict
 # Import node functions
 from nodes.input_handler import process_input
 from nodes.classifier import classify_ticket
-from nodes.retriever import retrieve_context
+from nodes.retriever import retrieve_context, prefetch_context, select_context
 from nodes.draft_generator import generate_draft
 from nodes.reviewer import review_draft
+from nodes.speculative_drafter import generate_speculative_drafts, get_speculative_settings
 from nodes.retry_logic import should_retry, update_retry_state
 from nodes.escalator import escalate_ticket
+from nodes.degraded import handle_degraded
 
 from utils.logger import setup_logger
+from utils.helpers import load_config
+from utils.profiling import profiled_node
+from utils.circuit_breaker import circuit_open
 
 logger = setup_logger("graph")
 
@@ -24,12 +29,19 @@ class SupportTicketState(TypedDict):
     ticket_id: str
     subject: str
     description: str
+    original_description: str
+    # Selects the tenant's knowledge base; empty for the shared one
+    tenant_id: str
     
     # Processing fields
     category: str
+    # Fallback context text, e.g. when retrieval failed
     context: str
+    # Retrieved documents as {"id", "score"} references into utils.document_store
     context_docs: list
+    candidate_docs: dict
     draft_response: str
+    draft_model: str
     review_approved: bool
     reviewer_feedback: str
     
@@ -37,6 +49,8 @@ class SupportTicketState(TypedDict):
     processing_step: str
     attempt_count: int
     failed_attempts: list
+    deadline: float
+    degraded: bool
     escalated: bool
     escalation_message: str
     final_response: str
@@ -48,6 +62,133 @@ class SupportTicketState(TypedDict):
     review_error: str
     escalation_error: str
 
+def create_initial_state(subject: str, description: str, ticket_id: str = "", deadline: float = 0.0,
+                         tenant_id: str = "") -> SupportTicketState:
+    """Build the initial graph state for a new ticket; deadline is epoch seconds, 0 for none."""
+    return {
+        "subject": subject,
+        "description": description,
+        "original_description": "",
+        "ticket_id": ticket_id,
+        "tenant_id": tenant_id,
+        "category": "",
+        "context": "",
+        "context_docs": [],
+        "candidate_docs": {},
+        "draft_response": "",
+        "draft_model": "",
+        "review_approved": False,
+        "reviewer_feedback": "",
+        "processing_step": "initialized",
+        "attempt_count": 0,
+        "failed_attempts": [],
+        "deadline": deadline,
+        "degraded": False,
+        "escalated": False,
+        "escalation_message": "",
+        "final_response": "",
+        "classification_error": "",
+        "retrieval_error": "",
+        "generation_error": "",
+        "review_error": "",
+        "escalation_error": ""
+    }
+
+def route_after_review(state: SupportTicketState) -> Literal["finalize", "retry_updater", "escalator", "degraded"]:
+    """Route based on review result and attempt count."""
+    decision = should_retry(state)
+    logger.info(f"Routing decision for ticket {state.get('ticket_id')}: {decision}")
+    
+    if decision == "finalize":
+        return "finalize"
+    elif decision == "retry":
+        return "retry_updater"
+    elif decision == "degrade":
+        return "degraded"
+    else:  # escalate
+        return "escalator"
+
+def route_to_drafter(state: SupportTicketState) -> Literal["draft_generator", "speculative_drafter", "degraded"]:
+    """Send categories configured for speculative drafting to the best-of-N drafter."""
+    config = load_config()
+    if circuit_open(config):
+        return "degraded"
+    if get_speculative_settings(state.get("category"), config):
+        return "speculative_drafter"
+    return "draft_generator"
+
+def route_after_input(state: SupportTicketState) -> Literal["classifier", "degraded"]:
+    """Skip the LLM pipeline entirely while the circuit breaker is open."""
+    return "degraded" if circuit_open(load_config()) else "classifier"
+
+def route_after_degraded(state: SupportTicketState) -> Literal["escalator", "__end__"]:
+    """End with the canned reply, or queue the ticket for escalation."""
+    return "escalator" if state.get("processing_step") == "degraded_escalation" else END
+
+def route_parallel_after_input(state: SupportTicketState) -> List[str]:
+    """Fan out to classification and prefetch, or skip both while the circuit breaker is open."""
+    if route_after_input(state) == "degraded":
+        return ["degraded"]
+    return ["classifier", "retrieval_prefetch"]
+
+DRAFTER_ROUTES = {
+    "draft_generator": "draft_generator",
+    "speculative_drafter": "speculative_drafter",
+    "degraded": "degraded"
+}
+
+REVIEW_ROUTES = {
+    "finalize": END,
+    "retry_updater": "retry_updater",
+    "escalator": "escalator",
+    "degraded": "degraded"
+}
+
+DEGRADED_ROUTES = {
+    "escalator": "escalator",
+    END: END
+}
+
+def _add_resolution_nodes(workflow: StateGraph):
+    """Add the draft/review/retry/escalation loop shared by every graph variant."""
+    
+    workflow.add_node("retriever", profiled_node("retriever", retrieve_context))
+    workflow.add_node("draft_generator", profiled_node("draft_generator", generate_draft))
+    workflow.add_node("speculative_drafter", profiled_node("speculative_drafter", generate_speculative_drafts))
+    workflow.add_node("reviewer", profiled_node("reviewer", review_draft))
+    workflow.add_node("retry_updater", profiled_node("retry_updater", update_retry_state))
+    workflow.add_node("escalator", profiled_node("escalator", escalate_ticket))
+    workflow.add_node("degraded", profiled_node("degraded", handle_degraded))
+    
+    workflow.add_conditional_edges("retriever", route_to_drafter, DRAFTER_ROUTES)
+    workflow.add_edge("draft_generator", "reviewer")
+    
+    # Add conditional edge for retry logic; speculative rounds review their own drafts
+    workflow.add_conditional_edges("reviewer", route_after_review, REVIEW_ROUTES)
+    workflow.add_conditional_edges("speculative_drafter", route_after_review, REVIEW_ROUTES)
+    
+    # Add retry loop edges
+    workflow.add_edge("retry_updater", "retriever")  # Go back to retrieval with feedback
+    workflow.add_edge("escalator", END)
+    
+    # Degraded path while the LLM circuit breaker is open
+    workflow.add_conditional_edges("degraded", route_after_degraded, DEGRADED_ROUTES)
+
+def _partial_update(node, keys: List[str]):
+    """
+    Wrap a node so it only reports the given state keys.
+    
+    Nodes return the whole state, which is fine in a chain but makes two
+    nodes running in the same step conflict on every key.
+    """
+    
+    def wrapper(state: SupportTicketState) -> Dict[str, Any]:
+        result = node(state)
+        return {key: result[key] for key in keys if key in result}
+    
+    wrapper.__name__ = node.__name__
+    return wrapper
+
 def create_support_agent_graph() -> CompiledStateGraph:
     """
     Create and compile the support ticket resolution graph.
@@ -62,49 +203,19 @@ def create_support_agent_graph() -> CompiledStateGraph:
     workflow = StateGraph(SupportTicketState)
     
     # Add nodes
-    workflow.add_node("input_handler", process_input)
-    workflow.add_node("classifier", classify_ticket)
-    workflow.add_node("retriever", retrieve_context)
-    workflow.add_node("draft_generator", generate_draft)
-    workflow.add_node("reviewer", review_draft)
-    workflow.add_node("retry_updater", update_retry_state)
-    workflow.add_node("escalator", escalate_ticket)
+    workflow.add_node("input_handler", profiled_node("input_handler", process_input))
+    workflow.add_node("classifier", profiled_node("classifier", classify_ticket))
+    _add_resolution_nodes(workflow)
     
     # Set entry point
     workflow.set_entry_point("input_handler")
     
     # Add edges
-    workflow.add_edge("input_handler", "classifier")
+    workflow.add_conditional_edges("input_handler", route_after_input, {
+        "classifier": "classifier",
+        "degraded": "degraded"
+    })
     workflow.add_edge("classifier", "retriever")
-    workflow.add_edge("retriever", "draft_generator")
-    workflow.add_edge("draft_generator", "reviewer")
-    
-    # Add conditional edge for retry logic
-    def route_after_review(state: SupportTicketState) -> Literal["finalize", "retry_updater", "escalator"]:
-        """Route based on review result and attempt count."""
-        decision = should_retry(state)
-        logger.info(f"Routing decision for ticket {state.get('ticket_id')}: {decision}")
-        
-        if decision == "finalize":
-            return "finalize"
-        elif decision == "retry":
-            return "retry_updater"
-        else:  # escalate
-            return "escalator"
-    
-    workflow.add_conditional_edges(
-        "reviewer",
-        route_after_review,
-        {
-            "finalize": END,
-            "retry_updater": "retry_updater",
-            "escalator": "escalator"
-        }
-    )
-    
-    # Add retry loop edges
-    workflow.add_edge("retry_updater", "retriever")  # Go back to retrieval with feedback
-    workflow.add_edge("escalator", END)
     
     # Compile the graph
     compiled_graph = workflow.compile()
@@ -113,6 +224,50 @@ def create_support_agent_graph() -> CompiledStateGraph:
     
     return compiled_graph
 
+def create_parallel_support_agent_graph() -> CompiledStateGraph:
+    """
+    Create the graph variant that overlaps classification with retrieval.
+    
+    The classifier and a category-agnostic retrieval prefetch run in the
+    same step; context_join then picks the prefetched documents for the
+    resolved category. Retries still go through the category-specific
+    retriever so reviewer feedback is taken into account.
+    
+    Returns:
+        Compiled LangGraph state graph
+    """
+    
+    logger.info("Creating parallel support agent graph")
+    
+    workflow = StateGraph(SupportTicketState)
+    
+    workflow.add_node("input_handler", profiled_node("input_handler", process_input))
+    workflow.add_node("classifier", profiled_node("classifier", _partial_update(
+        classify_ticket, ["category", "processing_step", "classification_error"]
+    )))
+    workflow.add_node("retrieval_prefetch", profiled_node("retrieval_prefetch", _partial_update(
+        prefetch_context, ["candidate_docs", "retrieval_error"]
+    )))
+    workflow.add_node("context_join", profiled_node("context_join", select_context))
+    _add_resolution_nodes(workflow)
+    
+    workflow.set_entry_point("input_handler")
+    
+    # Fan out, then join once both branches have finished
+    workflow.add_conditional_edges("input_handler", route_parallel_after_input, {
+        "classifier": "classifier",
+        "retrieval_prefetch": "retrieval_prefetch",
+        "degraded": "degraded"
+    })
+    workflow.add_edge(["classifier", "retrieval_prefetch"], "context_join")
+    workflow.add_conditional_edges("context_join", route_to_drafter, DRAFTER_ROUTES)
+    
+    compiled_graph = workflow.compile()
+    
+    logger.info("Parallel support agent graph compiled successfully")
+    
+    return compiled_graph
+
 def finalize_response(state: SupportTicketState) -> Dict[str, Any]:
     """
     Finalize the response when approved.
@@ -135,5 +290,34 @@ def finalize_response(state: SupportTicketState) -> Dict[str, Any]:
         "processing_step": "completed"
     }
 
+GRAPH_VARIANTS = {
+    "sequential": create_support_agent_graph,
+    "parallel": create_parallel_support_agent_graph,
+}
+
+def create_configured_graph() -> CompiledStateGraph:
+    """
+    Create the graph variant selected by graph.variant in settings.
+    
+    With graph.backend "native" the same variant runs on the hand-rolled
+    NativePipeline executor instead of the LangGraph runtime; both expose
+    ainvoke/invoke.
+    """
+    graph_config = load_config().get("graph", {})
+    variant = graph_config.get("variant", "sequential")
+    if variant not in GRAPH_VARIANTS:
+        logger.warning(f"Unknown graph variant '{variant}', using 'sequential'")
+        variant = "sequential"
+    
+    backend = graph_config.get("backend", "langgraph")
+    if backend == "native":
+        # Imported here: the executor reuses this module's routing functions
+        from langgraph_graph.native_executor import NativePipeline
+        logger.info(f"Using the native executor for the {variant} pipeline")
+        return NativePipeline(variant)
+    if backend != "langgraph":
+        logger.warning(f"Unknown graph backend '{backend}', using 'langgraph'")
+    return GRAPH_VARIANTS[variant]()
+
 # Create the main graph instance
-support_agent_graph = create_support_agent_graph()
+support_agent_graph = create_configured_graph()
@@ -0,0 +1,121 @@
+import asyncio
+from typing import Any, Callable, Dict, List
+from langgraph.errors import GraphRecursionError
+
+from nodes.input_handler import process_input
+from nodes.classifier import classify_ticket
+from nodes.retriever import retrieve_context, prefetch_context, select_context
+from nodes.draft_generator import generate_draft
+from nodes.reviewer import review_draft
+from nodes.speculative_drafter import generate_speculative_drafts
+from nodes.retry_logic import update_retry_state
+from nodes.escalator import escalate_ticket
+from nodes.degraded import handle_degraded
+
+from langgraph_graph.graph import (
+    END, SupportTicketState, _partial_update, route_after_degraded, route_after_input,
+    route_after_review, route_to_drafter
+)
+from utils.logger import setup_logger
+from utils.profiling import profiled_node
+
+logger = setup_logger("native_executor")
+
+STATE_KEYS = list(SupportTicketState.__annotations__)
+
+NODES: Dict[str, Callable[[Dict[str, Any]], Dict[str, Any]]] = {
+    "input_handler": profiled_node("input_handler", process_input),
+    "classifier": profiled_node("classifier", classify_ticket),
+    "retriever": profiled_node("retriever", retrieve_context),
+    "context_join": profiled_node("context_join", select_context),
+    "draft_generator": profiled_node("draft_generator", generate_draft),
+    "speculative_drafter": profiled_node("speculative_drafter", generate_speculative_drafts),
+    "reviewer": profiled_node("reviewer", review_draft),
+    "retry_updater": profiled_node("retry_updater", update_retry_state),
+    "escalator": profiled_node("escalator", escalate_ticket),
+    "degraded": profiled_node("degraded", handle_degraded),
+}
+
+# Classification and retrieval prefetch run side by side in the parallel variant
+FAN_OUT: List[Callable[[Dict[str, Any]], Dict[str, Any]]] = [
+    profiled_node("classifier", _partial_update(classify_ticket, ["category", "processing_step", "classification_error"])),
+    profiled_node("retrieval_prefetch", _partial_update(prefetch_context, ["candidate_docs", "retrieval_error"])),
+]
+
+class NativePipeline:
+    """
+    Hand-rolled async executor for the support ticket pipeline.
+
+    Runs the same node functions and routing functions as the LangGraph
+    graphs, but keeps one state dict that each node's result is merged into
+    and walks the fixed edges directly instead of going through state
+    channels and a task scheduler. Nodes run in worker threads, as LangGraph
+    runs synchronous nodes, so they don't block the event loop.
+
+    The nodes are shared with the LangGraph backend and still return a
+    shallow copy of the state ({**state, ...}); only the framework's own
+    copying is avoided, not the nodes'.
+
+    Args:
+        variant: "sequential" or "parallel", as graph.variant
+        max_steps: Node executions allowed per ticket, like LangGraph's recursion limit
+    """
+
+    def __init__(self, variant: str = "sequential", max_steps: int = 25):
+        self.variant = variant
+        self.max_steps = max_steps
+
+    async def _fan_out(self, state: Dict[str, Any]):
+        for update in await asyncio.gather(*(asyncio.to_thread(node, state) for node in FAN_OUT)):
+            state.update(update)
+
+    def next_node(self, node: str, state: Dict[str, Any]) -> str:
+        """The node to run after node, given the state it produced ("fan_out" for the parallel step)."""
+        if node == "input_handler":
+            if route_after_input(state) == "degraded":
+                return "degraded"
+            return "fan_out" if self.variant == "parallel" else "classifier"
+        if node == "classifier":
+            return "retriever"
+        if node == "fan_out":
+            return "context_join"
+        if node in ("retriever", "context_join"):
+            return route_to_drafter(state)
+        if node == "draft_generator":
+            return "reviewer"
+        if node in ("reviewer", "speculative_drafter"):
+            route = route_after_review(state)
+            return END if route == "finalize" else route
+        if node == "retry_updater":
+            return "retriever"
+        if node == "degraded":
+            return route_after_degraded(state)
+        return END
+
+    async def ainvoke(self, input_state: Dict[str, Any], config: Any = None) -> Dict[str, Any]:
+        """
+        Process a ticket from its initial state.
+
+        Returns:
+            Final state, limited to the SupportTicketState keys like the graph's output
+        """
+
+        state = dict(input_state)
+        node = "input_handler"
+        steps = 0
+
+        while node != END:
+            steps += 1
+            if steps > self.max_steps:
+                raise GraphRecursionError(f"Recursion limit of {self.max_steps} reached without hitting a stop condition.")
+            if node == "fan_out":
+                await self._fan_out(state)
+            else:
+                state.update(await asyncio.to_thread(NODES[node], state))
+            node = self.next_node(node, state)
+
+        return {key: state[key] for key in STATE_KEYS if key in state}
+
+    def invoke(self, input_state: Dict[str, Any], config: Any = None) -> Dict[str, Any]:
+        """Synchronous ainvoke, for callers outside an event loop."""
+        return asyncio.run(self.ainvoke(input_state, config))
@@ -9,15 +9,21 @@ import sys
 from pathlib import Path
 from typing import Dict, Any
 import asyncio
+import time
 from dotenv import load_dotenv
 
 # Add project root to path
 project_root = Path(__file__).parent
 sys.path.insert(0, str(project_root))
 
-from langgraph_graph.graph import support_agent_graph, SupportTicketState
+from langgraph_graph.graph import support_agent_graph, SupportTicketState, create_initial_state
 from utils.logger import setup_logger
-from utils.helpers import load_config
+from utils.helpers import load_config, create_ticket_id
+from utils.deadlines import ticket_deadline
+from utils.profiling import profile_ticket
+from utils.cassettes import cassette_session
+from utils.results_store import record_result
+from utils.memory_monitor import monitor_ticket
 
 # Load environment variables
 load_dotenv()
@@ -33,47 +39,35 @@ def validate_environment():
         logger.error(f"Missing required environment variables: {missing_vars}")
         sys.exit(1)
 
-async def process_ticket(subject: str, description: str) -> Dict[str, Any]:
+async def process_ticket(subject: str, description: str, ticket_id: str = "", tenant_id: str = "") -> Dict[str, Any]:
     """
     Process a support ticket through the LangGraph agent.
     
     Args:
         subject: Ticket subject line
         description: Detailed ticket description
+        ticket_id: Optional ticket ID; one is generated if empty
+        tenant_id: Optional tenant whose knowledge base is used; the shared one if empty
         
     Returns:
         Final processing result
     """
     
     logger.info(f"Processing new ticket: {subject[:50]}...")
+    start = time.perf_counter()
     
     # Create initial state
-    initial_state: SupportTicketState = {
-        "subject": subject,
-        "description": description,
-        "ticket_id": "",
-        "category": "",
-        "context": "",
-        "context_docs": [],
-        "draft_response": "",
-        "review_approved": False,
-        "reviewer_feedback": "",
-        "processing_step": "initialized",
-        "attempt_count": 0,
-        "failed_attempts": [],
-        "escalated": False,
-        "escalation_message": "",
-        "final_response": "",
-        "classification_error": "",
-        "retrieval_error": "",
-        "generation_error": "",
-        "review_error": "",
-        "escalation_error": ""
-    }
+    initial_state = create_initial_state(
+        subject, description, ticket_id or create_ticket_id(), deadline=ticket_deadline(load_config()),
+        tenant_id=tenant_id
+    )
     
     try:
-        # Run the graph
-        result = await support_agent_graph.ainvoke(initial_state)
+        # Run the graph, profiling it, recording or replaying its LLM calls and counting it
+        # towards the memory monitor's in-flight tickets if enabled
+        with profile_ticket(initial_state["ticket_id"]), monitor_ticket(), \
+                cassette_session(initial_state["ticket_id"], subject, description, tenant_id):
+            result = await support_agent_graph.ainvoke(initial_state)
         
         ticket_id = result.get("ticket_id", "unknown")
         final_response = result.get("final_response", "")
@@ -84,16 +78,20 @@ async def process_ticket(subject: str, description: str) -> Dict[str, Any]:
         else:
             logger.info(f"Ticket {ticket_id} resolved successfully")
         
+        # Persisted by a background writer, off the request path
+        record_result(result, time.perf_counter() - start)
         return result
         
     except Exception as e:
         logger.error(f"Error processing ticket: {str(e)}")
-        return {
+        error_result = {
             **initial_state,
             "final_response": "An error occurred while processing your ticket. Please contact support directly.",
             "processing_step": "error",
             "escalation_error": str(e)
         }
+        record_result(error_result, time.perf_counter() - start)
+        return error_result
 
 def run_interactive_demo():
     """Run an interactive demo of the support agent."""
@@ -1,8 +1,10 @@
-from typing import Dict, Any
-from langchain_openai import ChatOpenAI
-from langchain.schema import HumanMessage
+from typing import Dict, Any, List
 from utils.logger import setup_logger
-from utils.helpers import load_config, load_prompt_template
+from utils.helpers import load_config
+from utils.llm import build_messages, get_chat_model
+from utils.model_cascade import cascade_models, invoke_tier
+from utils.deadlines import llm_timeout
+from utils.circuit_breaker import CircuitOpen
 
 logger = setup_logger("classifier")
 
@@ -25,26 +27,32 @@ def classify_ticket(state: Dict[str, Any]) -> Dict[str, Any]:
     logger.info(f"Classifying ticket {ticket_id}")
     
     try:
-        # Initialize LLM
-        llm = ChatOpenAI(
-            model=config["llm"]["model"],
-            temperature=config["llm"]["temperature"],
-            max_tokens=100  # Short response for classification
-        )
-        
         # Load and format prompt
-        prompt_template = load_prompt_template("classifier_prompt.txt")
-        prompt = prompt_template.format(
+        messages = build_messages(
+            "classifier",
+            config,
             subject=subject,
             description=description
         )
         
-        # Get classification
-        response = llm.invoke([HumanMessage(content=prompt)])
-        category = response.content.strip()
+        # Get classification, moving up the model cascade while the answer isn't a valid category
+        reserve = config.get("deadline", {}).get("escalation_reserve_seconds", 0)
+        valid_categories = config["categories"]
+        for model in cascade_models("classifier", config):
+            llm = get_chat_model(
+                model=model,
+                temperature=config["llm"]["temperature"],
+                max_tokens=100  # Short response for classification
+            )
+            response = invoke_tier(
+                "classifier", model, llm, messages, config, timeout=llm_timeout(state, "classifier", reserve)
+            )
+            category = response.content.strip()
+            if category in valid_categories:
+                break
+            logger.warning(f"Invalid category '{category}' from {model} for ticket {ticket_id}")
         
         # Validate category
-        valid_categories = config["categories"]
         if category not in valid_categories:
             logger.warning(f"Invalid category '{category}' for ticket {ticket_id}, defaulting to 'General'")
             category = "General"
@@ -62,10 +70,41 @@ def classify_ticket(state: Dict[str, Any]) -> Dict[str, Any]:
         
     except Exception as e:
         logger.error(f"Classification failed for ticket {ticket_id}: {str(e)}")
-        # Default to General category on error
+        # While the LLM is failing fast, classify locally; otherwise default to General
+        category = "General"
+        if isinstance(e, CircuitOpen):
+            category = keyword_classify(subject, description, category_keywords(config))
         return {
             **state,
-            "category": "General",
+            "category": category,
             "processing_step": "classified",
             "classification_error": str(e)
         }
+
+def category_keywords(config: Dict[str, Any]) -> Dict[str, List[str]]:
+    """Keywords per category for keyword_classify, from keyword_classification.category_keywords."""
+    return config.get("keyword_classification", {}).get("category_keywords", {})
+
+def keyword_classify(subject: str, description: str, category_keywords: Dict[str, List[str]]) -> str:
+    """
+    Classify a ticket locally by keyword matches, without an LLM call.
+    
+    Args:
+        subject: Ticket subject line
+        description: Detailed ticket description
+        category_keywords: Keywords per category, e.g. from category_keywords(config)
+        
+    Returns:
+        Category with the most keyword matches, or "General" if none match
+    """
+    
+    text = f"{subject} {description}".lower()
+    best_category = "General"
+    best_score = 0
+    
+    for category, keywords in category_keywords.items():
+        score = sum(1 for keyword in keywords if keyword.lower() in text)
+        if score > best_score:
+            best_category, best_score = category, score
+    
+    return best_category
@@ -0,0 +1,70 @@
+from typing import Dict, Any
+from utils.logger import setup_logger
+from utils.helpers import load_config
+from utils.metrics import metrics
+from nodes.classifier import category_keywords, keyword_classify
+from nodes.retriever import rank_category, tokenize_query
+from utils.document_store import resolve_document
+
+logger = setup_logger("degraded")
+
+DEGRADED_REPLY = (
+    "Thank you for contacting support. Our assistant is temporarily unavailable, "
+    "so here is the guidance that best matches your request:\n\n{document}\n\n"
+    "If this does not resolve your issue, reply to this message and a support agent will follow up."
+)
+
+def handle_degraded(state: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Resolve a ticket without the LLM while the circuit breaker is open.
+
+    Classifies the ticket locally by keyword if the classifier did not, then
+    replies with the best matching knowledge base document when it scores at
+    least degraded.min_kb_score. Anything else is marked for escalation.
+
+    Args:
+        state: Graph state containing ticket information
+
+    Returns:
+        Updated state with a canned reply, or ready for the escalator
+    """
+
+    config = load_config()
+    ticket_id = state.get("ticket_id")
+    subject = state.get("subject", "")
+    description = state.get("description", "")
+
+    category = state.get("category")
+    if not category or state.get("classification_error"):
+        category = keyword_classify(subject, description, category_keywords(config))
+
+    logger.info(f"LLM unavailable, handling ticket {ticket_id} in degraded mode as {category}")
+
+    try:
+        ranked, _ = rank_category(category, tokenize_query(subject, description), config, state.get("tenant_id", ""))
+    except Exception as e:
+        logger.error(f"Degraded retrieval failed for ticket {ticket_id}: {str(e)}")
+        ranked = []
+
+    min_score = config.get("degraded", {}).get("min_kb_score", 2)
+    if ranked and ranked[0][1] >= min_score:
+        metrics.increment("degraded_tickets_total", outcome="kb_reply")
+        doc_id, score = ranked[0]
+        document = resolve_document(doc_id, config)
+        return {
+            **state,
+            "category": category,
+            "context_docs": [{"id": doc_id, "score": score}],
+            "degraded": True,
+            "final_response": DEGRADED_REPLY.format(document=document),
+            "processing_step": "degraded_reply"
+        }
+
+    metrics.increment("degraded_tickets_total", outcome="escalated")
+    return {
+        **state,
+        "category": category,
+        "degraded": True,
+        "reviewer_feedback": "LLM provider unavailable and no confident knowledge base match",
+        "processing_step": "degraded_escalation"
+    }
@@ -1,17 +1,20 @@
-from typing import Dict, Any
-from langchain_openai import ChatOpenAI
-from langchain.schema import HumanMessage
+from typing import Dict, Any, Optional
 from utils.logger import setup_logger
-from utils.helpers import load_config, load_prompt_template
+from utils.helpers import load_config
+from utils.llm import build_messages, get_chat_model
+from utils.model_cascade import invoke_tier, model_for_attempt
+from utils.deadlines import llm_timeout
+from utils.prompt_assembler import build_generator_context
 
 logger = setup_logger("draft_generator")
 
-def generate_draft(state: Dict[str, Any]) -> Dict[str, Any]:
+def generate_draft(state: Dict[str, Any], temperature: Optional[float] = None) -> Dict[str, Any]:
     """
     Generate a draft response based on ticket and context.
     
     Args:
         state: Graph state containing ticket, category, and context
+        temperature: Optional override for llm.temperature, used by speculative drafts
         
     Returns:
         Updated state with draft response
@@ -22,45 +25,46 @@ def generate_draft(state: Dict[str, Any]) -> Dict[str, Any]:
     subject = state.get("subject")
     description = state.get("description")
     category = state.get("category")
-    context = state.get("context", "")
     attempt_count = state.get("attempt_count", 0)
-    reviewer_feedback = state.get("reviewer_feedback", "")
     
     logger.info(f"Generating draft for ticket {ticket_id} (attempt {attempt_count + 1})")
     
     try:
-        # Initialize LLM
-        llm = ChatOpenAI(
-            model=config["llm"]["model"],
-            temperature=config["llm"]["temperature"],
+        # Initialize LLM; with a model cascade, retries move to stronger models
+        model = model_for_attempt("draft_generator", attempt_count, config)
+        llm = get_chat_model(
+            model=model,
+            temperature=config["llm"]["temperature"] if temperature is None else temperature,
             max_tokens=config["llm"]["max_tokens"]
         )
         
-        # Load and format prompt
-        prompt_template = load_prompt_template("generator_prompt.txt")
-        
-        # Add reviewer feedback if this is a retry
-        enhanced_context = context
-        if reviewer_feedback:
-            enhanced_context += f"\n\nPrevious Reviewer Feedback: {reviewer_feedback}"
+        # Add reviewer feedback if this is a retry, within the prompt budget if configured
+        enhanced_context = build_generator_context(state, config)
         
-        prompt = prompt_template.format(
+        # Load and format prompt
+        messages = build_messages(
+            "generator",
+            config,
             subject=subject,
             description=description,
             category=category,
             context=enhanced_context
         )
         
-        # Generate draft
-        response = llm.invoke([HumanMessage(content=prompt)])
+        # Generate draft, keeping enough of the deadline for a possible escalation
+        reserve = config.get("deadline", {}).get("escalation_reserve_seconds", 0)
+        response = invoke_tier(
+            "draft_generator", model, llm, messages, config, timeout=llm_timeout(state, "draft_generator", reserve)
+        )
         draft_response = response.content.strip()
         
-        logger.info(f"Draft generated for ticket {ticket_id} (length: {len(draft_response)} chars)")
+        logger.info(f"Draft generated for ticket {ticket_id} with {model} (length: {len(draft_response)} chars)")
         
         # Update state
         updated_state = {
             **state,
             "draft_response": draft_response,
+            "draft_model": model,
             "processing_step": "draft_generated",
             "attempt_count": attempt_count + 1
         }
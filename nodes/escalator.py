@@ -1,15 +1,81 @@
-from typing import Dict, Any
-from langchain_openai import ChatOpenAI
-from langchain.schema import HumanMessage
+import threading
+from typing import Dict, Any, Optional
 from utils.logger import setup_logger
-from utils.helpers import load_config, load_prompt_template, save_to_escalation_log
+from utils.helpers import load_config, save_to_escalation_log
+from utils.llm import build_messages, get_chat_model, invoke_llm
+from utils.deadlines import DeadlineExceeded, llm_timeout
+from utils.circuit_breaker import CircuitOpen
+from utils.escalation_worker import EscalationWorker
 
 logger = setup_logger("escalator")
 
+FALLBACK_MESSAGE = "Ticket {ticket_id} requires human attention due to automated processing failure."
+DEGRADED_MESSAGE = "Ticket {ticket_id} requires human attention; it was escalated without an automated summary while the LLM provider was unavailable."
+
+_worker = None
+_worker_lock = threading.Lock()
+
+def generate_escalation_summary(job: Dict[str, Any], config: Dict[str, Any], timeout: Optional[float] = None) -> str:
+    """
+    Write the internal escalation summary for the human support team.
+    
+    Args:
+        job: Escalation details (ticket fields, attempt count, attempts summary, final feedback)
+        config: Loaded settings
+        timeout: Optional seconds the LLM call may take
+        
+    Returns:
+        Escalation message text
+    """
+    
+    llm = get_chat_model(
+        model=config["llm"]["model"],
+        temperature=config["llm"]["temperature"],
+        max_tokens=config["llm"]["max_tokens"]
+    )
+    
+    # Load and format escalation prompt
+    messages = build_messages(
+        "escalation",
+        config,
+        attempts=job["failed_attempts"],
+        subject=job["subject"],
+        description=job["description"],
+        category=job["category"],
+        failed_attempts=job["attempts_summary"],
+        reviewer_feedback=job["final_error"]
+    )
+    
+    response = invoke_llm("escalator", llm, messages, timeout=timeout)
+    return response.content.strip()
+
+def get_escalation_worker(config: Dict[str, Any]) -> EscalationWorker:
+    """The process-wide background escalation worker."""
+    global _worker
+    with _worker_lock:
+        if _worker is None:
+            escalation_config = config["escalation"]
+            timeout = escalation_config.get("summary_timeout_seconds", 30)
+            _worker = EscalationWorker(
+                summarize=lambda job: generate_escalation_summary(job, load_config(), timeout=timeout),
+                log_file=escalation_config["log_file"],
+                batch_size=escalation_config.get("batch_size", 8),
+                flush_interval=escalation_config.get("flush_interval_seconds", 0.5),
+                max_retries=escalation_config.get("max_retries", 3),
+                retry_backoff=escalation_config.get("retry_backoff_seconds", 1.0),
+                fallback_message=FALLBACK_MESSAGE,
+                shutdown_timeout=escalation_config.get("shutdown_timeout_seconds", 30)
+            )
+        return _worker
+
 def escalate_ticket(state: Dict[str, Any]) -> Dict[str, Any]:
     """
     Escalate ticket to human agents and log to CSV.
     
+    With escalation.background enabled, the summary and log row are handed
+    to the background escalation worker and the customer response is
+    returned right away.
+    
     Args:
         state: Graph state containing failed ticket information
         
@@ -19,59 +85,58 @@ def escalate_ticket(state: Dict[str, Any]) -> Dict[str, Any]:
     
     config = load_config()
     ticket_id = state.get("ticket_id")
-    subject = state.get("subject")
-    description = state.get("description")
-    category = state.get("category")
     failed_attempts = state.get("failed_attempts", [])
     attempt_count = state.get("attempt_count", 0)
-    reviewer_feedback = state.get("reviewer_feedback", "")
+    customer_response = f"This ticket has been escalated to our human support team. Reference ID: {ticket_id}"
     
     logger.info(f"Escalating ticket {ticket_id} after {attempt_count} failed attempts")
     
-    try:
-        # Initialize LLM for escalation message
-        llm = ChatOpenAI(
-            model=config["llm"]["model"],
-            temperature=config["llm"]["temperature"],
-            max_tokens=config["llm"]["max_tokens"]
-        )
-        
-        # Prepare failed attempts summary
-        attempts_summary = []
-        for i, attempt in enumerate(failed_attempts, 1):
-            attempts_summary.append(f"Attempt {i}: {attempt['feedback']}")
-        
-        attempts_text = "\n".join(attempts_summary)
-        
-        # Load and format escalation prompt
-        prompt_template = load_prompt_template("escalation_prompt.txt")
-        prompt = prompt_template.format(
-            attempts=attempt_count,
-            subject=subject,
-            description=description,
-            category=category,
-            failed_attempts=attempts_text,
-            reviewer_feedback=reviewer_feedback
-        )
-        
-        # Generate escalation message
-        response = llm.invoke([HumanMessage(content=prompt)])
-        escalation_message = response.content.strip()
-        
-        # Prepare escalation data
-        escalation_data = {
-            "ticket_id": ticket_id,
-            "subject": subject,
-            "description": description,
-            "category": category,
-            "failed_attempts": attempt_count,
-            "final_error": reviewer_feedback,
-            "escalation_message": escalation_message
+    # Prepare failed attempts summary
+    attempts_summary = []
+    for i, attempt in enumerate(failed_attempts, 1):
+        attempts_summary.append(f"Attempt {i}: {attempt['feedback']}")
+    
+    job = {
+        "ticket_id": ticket_id,
+        "subject": state.get("subject"),
+        "description": state.get("description"),
+        # The escalation log keeps the customer's full text, before input normalization
+        "original_description": state.get("original_description") or state.get("description"),
+        "category": state.get("category"),
+        "failed_attempts": attempt_count,
+        "attempts_summary": "\n".join(attempts_summary),
+        "final_error": state.get("reviewer_feedback", "")
+    }
+    
+    # While the LLM is unavailable, queue the ticket with a canned summary rather than wait on one
+    if state.get("degraded"):
+        job["escalation_message"] = DEGRADED_MESSAGE.format(ticket_id=ticket_id)
+    
+    if config["escalation"].get("background", False):
+        get_escalation_worker(config).submit(job)
+        logger.info(f"Ticket {ticket_id} escalated; summary queued for the escalation worker")
+        return {
+            **state,
+            "escalation_message": f"Escalation summary for ticket {ticket_id} is being prepared for the support team.",
+            "escalated": True,
+            "processing_step": "escalated",
+            "final_response": customer_response
         }
+    
+    try:
+        # Generate escalation message, or a canned one once the deadline has passed
+        try:
+            escalation_message = job.get("escalation_message") or generate_escalation_summary(
+                job, config, timeout=llm_timeout(state, "escalator")
+            )
+        except DeadlineExceeded:
+            escalation_message = f"Ticket {ticket_id} requires human attention; its processing deadline was reached."
+        except CircuitOpen:
+            escalation_message = DEGRADED_MESSAGE.format(ticket_id=ticket_id)
         
         # Save to escalation log
         log_file = config["escalation"]["log_file"]
-        save_to_escalation_log(escalation_data, log_file)
+        save_to_escalation_log({**job, "escalation_message": escalation_message}, log_file)
         
         logger.info(f"Ticket {ticket_id} escalated and logged to {log_file}")
         
@@ -81,7 +146,7 @@ def escalate_ticket(state: Dict[str, Any]) -> Dict[str, Any]:
             "escalation_message": escalation_message,
             "escalated": True,
             "processing_step": "escalated",
-            "final_response": f"This ticket has been escalated to our human support team. Reference ID: {ticket_id}"
+            "final_response": customer_response
         }
         
         return updated_state
@@ -90,13 +155,13 @@ def escalate_ticket(state: Dict[str, Any]) -> Dict[str, Any]:
         logger.error(f"Escalation failed for ticket {ticket_id}: {str(e)}")
         
         # Fallback escalation
-        fallback_message = f"Ticket {ticket_id} requires human attention due to automated processing failure."
+        fallback_message = FALLBACK_MESSAGE.format(ticket_id=ticket_id)
         
         return {
             **state,
             "escalation_message": fallback_message,
             "escalated": True,
             "processing_step": "escalated",
-            "final_response": f"This ticket has been escalated to our human support team. Reference ID: {ticket_id}",
+            "final_response": customer_response,
             "escalation_error": str(e)
         }
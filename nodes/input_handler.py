@@ -1,16 +1,156 @@
-from typing import Dict, Any
+import re
+from typing import Dict, Any, List, Tuple
 from utils.logger import setup_logger
-from utils.helpers import create_ticket_id
+from utils.helpers import create_ticket_id, load_config
+from utils.metrics import metrics
+from utils.prompt_assembler import DEFAULT_ENCODING, count_tokens, truncate_to_tokens
 
 logger = setup_logger("input_handler")
 
+# Parts of a log line that change between otherwise identical lines
+_VOLATILE = re.compile(r"\d{4}-\d{2}-\d{2}[T ][\d:.,]+Z?|\b0x[0-9a-f]+\b|\b[0-9a-f]{8,}\b|\d+", re.IGNORECASE)
+_QUOTED = re.compile(r"^\s*(>\s?)+")
+_ORIGINAL_MESSAGE = re.compile(r"^\s*(-+\s*(original|forwarded) message\s*-+|on .+ wrote:)\s*$", re.IGNORECASE)
+_PYTHON_TRACEBACK = "Traceback (most recent call last):"
+_PYTHON_FRAME = re.compile(r'^\s+File ".+", line \d+')
+_STACK_FRAME = re.compile(r"^\s+at\s+\S+")
+
+def collapse_repeated_lines(lines: List[str], max_repeats: int = 2) -> List[str]:
+    """
+    Collapse runs of log lines that only differ in timestamps, IDs and numbers.
+    
+    The first max_repeats lines of a run are kept, followed by a marker
+    with the number of lines dropped.
+    """
+    
+    collapsed = []
+    index = 0
+    while index < len(lines):
+        key = _VOLATILE.sub("#", lines[index].strip())
+        end = index + 1
+        while end < len(lines) and key and _VOLATILE.sub("#", lines[end].strip()) == key:
+            end += 1
+        run = end - index
+        collapsed.extend(lines[index:index + min(run, max_repeats)])
+        if run > max_repeats:
+            collapsed.append(f"[... similar line repeated {run - max_repeats} more times]")
+        index = end
+    return collapsed
+
+def dedupe_quoted_email(lines: List[str]) -> List[str]:
+    """
+    Drop quoted email history that repeats text already in the ticket.
+    
+    Quoted lines ("> ...", at any depth) and lines after an "Original
+    Message" or "On ... wrote:" marker are kept only the first time their
+    text appears.
+    """
+    
+    seen = set()
+    deduped = []
+    in_history = False
+    dropped = 0
+    for line in lines:
+        quoted = bool(_QUOTED.match(line))
+        if _ORIGINAL_MESSAGE.match(_QUOTED.sub("", line)):
+            in_history = True
+        text = " ".join(_QUOTED.sub("", line).split()).lower()
+        if (quoted or in_history) and text and text in seen:
+            dropped += 1
+            continue
+        if text:
+            seen.add(text)
+        deduped.append(line)
+    if dropped:
+        deduped.append(f"[... {dropped} repeated quoted email lines removed]")
+    return deduped
+
+def trim_stack_traces(lines: List[str], keep_frames: int = 4) -> List[str]:
+    """
+    Shorten stack traces to the frames nearest the error.
+    
+    Python tracebacks keep their last keep_frames frames (the innermost);
+    Java/JavaScript style "at ..." runs keep their first keep_frames. The
+    exception lines themselves are always kept.
+    """
+    
+    trimmed = []
+    index = 0
+    while index < len(lines):
+        line = lines[index]
+    
+        if line.strip() == _PYTHON_TRACEBACK:
+            frames = []
+            end = index + 1
+            while end < len(lines) and _PYTHON_FRAME.match(lines[end]):
+                frame = [lines[end]]
+                end += 1
+                # Source line and caret markers printed under the frame
+                while end < len(lines) and lines[end].startswith("    ") and not _PYTHON_FRAME.match(lines[end]):
+                    frame.append(lines[end])
+                    end += 1
+                frames.append(frame)
+            trimmed.append(line)
+            if len(frames) > keep_frames:
+                trimmed.append(f"  [... {len(frames) - keep_frames} frames omitted]")
+            for frame in frames[-keep_frames:] if keep_frames else []:
+                trimmed.extend(frame)
+            index = end
+            continue
+    
+        if _STACK_FRAME.match(line):
+            end = index
+            while end < len(lines) and (_STACK_FRAME.match(lines[end]) or lines[end].strip().startswith("... ")):
+                end += 1
+            trimmed.extend(lines[index:index + keep_frames])
+            if end - index > keep_frames:
+                trimmed.append(f"    [... {end - index - keep_frames} frames omitted]")
+            index = end
+            continue
+    
+        trimmed.append(line)
+        index += 1
+    return trimmed
+
+def normalize_description(description: str, config: Dict[str, Any]) -> Tuple[str, int, int]:
+    """
+    Shrink a ticket description before it is sent to any prompt.
+    
+    Collapses repeated log lines, drops repeated quoted email history,
+    trims stack traces and finally caps the description at
+    input_normalization.max_description_tokens.
+    
+    Args:
+        description: Stripped ticket description
+        config: Loaded settings
+    
+    Returns:
+        (normalized description, original token count, normalized token count)
+    """
+    
+    settings = config.get("input_normalization", {})
+    encoding = config.get("prompt_budget", {}).get("encoding", DEFAULT_ENCODING)
+    original_tokens = count_tokens(description, encoding)
+    
+    lines = description.splitlines()
+    lines = dedupe_quoted_email(lines)
+    lines = trim_stack_traces(lines, settings.get("stack_frames", 4))
+    lines = collapse_repeated_lines(lines, settings.get("max_repeated_lines", 2))
+    normalized = "\n".join(lines)
+    
+    max_tokens = settings.get("max_description_tokens", 0)
+    if max_tokens:
+        normalized = truncate_to_tokens(normalized, max_tokens, encoding)
+    
+    return normalized, original_tokens, count_tokens(normalized, encoding)
+
 def process_input(state: Dict[str, Any]) -> Dict[str, Any]:
     """
     Process and validate input ticket data.
     
     Args:
         state: Graph state containing ticket information
-        
+    
     Returns:
         Updated state with processed input
     """
@@ -29,12 +169,25 @@ def process_input(state: Dict[str, Any]) -> Dict[str, Any]:
     # Log input processing
     logger.info(f"Processing ticket {ticket_id}: {subject[:50]}...")
     
+    # Shrink pasted logs, traces and email threads once, before every prompt that uses them;
+    # the full text is kept for the escalation log
+    original_description = description
+    config = load_config()
+    if config.get("input_normalization", {}).get("enabled", False):
+        description, original_tokens, tokens = normalize_description(description, config)
+        saved = original_tokens - tokens
+        metrics.observe("input_tokens_saved", saved)
+        metrics.increment("input_tokens_saved_total", saved)
+        if saved > 0:
+            logger.info(f"Normalized description of ticket {ticket_id}: {original_tokens} -> {tokens} tokens")
+    
     # Update state
     updated_state = {
         **state,
         "ticket_id": ticket_id,
         "subject": subject,
         "description": description,
+        "original_description": original_description,
         "processing_step": "input_processed",
         "attempt_count": 0,
         "failed_attempts": []
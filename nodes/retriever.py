@@ -1,9 +1,178 @@
-from typing import Dict, Any, List
+from bisect import bisect_right
+from itertools import accumulate, chain
+from typing import Dict, Any, List, Tuple
+import numpy as np
+from scipy import sparse
 from utils.logger import setup_logger
-from utils.helpers import load_knowledge_base
+from utils.helpers import load_config
+from utils.document_store import DocumentRef, document_id, knowledge_base_source
 
 logger = setup_logger("retriever")
 
+TOP_K = 3
+FALLBACK_DOCS = 2
+# Dense score cells materialized per chunk of tickets in batch ranking
+BATCH_CHUNK_CELLS = 4_000_000
+
+def tokenize_query(subject: str, description: str, reviewer_feedback: str = "") -> List[str]:
+    """Lowercase the ticket text and keep the words long enough to score on."""
+    search_terms = f"{subject} {description} {reviewer_feedback}".lower()
+    return [word for word in search_terms.split() if len(word) > 3]
+
+def score_positions(documents: List[str], search_words: List[str]) -> List[Tuple[int, int]]:
+    """
+    Score documents by keyword overlap with the query.
+    
+    Args:
+        documents: Knowledge base documents
+        search_words: Tokenized query from tokenize_query
+        
+    Returns:
+        (position in documents, score) pairs with a positive score, best first
+    """
+    
+    relevant_docs = []
+    
+    for position, doc in enumerate(documents):
+        doc_lower = doc.lower()
+        score = 0
+        
+        # Simple keyword matching
+        for word in search_words:
+            if word in doc_lower:
+                score += 1
+        
+        if score > 0:
+            relevant_docs.append((position, score))
+    
+    # Sort by relevance, keeping knowledge base order for ties
+    relevant_docs.sort(key=lambda x: x[1], reverse=True)
+    return relevant_docs
+
+def score_documents(documents: List[str], search_words: List[str]) -> List[Tuple[str, int]]:
+    """score_positions, returning (document, score) pairs."""
+    return [(documents[position], score) for position, score in score_positions(documents, search_words)]
+
+def context_refs(ranked: List[Tuple[str, int]], fallback: List[str]) -> List[DocumentRef]:
+    """context_docs entries for a ranking: the ranked documents, or the fallback ones with score 0."""
+    if ranked:
+        return [{"id": doc_id, "score": score} for doc_id, score in ranked]
+    return [{"id": doc_id, "score": 0} for doc_id in fallback]
+
+def rank_category(category: str, search_words: List[str], config: Dict[str, Any],
+                  tenant_id: str = "") -> Tuple[List[Tuple[str, int]], List[str]]:
+    """
+    Top-scoring documents of a category, plus the documents to fall back on.
+    
+    Reads the memory-mapped knowledge base snapshot when one is configured
+    and covers the category, otherwise the category's text files; both come
+    from the tenant's knowledge base when tenant_id is set.
+    
+    Returns:
+        ((document ID, score) pairs for the top TOP_K, IDs of the first FALLBACK_DOCS documents)
+    """
+    
+    snapshot, documents, names = knowledge_base_source(category, config, tenant_id)
+    if snapshot is not None:
+        first, _ = snapshot.categories[category.lower()]
+        ranked = [(index - first, score) for index, score in snapshot.score(category, search_words)[:TOP_K]]
+    else:
+        ranked = score_positions(documents, search_words)[:TOP_K]
+    
+    ranked = [(document_id(category, names[position], tenant_id), score) for position, score in ranked]
+    fallback = [document_id(category, name, tenant_id) for name in names[:FALLBACK_DOCS]]
+    return ranked, fallback
+
+def _matching_documents(corpus: Any, bounds: List[int], needle: Any) -> List[int]:
+    """Positions of the documents in a joined corpus that contain needle."""
+    matches = []
+    end = bounds[-1]
+    position = corpus.find(needle, bounds[0], end)
+    while position != -1:
+        doc = bisect_right(bounds, position) - 1
+        doc_end = bounds[doc + 1]
+        # A hit that runs past the document's end spans two documents
+        if position + len(needle) <= doc_end:
+            matches.append(doc)
+        position = corpus.find(needle, doc_end, end)
+    return matches
+
+def rank_category_batch(category: str, queries: List[List[str]], config: Dict[str, Any],
+                        tenant_id: str = "") -> List[Tuple[List[Tuple[str, int]], List[str]]]:
+    """
+    rank_category for many tokenized queries against one category at once.
+    
+    Each distinct query word is searched for once across the category's
+    joined lowercased documents, giving a sparse word-by-document matrix.
+    Multiplying the sparse query-by-word count matrix with it scores every
+    query against every document, and argpartition picks each query's top
+    TOP_K, ties broken by knowledge base order as in score_documents.
+    
+    Returns:
+        One (ranked, fallback) pair per query, as rank_category returns
+    """
+    
+    snapshot, documents, names = knowledge_base_source(category, config, tenant_id)
+    if snapshot is not None:
+        corpus, bounds = snapshot.lowercase_corpus(category)
+        bounds = bounds.tolist()
+        encode = lambda word: word.encode("utf-8")
+    else:
+        lowered = [doc.lower() for doc in documents]
+        corpus = "".join(lowered)
+        bounds = [0, *accumulate(len(doc) for doc in lowered)]
+        encode = lambda word: word
+    
+    num_docs = len(bounds) - 1
+    document = lambda position: document_id(category, names[position], tenant_id)
+    fallback = [document(position) for position in range(min(FALLBACK_DOCS, num_docs))]
+    
+    all_words = list(chain.from_iterable(queries))
+    vocabulary = {word: index for index, word in enumerate(dict.fromkeys(all_words))}
+    rows = np.repeat(np.arange(len(queries)), [len(words) for words in queries])
+    cols = np.fromiter(map(vocabulary.__getitem__, all_words), dtype=np.int64, count=len(all_words))
+    
+    term_rows, term_cols = [], []
+    for word, word_index in vocabulary.items():
+        matches = _matching_documents(corpus, bounds, encode(word))
+        term_rows.extend([word_index] * len(matches))
+        term_cols.extend(matches)
+    
+    # Duplicate (query, word) entries are summed, so repeated words count repeatedly
+    query_matrix = sparse.csr_matrix(
+        (np.ones(len(rows), dtype=np.int64), (rows, cols)), shape=(len(queries), len(vocabulary))
+    )
+    term_matrix = sparse.csr_matrix(
+        (np.ones(len(term_rows), dtype=np.int64), (term_rows, term_cols)), shape=(len(vocabulary), num_docs)
+    )
+    
+    top_k = min(TOP_K, num_docs)
+    tie_break = np.arange(num_docs, dtype=np.int64)
+    chunk = max(1, BATCH_CHUNK_CELLS // max(1, num_docs))
+    results = []
+    
+    for start in range(0, len(queries), chunk):
+        scores = (query_matrix[start:start + chunk] @ term_matrix).toarray()
+        if top_k == 0:
+            results.extend(([], fallback) for _ in range(scores.shape[0]))
+            continue
+        
+        # Higher score first, then earlier document: a single integer key per cell
+        keys = scores * (num_docs + 1) - tie_break
+        if top_k < num_docs:
+            top = np.argpartition(-keys, top_k - 1, axis=1)[:, :top_k]
+        else:
+            top = np.broadcast_to(tie_break, keys.shape)
+        order = np.argsort(-np.take_along_axis(keys, top, axis=1), axis=1)
+        top = np.take_along_axis(top, order, axis=1)
+        top_scores = np.take_along_axis(scores, top, axis=1)
+        
+        for positions, row_scores in zip(top.tolist(), top_scores.tolist()):
+            ranked = [(document(position), score) for position, score in zip(positions, row_scores) if score > 0]
+            results.append((ranked, fallback))
+    
+    return results
+
 def retrieve_context(state: Dict[str, Any]) -> Dict[str, Any]:
     """
     Retrieve relevant context based on ticket category and content.
@@ -24,44 +193,20 @@ def retrieve_context(state: Dict[str, Any]) -> Dict[str, Any]:
     logger.info(f"Retrieving context for ticket {ticket_id} in category: {category}")
     
     try:
-        # Load knowledge base for the category
-        documents = load_knowledge_base(category)
-        
         # Simple retrieval logic - in production, this would use vector similarity
-        relevant_docs = []
-        
-        # Combine search terms
-        search_terms = f"{subject} {description} {reviewer_feedback}".lower()
-        
-        # Score documents based on keyword overlap
-        for doc in documents:
-            doc_lower = doc.lower()
-            score = 0
-            
-            # Simple keyword matching
-            for word in search_terms.split():
-                if len(word) > 3 and word in doc_lower:
-                    score += 1
-            
-            if score > 0:
-                relevant_docs.append((doc, score))
-        
-        # Sort by relevance and take top documents
-        relevant_docs.sort(key=lambda x: x[1], reverse=True)
-        context_docs = [doc for doc, _ in relevant_docs[:3]]
+        search_words = tokenize_query(subject, description, reviewer_feedback)
+        relevant_docs, fallback_docs = rank_category(category, search_words, load_config(), state.get("tenant_id", ""))
         
         # If no relevant docs found, use first few documents
-        if not context_docs:
-            context_docs = documents[:2]
-        
-        context = "\n\n".join(context_docs)
+        context_docs = context_refs(relevant_docs, fallback_docs)
         
         logger.info(f"Retrieved {len(context_docs)} relevant documents for ticket {ticket_id}")
         
-        # Update state
+        # Update state; only document references are kept, the text is
+        # looked up from the document store when a prompt is rendered
         updated_state = {
             **state,
-            "context": context,
+            "context": "",
             "context_docs": context_docs,
             "processing_step": "context_retrieved"
         }
@@ -77,3 +222,136 @@ def retrieve_context(state: Dict[str, Any]) -> Dict[str, Any]:
             "processing_step": "context_retrieved",
             "retrieval_error": str(e)
         }
+
+def retrieve_context_batch(states: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Retrieve context for many tickets at once, for batch jobs.
+    
+    Tickets are grouped by tenant and category and each group is ranked in
+    one rank_category_batch pass. Every returned state matches what
+    retrieve_context would return for that ticket.
+    
+    Args:
+        states: Graph states containing ticket and classification info
+        
+    Returns:
+        Updated states with retrieved context, in input order
+    """
+    
+    config = load_config()
+    by_category: Dict[Tuple[str, str], List[int]] = {}
+    for index, state in enumerate(states):
+        by_category.setdefault((state.get("tenant_id", ""), state.get("category")), []).append(index)
+    
+    results: List[Dict[str, Any]] = [None] * len(states)
+    
+    for (tenant_id, category), indices in by_category.items():
+        logger.info(f"Retrieving context for {len(indices)} tickets in category: {category}")
+        
+        try:
+            queries = [
+                tokenize_query(states[i].get("subject"), states[i].get("description"), states[i].get("reviewer_feedback", ""))
+                for i in indices
+            ]
+            ranked_batch = rank_category_batch(category, queries, config, tenant_id)
+            
+            for index, (relevant_docs, fallback_docs) in zip(indices, ranked_batch):
+                results[index] = {
+                    **states[index],
+                    "context": "",
+                    "context_docs": context_refs(relevant_docs, fallback_docs),
+                    "processing_step": "context_retrieved"
+                }
+                
+        except Exception as e:
+            logger.error(f"Batch context retrieval failed for category {category}: {str(e)}")
+            for index in indices:
+                results[index] = {
+                    **states[index],
+                    "context": f"Error retrieving context for {category} category. Using general guidance.",
+                    "context_docs": [],
+                    "processing_step": "context_retrieved",
+                    "retrieval_error": str(e)
+                }
+    
+    return results
+
+def prefetch_context(state: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Score the ticket against every category's knowledge base.
+    
+    Runs alongside the classifier, so it cannot depend on the category label.
+    The per-category top documents are kept for select_context to pick from
+    once the category is known.
+    
+    Args:
+        state: Graph state containing ticket information
+        
+    Returns:
+        Updated state with per-category candidate documents
+    """
+    
+    config = load_config()
+    ticket_id = state.get("ticket_id")
+    search_words = tokenize_query(
+        state.get("subject", ""),
+        state.get("description", ""),
+        state.get("reviewer_feedback", "")
+    )
+    
+    logger.info(f"Prefetching context for ticket {ticket_id} across all categories")
+    
+    try:
+        candidate_docs = {}
+        for category in config["categories"]:
+            ranked, fallback = rank_category(category, search_words, config, state.get("tenant_id", ""))
+            candidate_docs[category] = {"ranked": ranked, "fallback": fallback}
+        
+        return {
+            **state,
+            "candidate_docs": candidate_docs,
+            "processing_step": "context_prefetched"
+        }
+        
+    except Exception as e:
+        logger.error(f"Context prefetch failed for ticket {ticket_id}: {str(e)}")
+        return {
+            **state,
+            "candidate_docs": {},
+            "processing_step": "context_prefetched",
+            "retrieval_error": str(e)
+        }
+
+def select_context(state: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Join step: pick the prefetched documents for the resolved category.
+    
+    Falls back to a regular retrieve_context call when the prefetch has no
+    candidates for the category (prefetch failure or unknown category).
+    
+    Args:
+        state: Graph state containing the category and prefetched candidates
+        
+    Returns:
+        Updated state with retrieved context
+    """
+    
+    ticket_id = state.get("ticket_id")
+    category = state.get("category")
+    candidates = (state.get("candidate_docs") or {}).get(category)
+    
+    if not candidates:
+        logger.info(f"No prefetched candidates for ticket {ticket_id} in {category}, retrieving directly")
+        return retrieve_context(state)
+    
+    context_docs = context_refs(candidates["ranked"], candidates["fallback"])
+    
+    logger.info(f"Selected {len(context_docs)} prefetched documents for ticket {ticket_id} in category: {category}")
+    
+    return {
+        **state,
+        "context": "",
+        "context_docs": context_docs,
+        "candidate_docs": {},
+        "processing_step": "context_retrieved"
+    }
@@ -1,6 +1,9 @@
 from typing import Dict, Any
 from utils.logger import setup_logger
 from utils.helpers import load_config
+from utils.deadlines import remaining_seconds
+from utils.circuit_breaker import circuit_open
+from utils.metrics import metrics
 
 logger = setup_logger("retry_logic")
 
@@ -12,7 +15,7 @@ def should_retry(state: Dict[str, Any]) -> str:
         state: Graph state containing review results and attempt count
         
     Returns:
-        Next step: "retry", "escalate", or "finalize"
+        Next step: "retry", "escalate", "finalize", or "degrade" while the LLM circuit breaker is open
     """
     
     config = load_config()
@@ -28,6 +31,20 @@ def should_retry(state: Dict[str, Any]) -> str:
         logger.info(f"Ticket {ticket_id} approved, finalizing response")
         return "finalize"
     
+    # LLM calls are failing fast; retrying would only repeat the failure
+    if circuit_open(config):
+        logger.info(f"Ticket {ticket_id} not approved while the LLM circuit breaker is open, degrading")
+        return "degrade"
+    
+    # If the deadline can't cover another draft/review cycle, escalate now
+    remaining = remaining_seconds(state)
+    deadline_config = config.get("deadline", {})
+    cycle = deadline_config.get("retry_cycle_seconds", 0) + deadline_config.get("escalation_reserve_seconds", 0)
+    if attempt_count < max_attempts and remaining is not None and remaining < cycle:
+        logger.info(f"Ticket {ticket_id} has {remaining:.1f}s left, not enough for another attempt; escalating")
+        metrics.increment("deadline_escalations_total")
+        return "escalate"
+    
     # If not approved and under max attempts, retry
     if attempt_count < max_attempts:
         logger.info(f"Ticket {ticket_id} rejected, retrying (attempt {attempt_count + 1}/{max_attempts})")
@@ -1,8 +1,11 @@
 from typing import Dict, Any
-from langchain_openai import ChatOpenAI
-from langchain.schema import HumanMessage
 from utils.logger import setup_logger
-from utils.helpers import load_config, load_prompt_template
+from utils.helpers import load_config
+from utils.llm import build_messages, get_chat_model, invoke_llm
+from utils.deadlines import DeadlineExceeded, remaining_seconds, llm_timeout
+from utils.prompt_assembler import build_reviewer_context
+from utils.model_cascade import record_review_outcome
+from utils.circuit_breaker import CircuitOpen
 
 logger = setup_logger("reviewer")
 
@@ -23,31 +26,32 @@ def review_draft(state: Dict[str, Any]) -> Dict[str, Any]:
     description = state.get("description")
     category = state.get("category")
     draft_response = state.get("draft_response")
-    context = state.get("context", "")
     attempt_count = state.get("attempt_count", 0)
+    reserve = config.get("deadline", {}).get("escalation_reserve_seconds", 0)
     
     logger.info(f"Reviewing draft for ticket {ticket_id} (attempt {attempt_count})")
     
     try:
         # Initialize LLM
-        llm = ChatOpenAI(
+        llm = get_chat_model(
             model=config["llm"]["model"],
             temperature=0.1,  # Lower temperature for consistent review
             max_tokens=500
         )
         
         # Load and format prompt
-        prompt_template = load_prompt_template("reviewer_prompt.txt")
-        prompt = prompt_template.format(
+        messages = build_messages(
+            "reviewer",
+            config,
             subject=subject,
             description=description,
             category=category,
             draft_response=draft_response,
-            context=context
+            context=build_reviewer_context(state, draft_response or "", config)
         )
         
         # Get review
-        response = llm.invoke([HumanMessage(content=prompt)])
+        response = invoke_llm("reviewer", llm, messages, timeout=llm_timeout(state, "reviewer", reserve))
         review_result = response.content.strip()
         
         # Parse review result
@@ -63,6 +67,9 @@ def review_draft(state: Dict[str, Any]) -> Dict[str, Any]:
                 feedback = "Response needs improvement"
             logger.info(f"Draft rejected for ticket {ticket_id}: {feedback}")
         
+        if state.get("draft_model"):
+            record_review_outcome(state["draft_model"], approved)
+        
         # Update state
         updated_state = {
             **state,
@@ -75,6 +82,28 @@ def review_draft(state: Dict[str, Any]) -> Dict[str, Any]:
         
     except Exception as e:
         logger.error(f"Review failed for ticket {ticket_id}: {str(e)}")
+        
+        # Out of time: don't approve an unreviewed draft, let should_retry escalate
+        remaining = remaining_seconds(state)
+        if isinstance(e, DeadlineExceeded) or (remaining is not None and remaining <= reserve):
+            return {
+                **state,
+                "review_approved": False,
+                "reviewer_feedback": "Review not completed before the ticket deadline",
+                "processing_step": "reviewed",
+                "review_error": str(e)
+            }
+        
+        # The LLM is failing fast; don't approve an unreviewed draft, should_retry degrades
+        if isinstance(e, CircuitOpen):
+            return {
+                **state,
+                "review_approved": False,
+                "reviewer_feedback": "Review not completed while the LLM provider is unavailable",
+                "processing_step": "reviewed",
+                "review_error": str(e)
+            }
+        
         # Default to approval on error to avoid infinite loops
         return {
             **state,
@@ -0,0 +1,122 @@
+import contextvars
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, Any, Optional
+from utils.logger import setup_logger
+from utils.helpers import load_config
+from nodes.draft_generator import generate_draft
+from nodes.reviewer import review_draft
+
+logger = setup_logger("speculative_drafter")
+
+def get_speculative_settings(category: str, config: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Look up the speculative drafting settings for a category.
+
+    Args:
+        category: Resolved ticket category
+        config: Loaded settings
+
+    Returns:
+        Settings with num_drafts and temperatures, or None if disabled for the category
+    """
+
+    speculative_config = config.get("speculative_drafts", {})
+    if not speculative_config.get("enabled", False):
+        return None
+
+    category_config = (speculative_config.get("categories") or {}).get(category)
+    if not category_config or category_config.get("num_drafts", 1) < 2:
+        return None
+
+    num_drafts = category_config["num_drafts"]
+    temperatures = category_config.get("temperatures") or [config["llm"]["temperature"]]
+
+    # Cycle the configured temperatures if there are more drafts than values
+    return {
+        "num_drafts": num_drafts,
+        "temperatures": [temperatures[i % len(temperatures)] for i in range(num_drafts)]
+    }
+
+def _draft_and_review(state: Dict[str, Any], temperature: float) -> Dict[str, Any]:
+    """Generate one draft variant and review it."""
+    drafted = generate_draft(state, temperature=temperature)
+    return review_draft(drafted)
+
+def generate_speculative_drafts(state: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Generate several drafts concurrently and keep the first approved one.
+
+    Each variant is drafted at its own temperature and reviewed as soon as it
+    is ready. One round counts as a single attempt, so a fully rejected round
+    goes through the normal retry/escalation routing.
+
+    Args:
+        state: Graph state containing ticket, category, and context
+
+    Returns:
+        Updated state with the selected draft and its review result
+    """
+
+    config = load_config()
+    ticket_id = state.get("ticket_id")
+    category = state.get("category")
+    settings = get_speculative_settings(category, config)
+
+    if settings is None:
+        # Routing only sends enabled categories here; degrade to a single draft
+        return review_draft(generate_draft(state))
+
+    temperatures = settings["temperatures"]
+    logger.info(f"Generating {len(temperatures)} speculative drafts for ticket {ticket_id}")
+
+    executor = ThreadPoolExecutor(max_workers=len(temperatures), thread_name_prefix="speculative_draft")
+    rejected = []
+
+    try:
+        # Run each variant in a copy of the caller's context so contextvars
+        # (e.g. the cassette session) carry over to the worker threads
+        futures = {
+            executor.submit(contextvars.copy_context().run, _draft_and_review, state, temperature): variant
+            for variant, temperature in enumerate(temperatures, 1)
+        }
+
+        for future in as_completed(futures):
+            variant = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                logger.error(f"Speculative draft {variant} failed for ticket {ticket_id}: {str(e)}")
+                continue
+
+            if result.get("review_approved"):
+                logger.info(f"Speculative draft {variant} approved for ticket {ticket_id}")
+                return {
+                    **result,
+                    "processing_step": "reviewed"
+                }
+
+            rejected.append((variant, result))
+    finally:
+        # Don't wait for slower variants once a winner is found
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    logger.info(f"All {len(temperatures)} speculative drafts rejected for ticket {ticket_id}")
+
+    if not rejected:
+        return {
+            **review_draft(generate_draft(state)),
+            "generation_error": "All speculative drafts failed"
+        }
+
+    # Keep the first finished draft and pass every variant's feedback to the retry
+    _, first_result = rejected[0]
+    combined_feedback = " | ".join(
+        f"Draft {variant}: {result.get('reviewer_feedback', '')}" for variant, result in rejected
+    )
+
+    return {
+        **first_result,
+        "review_approved": False,
+        "reviewer_feedback": combined_feedback,
+        "processing_step": "reviewed"
+    }
@@ -0,0 +1,437 @@
+#!/usr/bin/env python3
+"""
+Long-running HTTP service around process_ticket.
+
+Usage:
+    python -m service.http_server [--host HOST] [--port PORT]
+
+Endpoints:
+    POST /tickets                 submit {"subject", "description"}; 202 with the ticket ID
+    POST /tickets?wait=true       submit and wait for the result
+    GET  /tickets/{id}            processing status
+    GET  /tickets/{id}/result     final result (202 while still processing)
+    GET  /healthz                 liveness
+    GET  /readyz                  readiness (warm and below the in-flight limit)
+    GET  /metrics                 metrics snapshot
+
+The compiled graph, config, prompts, knowledge bases and LLM clients are
+loaded once at startup and stay warm across requests. When max_in_flight
+tickets are already running, new submissions are shed with a 503. With the
+scheduler enabled, limits are per category instead (see service/scheduler.py).
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from utils.logger import setup_logger
+from utils.helpers import load_config, load_knowledge_base, create_ticket_id, validate_ticket_id
+from utils.metrics import metrics
+from utils.memory_monitor import over_soft_limit
+from utils.tenant_kb import get_tenant_knowledge_bases, validate_tenant_id
+from service.single_flight import SingleFlight
+from service.scheduler import SchedulerSaturated, TicketScheduler
+
+logger = setup_logger("http_server")
+
+MAX_BODY_BYTES = 1024 * 1024
+
+STATUS_TEXT = {
+    200: "OK",
+    202: "Accepted",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    409: "Conflict",
+    413: "Payload Too Large",
+    503: "Service Unavailable",
+}
+
+Processor = Callable[..., Awaitable[Dict[str, Any]]]
+
+class HTTPError(Exception):
+    """Error that maps directly to an HTTP response."""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+class TicketService:
+    """
+    Tracks submitted tickets and runs them through the processor.
+
+    Args:
+        config: Loaded settings
+        processor: Coroutine taking (subject, description, ticket_id=..., tenant_id=...); defaults to main.process_ticket
+    """
+
+    def __init__(self, config: Dict[str, Any], processor: Optional[Processor] = None):
+        service_config = config.get("service", {})
+        self.config = config
+        self.max_in_flight = service_config.get("max_in_flight", 32)
+        self.max_stored_results = service_config.get("max_stored_results", 10000)
+        self.retry_after = service_config.get("retry_after_seconds", 1)
+        self.wait_timeout = service_config.get("wait_timeout_seconds", 120)
+        self.processor = processor
+        self.jobs: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self.in_flight = 0
+        self.single_flight = None
+        self.scheduler = TicketScheduler(config) if config.get("scheduler", {}).get("enabled", False) else None
+        self.ready = False
+        self._tasks = set()
+
+    def warm_up(self):
+        """Load everything a ticket needs before accepting traffic."""
+        start = time.perf_counter()
+
+        if self.processor is None:
+            # Importing main compiles the graph
+            from main import process_ticket
+            self.processor = process_ticket
+
+        if self.config.get("single_flight", {}).get("enabled", False):
+            self.single_flight = SingleFlight(self.processor)
+            self.processor = self.single_flight.process
+
+        from utils.llm import build_messages, get_chat_model
+
+        for category in self.config["categories"]:
+            load_knowledge_base(category)
+
+        fields = {key: "" for key in [
+            "subject", "description", "category", "context", "draft_response",
+            "attempts", "failed_attempts", "reviewer_feedback"
+        ]}
+        for prompt in ["classifier", "generator", "reviewer", "escalation"]:
+            build_messages(prompt, self.config, **fields)
+
+        llm_config = self.config["llm"]
+        try:
+            get_chat_model(model=llm_config["model"], temperature=llm_config["temperature"], max_tokens=100)
+            get_chat_model(model=llm_config["model"], temperature=llm_config["temperature"], max_tokens=llm_config["max_tokens"])
+            get_chat_model(model=llm_config["model"], temperature=0.1, max_tokens=500)
+        except Exception as e:
+            logger.warning(f"Could not create LLM clients during warm-up: {str(e)}")
+
+        self.ready = True
+        logger.info(f"Service warmed up in {time.perf_counter() - start:.2f}s")
+
+    @property
+    def saturated(self) -> bool:
+        if self.scheduler is not None:
+            # Bulkheads shed per category at admission instead
+            return False
+        return self.in_flight >= self.max_in_flight
+
+    def submit(self, subject: str, description: str, ticket_id: str = "", tenant_id: str = "") -> Dict[str, Any]:
+        """
+        Start processing a ticket.
+
+        Raises:
+            HTTPError: 409 when ticket_id is already in use, 503 when the service is saturated or not ready
+        """
+
+        if not self.ready:
+            raise HTTPError(503, "Service is warming up")
+        if ticket_id and ticket_id in self.jobs:
+            raise HTTPError(409, f"Ticket {ticket_id} already exists")
+        if self.saturated:
+            metrics.increment("service_shed_total")
+            raise HTTPError(503, "Too many tickets in flight")
+        if over_soft_limit():
+            metrics.increment("service_shed_total")
+            raise HTTPError(503, "Memory soft limit reached")
+
+        admission = None
+        if self.scheduler is not None:
+            try:
+                admission = self.scheduler.admit(subject, description)
+            except SchedulerSaturated as e:
+                metrics.increment("service_shed_total")
+                raise HTTPError(503, str(e))
+
+        ticket_id = ticket_id or create_ticket_id()
+        job = {
+            "ticket_id": ticket_id,
+            "tenant_id": tenant_id,
+            "status": "processing",
+            "submitted_at": time.time(),
+            "finished_at": None,
+            "result": None,
+            "done": asyncio.Event(),
+        }
+        self.jobs[ticket_id] = job
+        self._evict_finished()
+
+        self.in_flight += 1
+        metrics.set_gauge("service_in_flight", self.in_flight)
+
+        task = asyncio.create_task(self._run(job, subject, description, admission))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return job
+
+    async def _run(self, job: Dict[str, Any], subject: str, description: str,
+                   admission: Optional[Dict[str, Any]] = None):
+        start = time.perf_counter()
+        try:
+            if admission is not None:
+                job["priority_class"] = admission["priority_class"]
+                result = await self.scheduler.run(
+                    admission, lambda: self.processor(subject, description, ticket_id=job["ticket_id"],
+                                                      tenant_id=job["tenant_id"])
+                )
+            else:
+                result = await self.processor(subject, description, ticket_id=job["ticket_id"], tenant_id=job["tenant_id"])
+            job["status"] = "failed" if result.get("processing_step") == "error" else "completed"
+            job["result"] = result
+        except Exception as e:
+            logger.error(f"Ticket {job['ticket_id']} failed: {str(e)}")
+            job["status"] = "failed"
+            job["result"] = {"ticket_id": job["ticket_id"], "error": str(e)}
+        finally:
+            job["finished_at"] = time.time()
+            self.in_flight -= 1
+            metrics.set_gauge("service_in_flight", self.in_flight)
+            metrics.observe("service_ticket_seconds", time.perf_counter() - start)
+            metrics.increment("service_tickets_total", status=job["status"])
+            job["done"].set()
+
+    def _evict_finished(self):
+        """Drop the oldest finished jobs beyond max_stored_results."""
+        while len(self.jobs) > self.max_stored_results:
+            oldest_id = next((tid for tid, job in self.jobs.items() if job["done"].is_set()), None)
+            if oldest_id is None:
+                break
+            del self.jobs[oldest_id]
+
+    def get_job(self, ticket_id: str) -> Dict[str, Any]:
+        job = self.jobs.get(ticket_id)
+        if job is None:
+            raise HTTPError(404, f"Unknown ticket {ticket_id}")
+        return job
+
+    @staticmethod
+    def describe(job: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "ticket_id": job["ticket_id"],
+            "status": job["status"],
+            "submitted_at": job["submitted_at"],
+            "finished_at": job["finished_at"],
+        }
+
+    async def wait(self, job: Dict[str, Any]):
+        await asyncio.wait_for(job["done"].wait(), timeout=self.wait_timeout)
+
+    async def drain(self):
+        """Wait for every in-flight ticket to finish."""
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+async def _read_request(reader: asyncio.StreamReader) -> Tuple[str, str, Dict[str, str], bytes]:
+    request_line = (await reader.readline()).decode("latin-1").strip()
+    if not request_line:
+        raise ConnectionError("Empty request")
+    parts = request_line.split()
+    if len(parts) != 3:
+        raise HTTPError(400, "Malformed request line")
+    method, target, _ = parts
+
+    headers = {}
+    while True:
+        line = (await reader.readline()).decode("latin-1")
+        if line in ("\r\n", "\n", ""):
+            break
+        name, _, value = line.partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+    try:
+        length = int(headers.get("content-length", "0") or 0)
+    except ValueError:
+        raise HTTPError(400, "Invalid Content-Length")
+    if length < 0:
+        raise HTTPError(400, "Invalid Content-Length")
+    if length > MAX_BODY_BYTES:
+        raise HTTPError(413, "Request body too large")
+    body = await reader.readexactly(length) if length else b""
+    return method.upper(), target, headers, body
+
+def _write_response(writer: asyncio.StreamWriter, status: int, payload: Dict[str, Any],
+                    extra_headers: Optional[Dict[str, str]] = None):
+    body = json.dumps(payload, default=str).encode("utf-8")
+    headers = {
+        "Content-Type": "application/json",
+        "Content-Length": str(len(body)),
+        "Connection": "close",
+        **(extra_headers or {}),
+    }
+    head = f"HTTP/1.1 {status} {STATUS_TEXT.get(status, 'Unknown')}\r\n"
+    head += "".join(f"{name}: {value}\r\n" for name, value in headers.items())
+    writer.write(head.encode("latin-1") + b"\r\n" + body)
+
+async def route_request(service: TicketService, method: str, target: str, body: bytes) -> Tuple[int, Dict[str, Any]]:
+    """Dispatch a request to the matching endpoint."""
+    url = urlsplit(target)
+    path = url.path.rstrip("/") or "/"
+    query = parse_qs(url.query)
+
+    if path == "/healthz":
+        return 200, {"status": "ok"}
+
+    if path == "/readyz":
+        if service.ready and not service.saturated:
+            return 200, {"status": "ready", "in_flight": service.in_flight}
+        return 503, {"status": "not_ready" if not service.ready else "saturated", "in_flight": service.in_flight}
+
+    if path == "/metrics":
+        return 200, {
+            **metrics.snapshot(),
+            "service": {
+                "in_flight": service.in_flight,
+                "max_in_flight": service.max_in_flight,
+                "stored_jobs": len(service.jobs),
+                "coalescing_groups": service.single_flight.in_flight if service.single_flight else 0,
+            },
+            "scheduler": {
+                "bulkheads": {
+                    name: {"capacity": bulkhead.capacity, "active": bulkhead.active, "waiting": bulkhead.waiting}
+                    for name, bulkhead in service.scheduler.bulkheads.items()
+                },
+                "queue_wait_seconds": service.scheduler.queue_wait_report(),
+            } if service.scheduler else None,
+        }
+
+    if path == "/tickets":
+        if method != "POST":
+            raise HTTPError(405, "Use POST to submit tickets")
+        try:
+            payload = json.loads(body or b"{}")
+        except ValueError:
+            raise HTTPError(400, "Body must be JSON")
+        if not isinstance(payload, dict):
+            raise HTTPError(400, "Body must be a JSON object")
+        subject = str(payload.get("subject", "")).strip()
+        description = str(payload.get("description", "")).strip()
+        if not subject or not description:
+            raise HTTPError(400, "Both subject and description are required")
+        ticket_id = str(payload.get("ticket_id", "")).strip()
+        tenant_id = str(payload.get("tenant_id", "")).strip()
+        try:
+            if ticket_id:
+                validate_ticket_id(ticket_id)
+            if tenant_id:
+                validate_tenant_id(tenant_id)
+        except ValueError as e:
+            raise HTTPError(400, str(e))
+        if tenant_id and not get_tenant_knowledge_bases(service.config).knows(tenant_id):
+            raise HTTPError(400, f"Unknown tenant_id '{tenant_id}'")
+
+        job = service.submit(subject, description, ticket_id, tenant_id)
+
+        if query.get("wait", ["false"])[0].lower() in ("1", "true", "yes"):
+            try:
+                await service.wait(job)
+            except asyncio.TimeoutError:
+                return 202, service.describe(job)
+            return 200, {**service.describe(job), "result": job["result"]}
+
+        return 202, {
+            **service.describe(job),
+            "status_url": f"/tickets/{job['ticket_id']}",
+            "result_url": f"/tickets/{job['ticket_id']}/result",
+        }
+
+    segments = path.strip("/").split("/")
+    if segments[0] == "tickets" and len(segments) in (2, 3):
+        if method != "GET":
+            raise HTTPError(405, "Use GET to read tickets")
+        job = service.get_job(segments[1])
+        if len(segments) == 2:
+            return 200, service.describe(job)
+        if segments[2] == "result":
+            if not job["done"].is_set():
+                return 202, service.describe(job)
+            return 200, {**service.describe(job), "result": job["result"]}
+
+    raise HTTPError(404, f"No route for {path}")
+
+def make_connection_handler(service: TicketService):
+    """Build the asyncio stream handler for a service."""
+
+    async def handle_connection(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        route = "unknown"
+        status = 500
+        extra_headers = None
+        try:
+            method, target, _, body = await _read_request(reader)
+            route = urlsplit(target).path.split("/")[1] if "/" in target else target
+            status, payload = await route_request(service, method, target, body)
+        except ConnectionError:
+            writer.close()
+            return
+        except HTTPError as e:
+            status, payload = e.status, {"error": e.message}
+            if e.status == 503:
+                extra_headers = {"Retry-After": str(service.retry_after)}
+        except Exception as e:
+            logger.error(f"Unhandled error serving request: {str(e)}")
+            status, payload = 500, {"error": "Internal server error"}
+
+        metrics.increment("service_requests_total", route=route, status=status)
+        try:
+            _write_response(writer, status, payload, extra_headers)
+            await writer.drain()
+        finally:
+            writer.close()
+
+    return handle_connection
+
+async def serve(service: TicketService, host: str, port: int) -> asyncio.AbstractServer:
+    """Warm the service up and start listening."""
+    threads = service.config.get("service", {}).get("executor_threads")
+    if threads:
+        # Sync nodes run in the loop's default executor; size it for the in-flight limit
+        asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(max_workers=threads))
+
+    service.warm_up()
+    server = await asyncio.start_server(make_connection_handler(service), host, port)
+    sockets = ", ".join(str(sock.getsockname()) for sock in server.sockets)
+    logger.info(f"Support agent service listening on {sockets}")
+    return server
+
+async def run_forever(host: str, port: int):
+    config = load_config()
+    service = TicketService(config)
+    server = await serve(service, host, port)
+    async with server:
+        try:
+            await server.serve_forever()
+        finally:
+            await service.drain()
+
+def main():
+    config = load_config().get("service", {})
+    parser = argparse.ArgumentParser(description="Support ticket agent HTTP service")
+    parser.add_argument("--host", default=config.get("host", "127.0.0.1"))
+    parser.add_argument("--port", type=int, default=config.get("port", 8080))
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(run_forever(args.host, args.port))
+    except KeyboardInterrupt:
+        logger.info("Service stopped")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Consumer that works the durable ticket queue.
+
+Usage:
+    python -m service.queue_consumer [--batch-size N] [--once]
+
+Each iteration leases a batch from the work queue, runs the tickets through
+process_ticket concurrently and acks or nacks each one. Every
+maintenance_interval seconds the consumer refreshes the queue depth gauges and
+deletes done and dead tickets older than the retention. Run several consumer
+processes against the same queue file to scale out.
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from utils.logger import setup_logger
+from utils.helpers import load_config
+from utils.metrics import metrics
+from utils.memory_monitor import wait_for_memory
+from service.work_queue import WorkQueue
+
+logger = setup_logger("queue_consumer")
+
+Processor = Callable[..., Awaitable[Dict[str, Any]]]
+
+class QueueConsumer:
+    """
+    Lease, process and acknowledge queued tickets.
+
+    Args:
+        queue: Work queue to consume
+        processor: Coroutine taking (subject, description, ticket_id=..., tenant_id=...); defaults to main.process_ticket
+        batch_size: Tickets leased and processed together
+        poll_interval: Seconds to sleep when the queue is empty
+        maintenance_interval: Seconds between queue stats refreshes and purges
+        retention_seconds: Age after which done and dead tickets are purged; None keeps them
+    """
+
+    def __init__(self, queue: WorkQueue, processor: Optional[Processor] = None,
+                 batch_size: int = 16, poll_interval: float = 1.0, maintenance_interval: float = 60.0,
+                 retention_seconds: Optional[float] = None):
+        self.queue = queue
+        self.processor = processor
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.maintenance_interval = maintenance_interval
+        self.retention_seconds = retention_seconds
+        self._stopping = asyncio.Event()
+        self._next_maintenance = 0.0
+
+    async def _process(self, item: Dict[str, Any]):
+        start = time.perf_counter()
+        try:
+            result = await self.processor(item["subject"], item["description"], ticket_id=item["ticket_id"],
+                                          tenant_id=item.get("tenant_id", ""))
+        except Exception as e:
+            logger.error(f"Queued ticket {item['ticket_id']} raised: {str(e)}")
+            await asyncio.to_thread(self.queue.nack, item, str(e))
+            return
+
+        metrics.observe("work_queue_processing_seconds", time.perf_counter() - start)
+        if result.get("processing_step") == "error":
+            await asyncio.to_thread(self.queue.nack, item, result.get("escalation_error", "processing error"))
+        else:
+            await asyncio.to_thread(self.queue.ack, item)
+
+    async def run_once(self) -> int:
+        """
+        Lease and process one batch.
+
+        Returns:
+            Number of tickets processed
+        """
+
+        if self.processor is None:
+            # Importing main compiles the graph
+            from main import process_ticket
+            self.processor = process_ticket
+
+        # Leave tickets queued while the process is over its memory soft limit
+        await wait_for_memory()
+        batch = await asyncio.to_thread(self.queue.lease, self.batch_size)
+        if batch:
+            logger.info(f"Leased {len(batch)} queued tickets")
+            await asyncio.gather(*(self._process(item) for item in batch))
+        return len(batch)
+
+    def maintain(self):
+        """Purge finished tickets past the retention and refresh the queue gauges."""
+        if self.retention_seconds is not None:
+            purged = self.queue.purge_finished(self.retention_seconds)
+            if purged:
+                metrics.increment("work_queue_purged_total", purged)
+                logger.info(f"Purged {purged} finished tickets from the work queue")
+        self.queue.stats()
+
+    async def run(self):
+        """Work the queue until stop() is called."""
+        logger.info(f"Queue consumer {self.queue.consumer_id} started")
+        while not self._stopping.is_set():
+            processed = await self.run_once()
+            # stats() and the purge scan the table, so keep them off the per-batch path
+            if time.monotonic() >= self._next_maintenance:
+                await asyncio.to_thread(self.maintain)
+                self._next_maintenance = time.monotonic() + self.maintenance_interval
+            if not processed:
+                try:
+                    await asyncio.wait_for(self._stopping.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+        logger.info(f"Queue consumer {self.queue.consumer_id} stopped")
+
+    def stop(self):
+        """Finish the current batch and exit run()."""
+        self._stopping.set()
+
+def main():
+    config = load_config()
+    queue_config = config.get("work_queue", {})
+    parser = argparse.ArgumentParser(description="Process tickets from the durable work queue")
+    parser.add_argument("--batch-size", type=int, default=queue_config.get("batch_size", 16))
+    parser.add_argument("--once", action="store_true", help="Process a single batch and exit")
+    args = parser.parse_args()
+
+    consumer = QueueConsumer(
+        WorkQueue.from_config(config),
+        batch_size=args.batch_size,
+        poll_interval=queue_config.get("poll_interval_seconds", 1.0),
+        maintenance_interval=queue_config.get("maintenance_interval_seconds", 60.0),
+        retention_seconds=queue_config.get("finished_retention_seconds")
+    )
+
+    try:
+        asyncio.run(consumer.run_once() if args.once else consumer.run())
+    except KeyboardInterrupt:
+        logger.info("Queue consumer interrupted; unacked leases will expire and be retried")
+
+if __name__ == "__main__":
+    main()
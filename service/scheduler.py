@@ -0,0 +1,186 @@
+"""
+Priority-aware ticket scheduler with per-category bulkheads.
+
+Tickets are assigned a priority class before they enter the graph, from a
+local keyword classification and urgency keywords. Each category has its own
+concurrency pool (bulkhead), so a flood of General tickets can only fill the
+General pool and never delays Security or Technical tickets. Within a pool,
+waiting tickets are started in priority order, urgent tickets first.
+"""
+
+import asyncio
+import heapq
+import itertools
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Tuple
+
+from nodes.classifier import category_keywords, keyword_classify
+from utils.logger import setup_logger
+from utils.metrics import metrics
+
+logger = setup_logger("scheduler")
+
+class SchedulerSaturated(Exception):
+    """Raised when a bulkhead's wait queue is full."""
+
+class Bulkhead:
+    """
+    Concurrency pool whose waiters are released in priority order.
+
+    Args:
+        name: Pool name (the category)
+        capacity: Tickets allowed to run at once
+        max_queue: Tickets allowed to wait; further admissions are rejected
+    """
+
+    def __init__(self, name: str, capacity: int, max_queue: int):
+        self.name = name
+        self.capacity = capacity
+        self.max_queue = max_queue
+        self.active = 0
+        self.waiting = 0
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+
+    def reserve(self):
+        """Claim a place in the wait queue, or raise SchedulerSaturated if it is full."""
+        if self.waiting >= self.max_queue:
+            raise SchedulerSaturated(f"Bulkhead {self.name} queue is full")
+        self.waiting += 1
+
+    async def acquire(self, priority: int, sequence: int):
+        """Wait for a running slot after reserve(); lower priority values go first."""
+        if self.active < self.capacity and not self._waiters:
+            self.waiting -= 1
+            self.active += 1
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, sequence, future))
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # The slot was handed over just as we were cancelled; pass it on
+                self.release()
+            raise
+        finally:
+            self.waiting -= 1
+
+    def release(self):
+        """Hand the slot to the highest-priority waiter, or free it."""
+        while self._waiters:
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                future.set_result(None)
+                return
+        self.active -= 1
+
+class TicketScheduler:
+    """
+    Admit tickets into per-category bulkheads and run them by priority.
+
+    Args:
+        config: Loaded settings; reads the scheduler and keyword_classification sections
+    """
+
+    def __init__(self, config: Dict[str, Any]):
+        scheduler_config = config.get("scheduler", {})
+        self.category_keywords = category_keywords(config)
+        self.urgency_keywords = [keyword.lower() for keyword in scheduler_config.get("urgency_keywords", [])]
+        self.priorities = scheduler_config.get("priorities", {})
+        max_queue = scheduler_config.get("max_queue_per_bulkhead", 200)
+
+        bulkhead_sizes = scheduler_config.get("bulkheads", {})
+        self.bulkheads = {
+            category: Bulkhead(category, bulkhead_sizes.get(category, 4), max_queue)
+            for category in config["categories"]
+        }
+        self._sequence = itertools.count()
+
+    def classify(self, subject: str, description: str) -> Dict[str, Any]:
+        """
+        Derive the bulkhead and priority class for a ticket.
+
+        Returns:
+            Admission details: category, urgent flag, priority class name and numeric priority
+        """
+
+        category = keyword_classify(subject, description, self.category_keywords)
+        if category not in self.bulkheads:
+            category = "General"
+
+        text = f"{subject} {description}".lower()
+        urgent = any(keyword in text for keyword in self.urgency_keywords)
+
+        # Urgent tickets sort ahead of normal tickets of the same category
+        base = self.priorities.get(category, len(self.priorities))
+        return {
+            "category": category,
+            "urgent": urgent,
+            "priority_class": f"{category.lower()}_{'urgent' if urgent else 'normal'}",
+            "priority": base * 2 + (0 if urgent else 1),
+        }
+
+    def admit(self, subject: str, description: str) -> Dict[str, Any]:
+        """
+        Reserve a place for a ticket in its bulkhead queue.
+
+        Raises:
+            SchedulerSaturated: If the bulkhead's queue is full
+        """
+
+        admission = self.classify(subject, description)
+        bulkhead = self.bulkheads[admission["category"]]
+        try:
+            bulkhead.reserve()
+        except SchedulerSaturated:
+            metrics.increment("scheduler_rejected_total", bulkhead=bulkhead.name)
+            raise
+
+        admission["sequence"] = next(self._sequence)
+        admission["admitted_at"] = time.perf_counter()
+        metrics.set_gauge("scheduler_queue_depth", bulkhead.waiting, bulkhead=bulkhead.name)
+        return admission
+
+    async def run(self, admission: Dict[str, Any], work: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run admitted work once its bulkhead has a free slot.
+
+        Args:
+            admission: Result of admit()
+            work: Coroutine factory to run inside the bulkhead
+
+        Returns:
+            The work's result
+        """
+
+        bulkhead = self.bulkheads[admission["category"]]
+        await bulkhead.acquire(admission["priority"], admission["sequence"])
+
+        wait = time.perf_counter() - admission["admitted_at"]
+        metrics.observe("scheduler_queue_wait_seconds", wait, priority_class=admission["priority_class"])
+        metrics.set_gauge("scheduler_queue_depth", bulkhead.waiting, bulkhead=bulkhead.name)
+        metrics.set_gauge("scheduler_active", bulkhead.active, bulkhead=bulkhead.name)
+
+        try:
+            return await work()
+        finally:
+            bulkhead.release()
+            metrics.set_gauge("scheduler_active", bulkhead.active, bulkhead=bulkhead.name)
+
+    async def submit(self, subject: str, description: str, work: Callable[[], Awaitable[Any]]) -> Any:
+        """Admit and run in one step."""
+        return await self.run(self.admit(subject, description), work)
+
+    def queue_wait_report(self) -> Dict[str, Dict[str, float]]:
+        """Queue wait percentiles (seconds) per priority class."""
+        report = {}
+        for category in self.bulkheads:
+            for urgency in ("urgent", "normal"):
+                priority_class = f"{category.lower()}_{urgency}"
+                if metrics.sample_count("scheduler_queue_wait_seconds", priority_class=priority_class):
+                    report[priority_class] = {
+                        "p50": metrics.percentile("scheduler_queue_wait_seconds", 50, priority_class=priority_class),
+                        "p99": metrics.percentile("scheduler_queue_wait_seconds", 99, priority_class=priority_class),
+                    }
+        return report
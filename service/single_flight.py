@@ -0,0 +1,135 @@
+"""
+Single-flight coalescing of identical in-flight tickets.
+
+During an incident many customers submit essentially the same ticket within
+seconds. Tickets whose normalized subject and description match a ticket that
+is already being processed attach to that computation instead of running the
+graph again; each caller still gets its own ticket ID.
+"""
+
+import asyncio
+import copy
+import hashlib
+import re
+from typing import Any, Awaitable, Callable, Dict
+
+from utils.logger import setup_logger
+from nodes.escalator import get_escalation_worker
+from utils.helpers import create_ticket_id, load_config
+from utils.metrics import metrics
+from utils.results_store import record_result
+
+logger = setup_logger("single_flight")
+
+_PUNCTUATION = re.compile(r"[^\w\s]")
+_WHITESPACE = re.compile(r"\s+")
+
+def normalize_ticket_text(text: str) -> str:
+    """Lowercase, drop punctuation and collapse whitespace."""
+    return _WHITESPACE.sub(" ", _PUNCTUATION.sub(" ", text.lower())).strip()
+
+def ticket_fingerprint(subject: str, description: str, tenant_id: str = "") -> str:
+    """Key under which normalized-equal tickets are coalesced; tickets of different tenants never are."""
+    normalized = f"{normalize_ticket_text(subject)}\n{normalize_ticket_text(description)}"
+    if tenant_id:
+        normalized = f"{tenant_id}\n{normalized}"
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+class SingleFlight:
+    """
+    Coalesce identical tickets that are processed at the same time.
+
+    The first caller for a fingerprint (the leader) runs the processor;
+    callers arriving while it is still running (followers) await the same
+    task and receive a copy of its result under their own ticket ID.
+
+    Args:
+        processor: Coroutine taking (subject, description, ticket_id=..., tenant_id=...)
+    """
+
+    def __init__(self, processor: Callable[..., Awaitable[Dict[str, Any]]]):
+        self.processor = processor
+        self._in_flight: Dict[str, Dict[str, Any]] = {}
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._in_flight)
+
+    async def process(self, subject: str, description: str, ticket_id: str = "", tenant_id: str = "") -> Dict[str, Any]:
+        """
+        Process a ticket, sharing the computation with an identical in-flight ticket.
+
+        Args:
+            subject: Ticket subject line
+            description: Detailed ticket description
+            ticket_id: Optional ticket ID; one is generated if empty
+            tenant_id: Optional tenant whose knowledge base is used
+
+        Returns:
+            Final processing result for this caller's ticket ID
+        """
+
+        ticket_id = ticket_id or create_ticket_id()
+        key = ticket_fingerprint(subject, description, tenant_id)
+        flight = self._in_flight.get(key)
+
+        if flight is None:
+            task = asyncio.create_task(self.processor(subject, description, ticket_id=ticket_id, tenant_id=tenant_id))
+            flight = {"leader_id": ticket_id, "task": task, "followers": 0}
+            self._in_flight[key] = flight
+            task.add_done_callback(lambda _: self._land(key))
+            metrics.increment("single_flight_leaders_total")
+            metrics.set_gauge("single_flight_in_flight", len(self._in_flight))
+
+            # Shield so a cancelled leader caller doesn't cancel its followers' result
+            return await asyncio.shield(task)
+
+        flight["followers"] += 1
+        leader_id = flight["leader_id"]
+        metrics.increment("single_flight_coalesced_total")
+        logger.info(f"Ticket {ticket_id} coalesced with in-flight ticket {leader_id}")
+
+        shared_result = await asyncio.shield(flight["task"])
+        result = self._personalize(shared_result, subject, description, ticket_id, leader_id)
+        # The leader's result was stored by the processor; store the follower's too
+        record_result(result)
+        return result
+
+    def _land(self, key: str):
+        """Forget a finished computation so later tickets run fresh."""
+        self._in_flight.pop(key, None)
+        metrics.set_gauge("single_flight_in_flight", len(self._in_flight))
+
+    def _personalize(self, shared_result: Dict[str, Any], subject: str, description: str,
+                     ticket_id: str, leader_id: str) -> Dict[str, Any]:
+        """Copy the leader's result under the follower's own ticket ID."""
+        result = copy.deepcopy(shared_result)
+        result.update({
+            "ticket_id": ticket_id,
+            "subject": subject,
+            "description": description,
+            "coalesced_with": leader_id,
+        })
+
+        for field in ("final_response", "escalation_message"):
+            if isinstance(result.get(field), str):
+                result[field] = result[field].replace(leader_id, ticket_id)
+
+        if result.get("escalated"):
+            # The leader's escalation row only covers the leader; log the follower too.
+            # The worker batches the CSV write off the event loop, and skips the
+            # summary because the row already carries its message.
+            try:
+                get_escalation_worker(load_config()).submit({
+                    "ticket_id": ticket_id,
+                    "subject": subject,
+                    "description": description,
+                    "category": result.get("category", ""),
+                    "failed_attempts": result.get("attempt_count", 0),
+                    "final_error": result.get("reviewer_feedback", ""),
+                    "escalation_message": f"Coalesced with escalated ticket {leader_id}"
+                })
+            except Exception as e:
+                logger.error(f"Failed to log coalesced escalation for ticket {ticket_id}: {str(e)}")
+
+        return result
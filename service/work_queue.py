@@ -0,0 +1,330 @@
+#!/usr/bin/env python3
+"""
+Durable SQLite work queue between upstream producers and the graph.
+
+Producers enqueue tickets; consumers lease batches, process them and ack or
+nack each one. A lease that is neither acked nor nacked before it expires
+(for example because the consumer crashed) makes the ticket available again.
+Nacked tickets are retried with exponential backoff. Tickets are moved to the
+dead status after max_attempts, whether nacked or left to expire, so a ticket
+that keeps crashing or hanging its consumer isn't redelivered forever.
+
+Leasing is a single UPDATE ... RETURNING statement, so any number of
+consumer processes can share one queue file. In WAL mode (the default) they
+must run on the same host; for consumers on several hosts sharing storage,
+use journal_mode "delete" on a filesystem with working POSIX locks.
+
+Usage:
+    python -m service.work_queue enqueue --subject S --description D [--tenant-id T]
+    python -m service.work_queue enqueue --file tickets.jsonl
+    python -m service.work_queue stats
+    python -m service.work_queue purge [--older-than SECONDS]
+"""
+
+import argparse
+import json
+import os
+import socket
+import sqlite3
+import sys
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from utils.logger import setup_logger
+from utils.helpers import load_config, create_ticket_id, validate_ticket_id
+from utils.metrics import metrics
+
+logger = setup_logger("work_queue")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS queue (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    ticket_id TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'ready',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    available_at REAL NOT NULL,
+    enqueued_at REAL NOT NULL,
+    leased_by TEXT,
+    lease_expires_at REAL,
+    finished_at REAL,
+    last_error TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_queue_ready ON queue (status, available_at);
+"""
+
+STATUSES = ("ready", "leased", "done", "dead")
+
+class WorkQueue:
+    """
+    SQLite-backed ticket queue with leases, acks and nacks.
+
+    Args:
+        path: Queue database file
+        lease_seconds: How long a leased ticket is reserved for its consumer
+        max_attempts: Leases per ticket before it is moved to dead
+        backoff_base_seconds: Delay before the first retry; doubles per attempt
+        backoff_max_seconds: Upper bound on the retry delay
+        journal_mode: SQLite journal mode ("wal", or "delete" for multi-host storage)
+    """
+
+    def __init__(self, path: str, lease_seconds: float = 300, max_attempts: int = 5,
+                 backoff_base_seconds: float = 5, backoff_max_seconds: float = 300,
+                 journal_mode: str = "wal"):
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.backoff_base_seconds = backoff_base_seconds
+        self.backoff_max_seconds = backoff_max_seconds
+        self.consumer_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self._lock = threading.Lock()
+
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._conn.execute(f"PRAGMA journal_mode={journal_mode}")
+        # NORMAL is crash-safe in WAL mode; only an OS crash can lose the last commits
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "WorkQueue":
+        queue_config = config.get("work_queue", {})
+        return cls(
+            queue_config.get("path", "data/work_queue.sqlite3"),
+            lease_seconds=queue_config.get("lease_seconds", 300),
+            max_attempts=queue_config.get("max_attempts", 5),
+            backoff_base_seconds=queue_config.get("backoff_base_seconds", 5),
+            backoff_max_seconds=queue_config.get("backoff_max_seconds", 300),
+            journal_mode=queue_config.get("journal_mode", "wal"),
+        )
+
+    def enqueue(self, subject: str, description: str, ticket_id: str = "", tenant_id: str = "") -> str:
+        """Add one ticket; returns its ticket ID."""
+        return self.enqueue_batch([{
+            "subject": subject, "description": description, "ticket_id": ticket_id, "tenant_id": tenant_id
+        }])[0]
+
+    def enqueue_batch(self, tickets: Iterable[Dict[str, str]]) -> List[str]:
+        """
+        Add many tickets in one transaction.
+
+        Args:
+            tickets: Dicts with subject, description and optionally ticket_id and tenant_id
+
+        Returns:
+            Ticket IDs in input order
+
+        Raises:
+            ValueError: If a ticket_id isn't safe to use as a file name
+        """
+
+        now = time.time()
+        rows = []
+        for ticket in tickets:
+            ticket_id = validate_ticket_id(ticket["ticket_id"]) if ticket.get("ticket_id") else create_ticket_id()
+            payload = {"subject": ticket["subject"], "description": ticket["description"]}
+            if ticket.get("tenant_id"):
+                payload["tenant_id"] = ticket["tenant_id"]
+            payload = json.dumps(payload)
+            rows.append((ticket_id, payload, now, now))
+
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.executemany(
+                    "INSERT INTO queue (ticket_id, payload, available_at, enqueued_at) VALUES (?, ?, ?, ?)", rows
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+        metrics.increment("work_queue_enqueued_total", len(rows))
+        return [row[0] for row in rows]
+
+    def lease(self, batch_size: int = 1) -> List[Dict[str, Any]]:
+        """
+        Reserve up to batch_size available tickets for this consumer.
+
+        Ready tickets whose backoff has passed and leased tickets whose lease
+        expired are both eligible, oldest first. Expired leases that already
+        used max_attempts are moved to dead instead, in the same transaction.
+
+        Returns:
+            Leased tickets with id, ticket_id, subject, description and attempts
+        """
+
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                dead = self._conn.execute(
+                    """
+                    UPDATE queue
+                    SET status = 'dead', finished_at = ?, lease_expires_at = NULL,
+                        last_error = 'Lease expired on final attempt'
+                    WHERE status = 'leased' AND lease_expires_at <= ? AND attempts >= ?
+                    RETURNING ticket_id, attempts
+                    """,
+                    (now, now, self.max_attempts)
+                ).fetchall()
+                rows = self._conn.execute(
+                    """
+                    UPDATE queue
+                    SET status = 'leased', leased_by = ?, lease_expires_at = ?, attempts = attempts + 1
+                    WHERE id IN (
+                        SELECT id FROM queue
+                        WHERE (status = 'ready' AND available_at <= ?)
+                           OR (status = 'leased' AND lease_expires_at <= ?)
+                        ORDER BY id
+                        LIMIT ?
+                    )
+                    RETURNING id, ticket_id, payload, attempts
+                    """,
+                    (self.consumer_id, now + self.lease_seconds, now, now, batch_size)
+                ).fetchall()
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+        for ticket_id, attempts in dead:
+            metrics.increment("work_queue_dead_total")
+            logger.error(f"Queued ticket {ticket_id} lease expired after {attempts} attempts, moved to dead")
+
+        leased = []
+        for row_id, ticket_id, payload, attempts in sorted(rows):
+            leased.append({"id": row_id, "ticket_id": ticket_id, "attempts": attempts, **json.loads(payload)})
+
+        metrics.increment("work_queue_leased_total", len(leased))
+        return leased
+
+    def ack(self, item: Dict[str, Any]) -> bool:
+        """
+        Mark a leased ticket as done.
+
+        Returns:
+            False if the lease was lost (expired and taken by another consumer)
+        """
+
+        with self._lock:
+            updated = self._conn.execute(
+                "UPDATE queue SET status = 'done', finished_at = ?, lease_expires_at = NULL "
+                "WHERE id = ? AND status = 'leased' AND leased_by = ?",
+                (time.time(), item["id"], self.consumer_id)
+            ).rowcount
+
+        if updated:
+            metrics.increment("work_queue_acked_total")
+        else:
+            logger.warning(f"Lost lease on queued ticket {item['ticket_id']} before ack")
+        return bool(updated)
+
+    def nack(self, item: Dict[str, Any], error: str = "") -> bool:
+        """
+        Return a leased ticket for a later retry, or move it to dead after max_attempts.
+
+        Returns:
+            False if the lease was lost
+        """
+
+        attempts = item["attempts"]
+        dead = attempts >= self.max_attempts
+        delay = min(self.backoff_max_seconds, self.backoff_base_seconds * 2 ** (attempts - 1))
+        now = time.time()
+
+        with self._lock:
+            updated = self._conn.execute(
+                "UPDATE queue SET status = ?, available_at = ?, finished_at = ?, last_error = ?, "
+                "lease_expires_at = NULL WHERE id = ? AND status = 'leased' AND leased_by = ?",
+                ("dead" if dead else "ready", now + delay, now if dead else None, error,
+                 item["id"], self.consumer_id)
+            ).rowcount
+
+        if not updated:
+            logger.warning(f"Lost lease on queued ticket {item['ticket_id']} before nack")
+        elif dead:
+            metrics.increment("work_queue_dead_total")
+            logger.error(f"Queued ticket {item['ticket_id']} failed {attempts} times, moved to dead: {error}")
+        else:
+            metrics.increment("work_queue_nacked_total")
+        return bool(updated)
+
+    def stats(self) -> Dict[str, Any]:
+        """Depth per status and the age of the oldest waiting ticket; also updates gauges."""
+        now = time.time()
+        with self._lock:
+            counts = dict(self._conn.execute("SELECT status, COUNT(*) FROM queue GROUP BY status").fetchall())
+            oldest = self._conn.execute(
+                "SELECT MIN(enqueued_at) FROM queue WHERE status IN ('ready', 'leased')"
+            ).fetchone()[0]
+
+        depth = {status: counts.get(status, 0) for status in STATUSES}
+        oldest_age = now - oldest if oldest is not None else 0.0
+
+        for status, count in depth.items():
+            metrics.set_gauge("work_queue_depth", count, status=status)
+        metrics.set_gauge("work_queue_oldest_age_seconds", oldest_age)
+        return {"depth": depth, "oldest_age_seconds": oldest_age}
+
+    def purge_finished(self, older_than_seconds: float) -> int:
+        """Delete done and dead tickets finished more than older_than_seconds ago."""
+        with self._lock:
+            return self._conn.execute(
+                "DELETE FROM queue WHERE status IN ('done', 'dead') AND finished_at < ?",
+                (time.time() - older_than_seconds,)
+            ).rowcount
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Durable ticket work queue")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    enqueue_parser = subparsers.add_parser("enqueue", help="Add tickets to the queue")
+    enqueue_parser.add_argument("--subject")
+    enqueue_parser.add_argument("--description")
+    enqueue_parser.add_argument("--tenant-id", default="", help="Tenant whose knowledge base the ticket uses")
+    enqueue_parser.add_argument("--file", help="JSON lines file with subject, description and optionally tenant_id per line")
+
+    subparsers.add_parser("stats", help="Show queue depth and age")
+
+    purge_parser = subparsers.add_parser("purge", help="Delete finished tickets")
+    purge_parser.add_argument("--older-than", type=float,
+                              help="Seconds since finishing; defaults to work_queue.finished_retention_seconds")
+
+    args = parser.parse_args()
+    config = load_config()
+    queue = WorkQueue.from_config(config)
+
+    if args.command == "enqueue":
+        if args.file:
+            with open(args.file, "r", encoding="utf-8") as file:
+                tickets = [json.loads(line) for line in file if line.strip()]
+        elif args.subject and args.description:
+            tickets = [{"subject": args.subject, "description": args.description, "tenant_id": args.tenant_id}]
+        else:
+            parser.error("enqueue needs --file or both --subject and --description")
+        for ticket_id in queue.enqueue_batch(tickets):
+            print(ticket_id)
+    elif args.command == "purge":
+        older_than = args.older_than
+        if older_than is None:
+            older_than = config.get("work_queue", {}).get("finished_retention_seconds")
+        if older_than is None:
+            parser.error("purge needs --older-than when work_queue.finished_retention_seconds is not set")
+        print(queue.purge_finished(older_than))
+    else:
+        print(json.dumps(queue.stats(), indent=2))
+
+if __name__ == "__main__":
+    main()
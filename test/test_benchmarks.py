@@ -0,0 +1,54 @@
+import pytest
+import sys
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from benchmarks.run_benchmarks import compare_results, percentile, summarize
+
+class TestBenchmarks:
+    """Test cases for the benchmark result handling."""
+
+    def test_summarize_timings(self):
+        """Test summary statistics for timing samples."""
+        summary = summarize([0.001, 0.002, 0.003, 0.004])
+
+        assert summary["iterations"] == 4
+        assert summary["mean_ms"] == pytest.approx(2.5)
+        assert summary["p50_ms"] == pytest.approx(2.0)
+        assert percentile([], 99) == 0.0
+
+    def test_latency_regression_flagged(self):
+        """Test that slower latency beyond the threshold is reported."""
+        baseline = {"benchmarks": {"graph.kb_10.c1": {"p50_ms": 100.0, "throughput_tps": 10.0}}}
+        current = {"benchmarks": {"graph.kb_10.c1": {"p50_ms": 130.0, "throughput_tps": 10.0}}}
+
+        regressions = compare_results(baseline, current, threshold=0.2)
+
+        assert len(regressions) == 1
+        assert regressions[0]["metric"] == "p50_ms"
+
+    def test_throughput_regression_flagged(self):
+        """Test that lower throughput beyond the threshold is reported."""
+        baseline = {"benchmarks": {"graph.kb_10.c4": {"throughput_tps": 40.0}}}
+        current = {"benchmarks": {"graph.kb_10.c4": {"throughput_tps": 20.0}}}
+
+        regressions = compare_results(baseline, current, threshold=0.2)
+
+        assert [r["metric"] for r in regressions] == ["throughput_tps"]
+
+    def test_improvements_and_noise_ignored(self):
+        """Test that improvements and sub-noise changes are not regressions."""
+        baseline = {"benchmarks": {
+            "micro.process_input": {"p50_ms": 0.01},
+            "graph.kb_10.c1": {"p50_ms": 100.0, "throughput_tps": 10.0},
+        }}
+        current = {"benchmarks": {
+            "micro.process_input": {"p50_ms": 0.03},
+            "graph.kb_10.c1": {"p50_ms": 80.0, "throughput_tps": 12.0},
+            "graph.kb_10.c16": {"p50_ms": 500.0},
+        }}
+
+        assert compare_results(baseline, current, threshold=0.2) == []
@@ -0,0 +1,170 @@
+import pytest
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from langchain_core.messages import AIMessage, HumanMessage
+import main
+import nodes.speculative_drafter as speculative_drafter
+import utils.cassettes as cassettes
+import utils.document_store as document_store
+from nodes.retriever import retrieve_context
+from utils.cassettes import CassetteMiss, active_cassette, cassette_path, cassette_session, read_cassette, replay_directory
+from utils.document_store import resolve_documents
+from utils.escalation_worker import EscalationWorker
+from utils.llm import invoke_llm
+from utils.tenant_kb import TenantKnowledgeBases
+
+class FakeLLM:
+    def __init__(self, latency: float = 0.0):
+        self.kwargs = {"model": "fake"}
+        self.latency = latency
+        self.calls = 0
+
+    def invoke(self, messages, **kwargs):
+        self.calls += 1
+        time.sleep(self.latency)
+        return AIMessage(content=f"Answer to {messages[0].content}")
+
+@pytest.fixture
+def cassette_mode(tmp_path, monkeypatch):
+    """Switch cassettes.mode, keeping cassettes under tmp_path."""
+    def set_mode(mode, latency_scale=1.0):
+        config = {"cassettes": {"mode": mode, "dir": str(tmp_path), "latency_scale": latency_scale}}
+        monkeypatch.setattr(cassettes, "load_config", lambda: config)
+    return set_mode
+
+class TestCassettes:
+    """Test cases for LLM record and replay."""
+
+    def test_record_then_replay(self, cassette_mode, tmp_path):
+        """Test recorded calls are served in replay without calling the model."""
+        cassette_mode("record")
+        llm = FakeLLM(latency=0.05)
+        with cassette_session("TKT-1", "Refund", "Charged twice"):
+            first = invoke_llm("classifier", llm, [HumanMessage(content="classify")])
+            second = invoke_llm("draft_generator", llm, [HumanMessage(content="draft")])
+
+        ticket, calls = read_cassette(tmp_path / "TKT-1.jsonl.gz")
+        assert ticket["subject"] == "Refund"
+        assert [(call["node"], call["seq"]) for call in calls] == [("classifier", 0), ("draft_generator", 0)]
+        assert calls[0]["latency"] >= 0.05
+
+        cassette_mode("replay", latency_scale=0.0)
+        offline = FakeLLM()
+        start = time.perf_counter()
+        with cassette_session("TKT-1", "Refund", "Charged twice"):
+            assert invoke_llm("classifier", offline, [HumanMessage(content="classify")]).content == first.content
+            assert invoke_llm("draft_generator", offline, [HumanMessage(content="draft")]).content == second.content
+        assert time.perf_counter() - start < 0.05
+        assert offline.calls == 0
+
+    def test_replay_misses_never_reach_the_model(self, cassette_mode):
+        """Test calls without a recording raise instead of calling the model."""
+        cassette_mode("replay")
+        llm = FakeLLM()
+        with cassette_session("TKT-unrecorded", "Refund", "Charged twice"):
+            with pytest.raises(CassetteMiss):
+                invoke_llm("classifier", llm, [HumanMessage(content="classify")])
+        assert llm.calls == 0
+
+    def test_replay_matches_prompt_within_node(self, cassette_mode):
+        """Test calls of one node are matched by prompt before call order."""
+        cassette_mode("record")
+        with cassette_session("TKT-2", "Refund", "Charged twice"):
+            for prompt in ("Billing", "Technical"):
+                invoke_llm("draft_generator", FakeLLM(), [HumanMessage(content=prompt)])
+
+        cassette_mode("replay", latency_scale=0.0)
+        with cassette_session("TKT-2", "Refund", "Charged twice"):
+            assert invoke_llm("draft_generator", FakeLLM(), [HumanMessage(content="Technical")]).content == "Answer to Technical"
+            assert invoke_llm("draft_generator", FakeLLM(), [HumanMessage(content="Billing")]).content == "Answer to Billing"
+
+    def test_ticket_ids_cannot_escape_the_directory(self, tmp_path):
+        """Test ticket IDs with path separators are refused instead of naming a file outside cassettes.dir."""
+        assert cassette_path(str(tmp_path), "TKT-1") == tmp_path / "TKT-1.jsonl.gz"
+        for ticket_id in ("../../x", "a/b", ".hidden"):
+            with pytest.raises(ValueError):
+                cassette_path(str(tmp_path), ticket_id)
+
+    def test_background_escalations_keep_the_session(self, cassette_mode, tmp_path):
+        """Test escalation summaries written by the worker belong to the ticket's cassette."""
+        cassette_mode("record")
+        seen = []
+        worker = EscalationWorker(lambda job: seen.append(active_cassette()) or "Summary",
+                                  str(tmp_path / "escalation_log.csv"), flush_interval=0.01)
+
+        with cassette_session("TKT-3", "Outage", "Down") as cassette:
+            worker.submit({"ticket_id": "TKT-3"})
+        assert worker.flush(timeout=5)
+        assert seen == [cassette]
+
+    def test_speculative_drafts_are_recorded_and_replayed(self, cassette_mode, tmp_path, monkeypatch):
+        """Test speculative drafts and reviews made on worker threads go through the ticket's cassette."""
+        monkeypatch.setattr(speculative_drafter, "load_config", lambda: {
+            "llm": {"temperature": 0.1},
+            "speculative_drafts": {"enabled": True, "categories": {"Security": {"num_drafts": 3, "temperatures": [0.1, 0.5, 0.9]}}}
+        })
+        llm = FakeLLM()
+
+        def draft(state, temperature=None):
+            response = invoke_llm("draft_generator", llm, [HumanMessage(content=f"draft@{temperature}")])
+            return {**state, "draft_response": response.content}
+
+        def review(state):
+            invoke_llm("reviewer", llm, [HumanMessage(content=f"review {state['draft_response']}")])
+            return {**state, "review_approved": False, "reviewer_feedback": "too vague"}
+
+        monkeypatch.setattr(speculative_drafter, "generate_draft", draft)
+        monkeypatch.setattr(speculative_drafter, "review_draft", review)
+        state = {"ticket_id": "TKT-4", "category": "Security", "attempt_count": 0}
+
+        cassette_mode("record")
+        with cassette_session("TKT-4", "Breach", "Account hijacked"):
+            speculative_drafter.generate_speculative_drafts(state)
+        _, calls = read_cassette(tmp_path / "TKT-4.jsonl.gz")
+        assert sorted(call["node"] for call in calls) == ["draft_generator"] * 3 + ["reviewer"] * 3
+
+        cassette_mode("replay", latency_scale=0.0)
+        llm.calls = 0
+        with cassette_session("TKT-4", "Breach", "Account hijacked"):
+            speculative_drafter.generate_speculative_drafts(state)
+        assert llm.calls == 0
+
+    def test_tenant_tickets_replay_against_their_tenant_kb(self, cassette_mode, tmp_path, monkeypatch):
+        """Test a recorded tenant ticket is replayed with its tenant_id, so it retrieves from that tenant's KB."""
+        billing_dir = tmp_path / "tenants" / "acme" / "billing_docs"
+        billing_dir.mkdir(parents=True)
+        (billing_dir / "doc_0.txt").write_text("Acme refunds are issued within 3 days.")
+        knowledge_bases = TenantKnowledgeBases(str(tmp_path / "tenants"))
+        monkeypatch.setattr(document_store, "get_tenant_knowledge_bases", lambda config: knowledge_bases)
+        monkeypatch.setattr(cassettes, "_overrides", {})
+        monkeypatch.setenv("OPENAI_API_KEY", "replay")
+        cassette_dir = tmp_path / "cassettes"
+        llm = FakeLLM()
+        drafts = []
+
+        async def process_ticket(subject, description, ticket_id="", tenant_id=""):
+            with cassette_session(ticket_id, subject, description, tenant_id):
+                state = retrieve_context({"ticket_id": ticket_id, "tenant_id": tenant_id, "category": "Billing",
+                                          "subject": subject, "description": description})
+                context = resolve_documents(state["context_docs"], {})[0]
+                drafts.append(invoke_llm("draft_generator", llm, [HumanMessage(content=context)]).content)
+            return {"ticket_id": ticket_id, "processing_step": "completed"}
+        monkeypatch.setattr(main, "process_ticket", process_ticket)
+
+        monkeypatch.setattr(cassettes, "load_config", lambda: {"cassettes": {"mode": "record", "dir": str(cassette_dir)}})
+        asyncio.run(process_ticket("Refund", "When will my refund arrive?", "TKT-5", "acme"))
+        ticket, _ = read_cassette(cassette_dir / "TKT-5.jsonl.gz")
+        assert ticket["tenant_id"] == "acme"
+
+        llm.calls = 0
+        report = asyncio.run(replay_directory(str(cassette_dir), latency_scale=0.0, concurrency=1))
+        assert report["tickets"] == 1
+        assert llm.calls == 0
+        assert drafts == ["Answer to Acme refunds are issued within 3 days."] * 2
@@ -0,0 +1,97 @@
+import pytest
+import sys
+import time
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from langchain_core.messages import HumanMessage
+import nodes.degraded as degraded
+import nodes.retry_logic as retry_logic
+import utils.llm as llm_module
+from nodes.degraded import handle_degraded
+from utils.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpen
+from utils.helpers import load_config
+from utils.llm import invoke_llm
+
+class DownLLM:
+    def __init__(self):
+        self.kwargs = {"model": "down"}
+        self.calls = 0
+
+    def invoke(self, messages, **kwargs):
+        self.calls += 1
+        raise TimeoutError("provider timeout")
+
+@pytest.fixture
+def open_breaker(monkeypatch):
+    """Install an open breaker as the shared one."""
+    breaker = CircuitBreaker(min_calls=1, open_seconds=60)
+    breaker.allow()
+    breaker.record_failure()
+    monkeypatch.setattr(llm_module, "get_circuit_breaker", lambda config: breaker)
+    monkeypatch.setattr(retry_logic, "circuit_open", lambda config: breaker.is_open())
+    return breaker
+
+class TestCircuitBreaker:
+    """Test cases for the LLM circuit breaker and degraded mode."""
+
+    def test_opens_on_error_rate_and_recovers(self):
+        """Test closed -> open at the threshold, half-open after the cool-down, closed on a good probe."""
+        breaker = CircuitBreaker(min_calls=4, error_rate_threshold=0.5, open_seconds=0.05, half_open_max_calls=1)
+        for ok in (True, False, True):
+            assert breaker.allow()
+            breaker.record_success() if ok else breaker.record_failure()
+        assert breaker.state == CLOSED
+
+        breaker.allow()
+        breaker.record_failure()
+        assert breaker.state == OPEN
+        assert not breaker.allow()
+
+        time.sleep(0.06)
+        assert breaker.state == HALF_OPEN
+        assert breaker.allow()
+        assert not breaker.allow()
+        breaker.record_success()
+        assert breaker.state == CLOSED
+
+    def test_failed_probe_reopens(self):
+        """Test a failed half-open probe opens the breaker again."""
+        breaker = CircuitBreaker(min_calls=1, open_seconds=0.05)
+        breaker.allow()
+        breaker.record_failure()
+        time.sleep(0.06)
+        assert breaker.allow()
+        breaker.record_failure()
+        assert breaker.state == OPEN
+
+    def test_open_breaker_fails_fast(self, open_breaker):
+        """Test calls are refused without reaching the model while open."""
+        llm = DownLLM()
+        with pytest.raises(CircuitOpen):
+            invoke_llm("classifier", llm, [HumanMessage(content="classify")])
+        assert llm.calls == 0
+
+    def test_degraded_reply_or_escalation(self, monkeypatch):
+        """Test degraded tickets get a KB reply when one matches well, otherwise escalate."""
+        config = {**load_config(), "degraded": {"min_kb_score": 2}}
+        monkeypatch.setattr(degraded, "load_config", lambda: config)
+
+        reply = handle_degraded({"ticket_id": "T1", "subject": "Refund request",
+                                 "description": "I need a refund for my subscription billing"})
+        assert reply["category"] == "Billing"
+        assert reply["processing_step"] == "degraded_reply"
+        assert reply["final_response"].startswith("Thank you for contacting support")
+
+        unmatched = handle_degraded({"ticket_id": "T2", "subject": "Hi", "description": "Help"})
+        assert unmatched["processing_step"] == "degraded_escalation"
+        assert unmatched["degraded"] is True
+
+    def test_should_retry_degrades_while_open(self, open_breaker):
+        """Test a rejected draft goes to the degraded path instead of a retry while open."""
+        state = {"ticket_id": "T1", "review_approved": False, "attempt_count": 1}
+        assert retry_logic.should_retry(state) == "degrade"
+        assert retry_logic.should_retry({**state, "review_approved": True}) == "finalize"
@@ -0,0 +1,91 @@
+import pytest
+import sys
+import time
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from langchain_core.messages import AIMessage
+from benchmarks.stub_llm import stub_llm
+from nodes.retry_logic import should_retry
+from nodes.reviewer import review_draft
+from utils.deadlines import DeadlineExceeded, llm_timeout, ticket_deadline
+from utils.llm import invoke_llm
+from utils.metrics import metrics
+
+class RecordingLLM:
+    class root_client:
+        max_retries = 2
+
+    def __init__(self):
+        self.kwargs = None
+
+    def invoke(self, messages, **kwargs):
+        self.kwargs = kwargs
+        return AIMessage(content="ok")
+
+class TestDeadlines:
+    """Test cases for per-ticket deadline budgets."""
+
+    def setup_method(self):
+        metrics.reset()
+
+    def test_ticket_deadline(self):
+        """Test the deadline is the configured budget from now, or 0 when disabled."""
+        before = time.time()
+        deadline = ticket_deadline({"deadline": {"budget_seconds": 30}})
+
+        assert before + 30 <= deadline <= time.time() + 30
+        assert ticket_deadline({}) == 0.0
+
+    def test_llm_timeout_uses_remaining_time(self):
+        """Test calls get the remaining time minus the reserve, and fail once it is gone."""
+        state = {"ticket_id": "T1", "deadline": time.time() + 20}
+
+        assert 9 < llm_timeout(state, "reviewer", reserve=10) <= 10
+        assert llm_timeout({"deadline": 0.0}, "reviewer") is None
+
+        with pytest.raises(DeadlineExceeded):
+            llm_timeout({"deadline": time.time() + 5}, "reviewer", reserve=10)
+        assert metrics.get_counter("deadline_exceeded_total", node="reviewer") == 1
+
+    def test_invoke_llm_splits_timeout_across_retries(self):
+        """Test the per-request timeout covers every attempt the client may make."""
+        llm = RecordingLLM()
+
+        invoke_llm("reviewer", llm, [], timeout=9.0)
+        assert llm.kwargs == {"timeout": 3.0}
+
+        invoke_llm("reviewer", llm, [])
+        assert llm.kwargs == {}
+
+    def test_should_retry_escalates_when_budget_is_short(self):
+        """Test a rejected draft is escalated when no retry cycle fits in the deadline."""
+        state = {"ticket_id": "T1", "review_approved": False, "attempt_count": 1}
+
+        assert should_retry({**state, "deadline": time.time() + 600}) == "retry"
+        assert should_retry({**state, "deadline": 0.0}) == "retry"
+        assert should_retry({**state, "deadline": time.time() + 5}) == "escalate"
+        assert metrics.get_counter("deadline_escalations_total") == 1
+
+    def test_reviewer_rejects_when_deadline_passed(self):
+        """Test an expired ticket isn't approved by the reviewer's error fallback."""
+        state = {
+            "ticket_id": "T1",
+            "subject": "Refund",
+            "description": "Charged twice",
+            "category": "Billing",
+            "draft_response": "Your refund is on its way.",
+            "context": "",
+            "context_docs": [],
+            "attempt_count": 1,
+            "deadline": time.time() - 1,
+        }
+
+        with stub_llm():
+            result = review_draft(state)
+
+        assert result["review_approved"] is False
+        assert "deadline" in result["reviewer_feedback"]
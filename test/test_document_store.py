@@ -0,0 +1,111 @@
+import pytest
+import json
+import sys
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import utils.document_store as document_store
+from nodes.retriever import context_refs, rank_category, retrieve_context, tokenize_query
+from utils.document_store import document_id, parse_document_id, resolve_document, resolve_documents
+from utils.helpers import clear_caches, load_config, load_knowledge_base
+from utils.kb_snapshot import build_snapshot
+from utils.metrics import metrics
+from utils.prompt_assembler import build_generator_context
+
+DOCUMENTS = ["Refunds are processed within 5-7 business days.", "Invoices are sent monthly.", "Plans renew yearly."]
+NAMES = ["doc_0", "doc_1", "doc_2"]
+
+@pytest.fixture
+def knowledge_base(monkeypatch):
+    """A three-document Billing knowledge base."""
+    monkeypatch.setattr(document_store, "load_named_knowledge_base", lambda category: (NAMES, DOCUMENTS))
+    return DOCUMENTS
+
+@pytest.fixture
+def billing_dir(tmp_path, monkeypatch):
+    """The Billing documents as text files under data/knowledge_base in a scratch working directory."""
+    category_dir = tmp_path / "data" / "knowledge_base" / "billing_docs"
+    category_dir.mkdir(parents=True)
+    for name, text in zip(NAMES, DOCUMENTS):
+        (category_dir / f"{name}.txt").write_text(text)
+    monkeypatch.chdir(tmp_path)
+    clear_caches()
+    yield category_dir
+    clear_caches()
+
+class TestDocumentStore:
+    """Test cases for document references and the shared document store."""
+
+    def setup_method(self):
+        metrics.reset()
+
+    def test_document_id_round_trip(self):
+        """Test shared and tenant document IDs parse back into their parts."""
+        assert document_id("Billing", "refund_policy") == "Billing/refund_policy"
+        assert parse_document_id("Billing/refund_policy") == ("", "Billing", "refund_policy")
+        assert parse_document_id(document_id("Billing", "faq", "acme")) == ("acme", "Billing", "faq")
+        for doc_id in ("Billing", "Billing/", "a/b/c/1"):
+            with pytest.raises(ValueError):
+                parse_document_id(doc_id)
+
+    def test_resolve_documents(self, knowledge_base):
+        """Test references resolve to their text in order, skipping removed documents and keeping plain text."""
+        refs = [{"id": "Billing/doc_2", "score": 1}, {"id": "Billing/doc_9", "score": 1}, "Hand-written context",
+                {"id": "Billing/doc_0", "score": 0}]
+
+        assert resolve_documents(refs, {}) == [DOCUMENTS[2], "Hand-written context", DOCUMENTS[0]]
+        assert metrics.get_counter("document_store_misses_total") == 1
+        with pytest.raises(KeyError):
+            resolve_document("Billing/doc_3", {})
+
+    def test_resolve_from_snapshot(self, billing_dir, monkeypatch):
+        """Test references resolve through the memory-mapped snapshot when one is configured."""
+        build_snapshot("data/knowledge_base", "kb.bin")
+        config = {"knowledge_base": {"snapshot_path": "kb.bin"}}
+        monkeypatch.setattr(document_store, "load_named_knowledge_base", lambda category: ([], []))
+
+        assert resolve_document("Billing/doc_1", config) == DOCUMENTS[1]
+        with pytest.raises(KeyError):
+            resolve_document("Billing/doc_3", config)
+
+    @pytest.mark.parametrize("snapshot", [False, True])
+    def test_references_survive_knowledge_base_changes(self, billing_dir, snapshot):
+        """Test a reference keeps its document when others are added or removed, and misses once its own is removed."""
+        config = {"knowledge_base": {"snapshot_path": "kb.bin" if snapshot else ""}}
+        if snapshot:
+            build_snapshot("data/knowledge_base", "kb.bin")
+        refs = context_refs(*rank_category("Billing", tokenize_query("Invoices", "When are invoices sent monthly"), config))
+        assert resolve_documents(refs, config)[0] == DOCUMENTS[1]
+
+        # Sorts first, shifting every existing document's position
+        (billing_dir / "a_pause.txt").write_text("Annual plans can be paused.")
+        (billing_dir / "doc_2.txt").unlink()
+        if snapshot:
+            build_snapshot("data/knowledge_base", "kb.bin")
+
+        assert resolve_documents(refs, config)[0] == DOCUMENTS[1]
+        (billing_dir / "doc_1.txt").unlink()
+        if snapshot:
+            build_snapshot("data/knowledge_base", "kb.bin")
+        assert DOCUMENTS[1] not in resolve_documents(refs, config)
+
+    def test_state_holds_references_and_prompt_resolves_them(self):
+        """Test retrieval stores compact references and the generator prompt gets the documents' text."""
+        state = {"ticket_id": "DOC-1", "subject": "Refund request", "description": "I need a refund for my subscription", "category": "Billing"}
+
+        result = retrieve_context(state)
+        texts = [resolve_document(ref["id"], {}) for ref in result["context_docs"]]
+
+        assert result["context"] == ""
+        assert texts and all(text in load_knowledge_base("Billing") for text in texts)
+        assert build_generator_context(result, load_config()) == "\n\n".join(texts)
+        assert len(json.dumps(result["context_docs"])) < len(json.dumps(texts))
+
+    def test_retrieval_error_text_is_used(self):
+        """Test the fallback context text reaches the prompt when there are no references."""
+        state = {"context": "Error retrieving context for Billing category. Using general guidance.", "context_docs": []}
+
+        assert build_generator_context(state, {}) == state["context"]
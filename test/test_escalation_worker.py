@@ -0,0 +1,129 @@
+import pytest
+import sys
+import csv
+import subprocess
+import textwrap
+import time
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import nodes.escalator as escalator
+from nodes.escalator import escalate_ticket
+from utils.escalation_worker import EscalationWorker
+from utils.metrics import metrics
+
+def _job(ticket_id: str) -> dict:
+    return {
+        "ticket_id": ticket_id,
+        "subject": "Outage",
+        "description": "Everything is down",
+        "category": "Technical",
+        "failed_attempts": 2,
+        "attempts_summary": "Attempt 1: too vague",
+        "final_error": "too vague"
+    }
+
+def _rows(log_file: Path) -> list:
+    with open(log_file, newline="", encoding="utf-8") as file:
+        return list(csv.DictReader(file))
+
+class TestEscalationWorker:
+    """Test cases for the background escalation worker."""
+
+    def setup_method(self):
+        metrics.reset()
+
+    def test_batches_and_flushes(self, tmp_path):
+        """Test queued escalations are summarized and written together."""
+        log_file = tmp_path / "escalation_log.csv"
+        worker = EscalationWorker(lambda job: f"Summary for {job['ticket_id']}", str(log_file),
+                                  batch_size=10, flush_interval=0.05)
+
+        for i in range(5):
+            worker.submit(_job(f"TKT-{i}"))
+        assert worker.flush(timeout=5)
+
+        rows = _rows(log_file)
+        assert [row["ticket_id"] for row in rows] == [f"TKT-{i}" for i in range(5)]
+        assert rows[0]["escalation_message"] == "Summary for TKT-0"
+        assert metrics.get_counter("escalation_jobs_total", status="written") == 5
+
+    def test_retries_then_falls_back(self, tmp_path):
+        """Test summaries are retried and replaced by the fallback once retries run out."""
+        log_file = tmp_path / "escalation_log.csv"
+        calls = {"TKT-flaky": 0, "TKT-down": 0}
+
+        def summarize(job):
+            calls[job["ticket_id"]] += 1
+            if job["ticket_id"] == "TKT-down" or calls["TKT-flaky"] < 2:
+                raise RuntimeError("LLM unavailable")
+            return "Recovered summary"
+
+        worker = EscalationWorker(summarize, str(log_file), flush_interval=0.05, max_retries=2,
+                                  retry_backoff=0.001, fallback_message="Ticket {ticket_id} needs a human")
+        worker.submit(_job("TKT-flaky"))
+        worker.submit(_job("TKT-down"))
+        assert worker.flush(timeout=5)
+
+        messages = {row["ticket_id"]: row["escalation_message"] for row in _rows(log_file)}
+        assert messages == {"TKT-flaky": "Recovered summary", "TKT-down": "Ticket TKT-down needs a human"}
+        assert calls["TKT-down"] == 3
+
+    def test_escalate_ticket_returns_before_summary(self, tmp_path, monkeypatch):
+        """Test the escalator node hands the slow summary to the worker."""
+        log_file = tmp_path / "escalation_log.csv"
+        config = {"escalation": {"log_file": str(log_file), "background": True, "flush_interval_seconds": 0.01}}
+        monkeypatch.setattr(escalator, "load_config", lambda: config)
+        monkeypatch.setattr(escalator, "_worker", None)
+
+        def slow_summary(job, config, timeout=None):
+            time.sleep(0.3)
+            return "Detailed summary"
+        monkeypatch.setattr(escalator, "generate_escalation_summary", slow_summary)
+
+        start = time.perf_counter()
+        result = escalate_ticket({"ticket_id": "TKT-1", "subject": "Outage", "description": "Down",
+                                  "category": "Technical", "attempt_count": 2, "failed_attempts": []})
+        assert time.perf_counter() - start < 0.2
+        assert result["escalated"] is True
+        assert result["final_response"].endswith("TKT-1")
+
+        assert escalator._worker.flush(timeout=5)
+        assert _rows(log_file)[0]["escalation_message"] == "Detailed summary"
+
+    def test_queued_escalations_written_at_exit(self, tmp_path):
+        """Test escalations still queued when the process exits reach the log."""
+        log_file = tmp_path / "escalation_log.csv"
+        script = textwrap.dedent(f"""
+            import sys, time
+            sys.path.insert(0, {str(project_root)!r})
+            from utils.escalation_worker import EscalationWorker
+
+            def summarize(job):
+                time.sleep(0.05)
+                return "Summary for " + job["ticket_id"]
+
+            worker = EscalationWorker(summarize, {str(log_file)!r}, batch_size=4, flush_interval=0.2)
+            for i in range(6):
+                worker.submit({{"ticket_id": f"TKT-{{i}}", "subject": "Outage", "description": "Down"}})
+        """)
+
+        subprocess.run([sys.executable, "-c", script], cwd=tmp_path, check=True, timeout=30)
+
+        rows = _rows(log_file)
+        assert sorted(row["ticket_id"] for row in rows) == [f"TKT-{i}" for i in range(6)]
+        assert rows[0]["escalation_message"].startswith("Summary for TKT-")
+
+    def test_summarizes_inline_when_pool_closed(self, tmp_path):
+        """Test a batch is still summarized once the summary pool has shut down."""
+        log_file = tmp_path / "escalation_log.csv"
+        worker = EscalationWorker(lambda job: f"Summary for {job['ticket_id']}", str(log_file), flush_interval=0.01)
+        worker._pool.shutdown()
+
+        worker.submit(_job("TKT-1"))
+        assert worker.flush(timeout=5)
+
+        assert _rows(log_file)[0]["escalation_message"] == "Summary for TKT-1"
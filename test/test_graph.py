@@ -0,0 +1,90 @@
+import pytest
+import sys
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from langgraph.errors import GraphRecursionError
+import langgraph_graph.graph as graph_module
+import nodes.escalator as escalator
+from benchmarks.stub_llm import stub_llm
+from langgraph_graph.graph import (
+    GRAPH_VARIANTS, create_configured_graph, create_support_agent_graph, create_parallel_support_agent_graph,
+    create_initial_state
+)
+from langgraph_graph.native_executor import NativePipeline
+from utils.helpers import load_config
+
+class TestGraphVariants:
+    """Test cases for the graph variants, run against a stubbed LLM."""
+    
+    @pytest.mark.asyncio
+    async def test_parallel_graph_matches_sequential(self):
+        """Test the fan-out variant retrieves the same context as the chain."""
+        state = create_initial_state("Refund request", "I was charged twice and need a refund for my billing plan")
+        
+        with stub_llm():
+            sequential = await create_support_agent_graph().ainvoke(state)
+            parallel = await create_parallel_support_agent_graph().ainvoke(state)
+        
+        assert parallel["category"] == sequential["category"] == "Billing"
+        assert parallel["context_docs"] == sequential["context_docs"]
+        assert parallel["review_approved"] is True
+        assert parallel["candidate_docs"] == {}
+
+class TestNativePipeline:
+    """Test cases for the native executor, checked against the LangGraph runtime."""
+    
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("variant", ["sequential", "parallel"])
+    async def test_matches_langgraph(self, variant):
+        """Test both backends produce the same final state for an approved ticket."""
+        state = create_initial_state("Refund request", "I was charged twice and need a refund for my billing plan", "T-NATIVE")
+        
+        with stub_llm():
+            expected = await GRAPH_VARIANTS[variant]().ainvoke(state)
+            result = await NativePipeline(variant).ainvoke(state)
+        
+        assert set(result) == set(expected)
+        for key in ("category", "context_docs", "review_approved", "attempt_count", "processing_step", "final_response"):
+            assert result[key] == expected[key]
+        assert state["processing_step"] == "initialized"
+    
+    @pytest.mark.asyncio
+    async def test_retry_loop_and_escalation(self, tmp_path, monkeypatch):
+        """Test rejected drafts are retried up to the limit and then escalated, as in LangGraph."""
+        config = load_config()
+        config = {**config, "escalation": {**config["escalation"], "log_file": str(tmp_path / "escalation_log.csv"),
+                                           "flush_interval_seconds": 0.01}}
+        monkeypatch.setattr(escalator, "load_config", lambda: config)
+        monkeypatch.setattr(escalator, "_worker", None)
+        state = create_initial_state("API errors", "Our integration gets a timeout from the endpoint", "T-NATIVE-ESC")
+        
+        with stub_llm(reject_rate=1.0):
+            expected = await create_support_agent_graph().ainvoke(state)
+            result = await NativePipeline().ainvoke(state)
+            if escalator._worker is not None:
+                assert escalator._worker.flush(timeout=5)
+        
+        assert result["escalated"] is expected["escalated"] is True
+        assert result["attempt_count"] == expected["attempt_count"]
+        assert len(result["failed_attempts"]) == len(expected["failed_attempts"])
+    
+    def test_step_limit(self):
+        """Test a runaway loop raises like LangGraph's recursion limit."""
+        state = create_initial_state("API errors", "Our integration gets a timeout from the endpoint", "T-NATIVE-LIMIT")
+        
+        with stub_llm(reject_rate=1.0), pytest.raises(GraphRecursionError):
+            NativePipeline(max_steps=4).invoke(state)
+    
+    def test_backend_selected_by_config(self, monkeypatch):
+        """Test graph.backend switches create_configured_graph to the native executor."""
+        config = {**load_config(), "graph": {"variant": "parallel", "backend": "native"}}
+        monkeypatch.setattr(graph_module, "load_config", lambda: config)
+        
+        pipeline = create_configured_graph()
+        
+        assert isinstance(pipeline, NativePipeline)
+        assert pipeline.variant == "parallel"
@@ -0,0 +1,142 @@
+import pytest
+import sys
+import threading
+import time
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from langchain_core.messages import AIMessage, HumanMessage
+import utils.llm as llm_module
+from utils.hedging import Hedger, hedging_report
+from utils.llm import invoke_llm
+from utils.metrics import metrics, percentile
+
+class ScheduledLLM:
+    """Chat model double whose n-th call takes delays[n] seconds; a (seconds, error) pair fails after sleeping."""
+
+    def __init__(self, delays):
+        self.kwargs = {"model": "scheduled"}
+        self.delays = list(delays)
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def invoke(self, messages, **kwargs):
+        with self._lock:
+            index = self.calls
+            self.calls += 1
+        delay = self.delays[index] if index < len(self.delays) else 0.0
+        if isinstance(delay, tuple):
+            time.sleep(delay[0])
+            raise delay[1]
+        time.sleep(delay)
+        return AIMessage(content=f"response {index}")
+
+def warmed_hedger(**kwargs) -> Hedger:
+    """Hedger that has seen enough 10ms latencies to hedge after ~10ms."""
+    hedger = Hedger(min_samples=5, budget_fraction=1.0, max_burst=5, **kwargs)
+    for _ in range(5):
+        hedger._record_latency("draft_generator", "scheduled", 0.01)
+    return hedger
+
+class TestHedging:
+    """Test cases for hedged LLM requests."""
+
+    def setup_method(self):
+        metrics.reset()
+
+    def test_slow_call_is_hedged(self):
+        """Test a call past the latency percentile is duplicated and the faster response wins."""
+        hedger = warmed_hedger()
+        llm = ScheduledLLM([0.5, 0.0])
+
+        start = time.perf_counter()
+        response = hedger.call("draft_generator", "scheduled", lambda: llm.invoke([]))
+
+        assert time.perf_counter() - start < 0.3
+        assert response.content == "response 1"
+        assert metrics.get_counter("llm_hedges_total", node="draft_generator") == 1
+        assert metrics.get_counter("llm_hedge_wins_total", node="draft_generator") == 1
+
+    def test_no_hedge_without_history_or_budget(self):
+        """Test calls aren't hedged before enough latencies are seen or once the budget is spent."""
+        cold = Hedger(min_samples=5, budget_fraction=1.0)
+        llm = ScheduledLLM([0.05])
+        assert cold.call("draft_generator", "scheduled", lambda: llm.invoke([])).content == "response 0"
+        assert llm.calls == 1
+
+        broke = warmed_hedger()
+        broke.budget_fraction = 0.0
+        llm = ScheduledLLM([0.05])
+        broke.call("draft_generator", "scheduled", lambda: llm.invoke([]))
+        assert llm.calls == 1
+        assert metrics.get_counter("llm_hedge_budget_exhausted_total", node="draft_generator") == 1
+
+    def test_budget_limits_extra_requests(self):
+        """Test the token bucket keeps hedges to budget_fraction of requests."""
+        hedger = Hedger(percentile=0, min_samples=1, budget_fraction=0.25, max_burst=1)
+        hedger._record_latency("reviewer", "scheduled", 0.0)
+
+        for _ in range(8):
+            llm = ScheduledLLM([0.05, 0.05])
+            hedger.call("reviewer", "scheduled", lambda: llm.invoke([]))
+
+        assert metrics.get_counter("llm_hedges_total", node="reviewer") == 2
+        assert hedger.hedge_rate == 0.25
+
+    def test_hedge_delay_is_nearest_rank_percentile(self):
+        """Test the hedge delay is the shared nearest-rank percentile of recent latencies."""
+        hedger = Hedger(percentile=95, min_samples=20)
+        latencies = [index / 100 for index in range(20, 0, -1)]
+        for latency in latencies:
+            hedger._record_latency("reviewer", "scheduled", latency)
+
+        assert hedger.hedge_delay("reviewer", "scheduled") == percentile(latencies, 95) == 0.19
+
+    def test_waiting_for_a_worker_does_not_hedge(self):
+        """Test time a primary spends queued for a busy pool doesn't count towards the hedge delay."""
+        hedger = warmed_hedger(max_workers=1)
+        hedger._executor.submit(time.sleep, 0.2)
+        llm = ScheduledLLM([0.0, 0.0])
+
+        assert hedger.call("draft_generator", "scheduled", lambda: llm.invoke([])).content == "response 0"
+
+        assert llm.calls == 1
+        assert metrics.get_counter("llm_hedges_total", node="draft_generator") == 0
+        assert metrics.percentile("llm_hedge_pool_wait_seconds", 50, node="draft_generator") >= 0.15
+
+    def test_failed_primary_falls_back_to_hedge(self):
+        """Test a hedge that succeeds covers a primary that fails, and the primary's error is raised if both fail."""
+        hedger = warmed_hedger()
+        llm = ScheduledLLM([(0.05, TimeoutError("primary")), 0.1])
+        assert hedger.call("draft_generator", "scheduled", lambda: llm.invoke([])).content == "response 1"
+
+        failing = ScheduledLLM([(0.05, ValueError("primary")), (0.0, ValueError("hedge"))])
+        with pytest.raises(ValueError, match="primary"):
+            hedger.call("draft_generator", "scheduled", lambda: failing.invoke([]))
+
+    def test_invoke_llm_hedges_enabled_nodes(self, monkeypatch):
+        """Test invoke_llm routes calls for hedged nodes through the hedger."""
+        hedger = warmed_hedger()
+        monkeypatch.setattr(llm_module, "get_hedger", lambda node, config: hedger if node == "draft_generator" else None)
+        llm = ScheduledLLM([0.5, 0.0])
+
+        response = invoke_llm("draft_generator", llm, [HumanMessage(content="draft")])
+
+        assert response.content == "response 1"
+        assert llm.calls == 2
+        assert metrics.get_counter("llm_calls_total", node="draft_generator") == 1
+
+    def test_report_p99_improvement(self):
+        """Test the report compares the primaries' p99 with the latency callers saw."""
+        for latency in [0.1] * 98 + [2.0] * 2:
+            metrics.observe("llm_primary_latency_seconds", latency, node="reviewer")
+            metrics.observe("llm_hedged_latency_seconds", min(latency, 0.3), node="reviewer")
+
+        report = hedging_report(["reviewer"])["reviewer"]
+
+        assert report["primary_p99"] == 2.0
+        assert report["hedged_p99"] == 0.3
+        assert report["improvement"] == pytest.approx(0.85)
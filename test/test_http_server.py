@@ -0,0 +1,165 @@
+import pytest
+import sys
+import json
+import asyncio
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from service.http_server import TicketService, serve
+from utils.helpers import load_config
+
+async def _request(port: int, method: str, path: str, payload: dict = None):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    body = json.dumps(payload).encode() if payload is not None else b""
+    writer.write(
+        f"{method} {path} HTTP/1.1\r\nHost: localhost\r\nContent-Length: {len(body)}\r\n\r\n".encode() + body
+    )
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    head, _, body = response.partition(b"\r\n\r\n")
+    status = int(head.split()[1])
+    return status, head.decode(), json.loads(body)
+
+def _service(max_in_flight: int = 4, delay: float = 0.0) -> TicketService:
+    async def fake_processor(subject, description, ticket_id="", tenant_id=""):
+        if delay:
+            await asyncio.sleep(delay)
+        return {"ticket_id": ticket_id, "category": "General", "final_response": f"Re: {subject}", "processing_step": "completed"}
+    
+    config = {**load_config(), "service": {"max_in_flight": max_in_flight}}
+    return TicketService(config, processor=fake_processor)
+
+class TestHTTPServer:
+    """Test cases for the HTTP service, run against a fake processor."""
+    
+    @pytest.mark.asyncio
+    async def test_submit_status_and_result(self):
+        """Test a ticket can be submitted, polled and its result fetched."""
+        service = _service()
+        server = await serve(service, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        
+        async with server:
+            status, _, submitted = await _request(port, "POST", "/tickets", {"subject": "Help", "description": "Need help"})
+            assert status == 202
+            ticket_id = submitted["ticket_id"]
+            
+            await service.drain()
+            
+            status, _, job = await _request(port, "GET", f"/tickets/{ticket_id}")
+            assert status == 200
+            assert job["status"] == "completed"
+            
+            status, _, result = await _request(port, "GET", f"/tickets/{ticket_id}/result")
+            assert status == 200
+            assert result["result"]["final_response"] == "Re: Help"
+    
+    @pytest.mark.asyncio
+    async def test_wait_health_and_metrics(self):
+        """Test synchronous submission and the operational endpoints."""
+        service = _service()
+        server = await serve(service, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        
+        async with server:
+            status, _, result = await _request(port, "POST", "/tickets?wait=true", {"subject": "Help", "description": "Need help"})
+            assert status == 200
+            assert result["status"] == "completed"
+            
+            assert (await _request(port, "GET", "/healthz"))[0] == 200
+            assert (await _request(port, "GET", "/readyz"))[0] == 200
+            status, _, snapshot = await _request(port, "GET", "/metrics")
+            assert status == 200
+            assert snapshot["service"]["max_in_flight"] == 4
+    
+    @pytest.mark.asyncio
+    async def test_load_shedding(self):
+        """Test submissions beyond max_in_flight are shed with a 503."""
+        service = _service(max_in_flight=1, delay=0.2)
+        server = await serve(service, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        
+        async with server:
+            first = await _request(port, "POST", "/tickets", {"subject": "One", "description": "First"})
+            second = await _request(port, "POST", "/tickets", {"subject": "Two", "description": "Second"})
+            ready = await _request(port, "GET", "/readyz")
+            await service.drain()
+        
+        assert first[0] == 202
+        assert second[0] == 503
+        assert "Retry-After: 1" in second[1]
+        assert ready[0] == 503
+    
+    @pytest.mark.asyncio
+    async def test_bad_requests(self):
+        """Test validation errors and unknown tickets."""
+        service = _service()
+        server = await serve(service, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        
+        async with server:
+            assert (await _request(port, "POST", "/tickets", {"subject": "Only subject"}))[0] == 400
+            for not_an_object in ([], "x", 3):
+                assert (await _request(port, "POST", "/tickets", not_an_object))[0] == 400
+            unsafe = {"subject": "Help", "description": "Need help", "ticket_id": "../../x"}
+            assert (await _request(port, "POST", "/tickets", unsafe))[0] == 400
+            unknown_tenant = {"subject": "Help", "description": "Need help", "tenant_id": "no-such-tenant"}
+            assert (await _request(port, "POST", "/tickets", unknown_tenant))[0] == 400
+            assert (await _request(port, "GET", "/tickets/TKT-missing"))[0] == 404
+            assert (await _request(port, "GET", "/nowhere"))[0] == 404
+    
+    @pytest.mark.asyncio
+    async def test_duplicate_ticket_and_bad_content_length(self):
+        """Test a ticket ID already in use gets a 409 and a non-numeric Content-Length a 400."""
+        service = _service(delay=0.1)
+        server = await serve(service, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        
+        async with server:
+            ticket = {"subject": "Help", "description": "Need help", "ticket_id": "TKT-dup"}
+            assert (await _request(port, "POST", "/tickets", ticket))[0] == 202
+            status, _, error = await _request(port, "POST", "/tickets", {**ticket, "subject": "Other"})
+            await service.drain()
+            
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write(b"POST /tickets HTTP/1.1\r\nHost: localhost\r\nContent-Length: abc\r\n\r\n")
+            await writer.drain()
+            response = await reader.read()
+            writer.close()
+        
+        assert status == 409
+        assert "already exists" in error["error"]
+        assert service.jobs["TKT-dup"]["result"]["final_response"] == "Re: Help"
+        assert int(response.split()[1]) == 400
+    
+    @pytest.mark.asyncio
+    async def test_scheduler_sheds_per_category(self):
+        """Test a full General bulkhead sheds General tickets but still admits Security ones."""
+        service = _service(delay=0.2)
+        service.config["scheduler"] = {
+            **service.config["scheduler"],
+            "bulkheads": {"General": 1, "Security": 1},
+            "max_queue_per_bulkhead": 1,
+        }
+        from service.scheduler import TicketScheduler
+        service.scheduler = TicketScheduler(service.config)
+        server = await serve(service, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        
+        async with server:
+            general = await _request(port, "POST", "/tickets", {"subject": "Hello", "description": "Office hours?"})
+            queued = await _request(port, "POST", "/tickets", {"subject": "Hello", "description": "Opening times?"})
+            shed = await _request(port, "POST", "/tickets", {"subject": "Hello", "description": "Phone number?"})
+            security = await _request(port, "POST", "/tickets", {"subject": "Suspicious login", "description": "Unknown login"})
+            await service.drain()
+            _, _, snapshot = await _request(port, "GET", "/metrics")
+        
+        assert general[0] == 202
+        assert queued[0] == 202
+        assert shed[0] == 503
+        assert security[0] == 202
+        assert "security_normal" in snapshot["scheduler"]["queue_wait_seconds"]
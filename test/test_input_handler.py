@@ -0,0 +1,96 @@
+import pytest
+import sys
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import nodes.input_handler as input_handler
+from nodes.input_handler import (
+    collapse_repeated_lines, dedupe_quoted_email, normalize_description, process_input, trim_stack_traces
+)
+from utils.helpers import load_config
+from utils.metrics import metrics
+
+LOG_RUN = [f"2024-05-01 10:00:{i:02d} ERROR worker-{i} connection refused to 10.0.0.{i}" for i in range(40)]
+
+PYTHON_TRACE = ["Traceback (most recent call last):"] + [
+    line for i in range(10) for line in (f'  File "/app/module_{i}.py", line {i + 1}, in step_{i}', f"    step_{i + 1}()")
+] + ["ValueError: invalid invoice id"]
+
+JAVA_TRACE = ["java.lang.NullPointerException: account is null"] + [
+    f"\tat com.example.billing.Service.method{i}(Service.java:{i})" for i in range(30)
+] + ["\t... 12 more"]
+
+EMAIL = [
+    "The export still fails.",
+    "",
+    "On Mon, 1 May 2024, Support wrote:",
+    "> Please try the export again.",
+    "> On Sun, 30 Apr 2024, Customer wrote:",
+    ">> The export fails with a timeout.",
+    "",
+    "-----Original Message-----",
+    "Please try the export again.",
+    "The export fails with a timeout.",
+]
+
+class TestInputHandler:
+    """Test cases for input validation and description normalization."""
+
+    def setup_method(self):
+        metrics.reset()
+
+    def test_repeated_log_lines_collapsed(self):
+        """Test runs of lines differing only in timestamps and numbers are collapsed."""
+        collapsed = collapse_repeated_lines(["Export failed:"] + LOG_RUN + ["Please help"])
+
+        assert collapsed == ["Export failed:", LOG_RUN[0], LOG_RUN[1],
+                             "[... similar line repeated 38 more times]", "Please help"]
+
+    def test_stack_traces_keep_key_frames(self):
+        """Test Python traces keep the innermost frames and Java traces the topmost."""
+        python = trim_stack_traces(PYTHON_TRACE, keep_frames=2)
+        assert python[0] == PYTHON_TRACE[0]
+        assert python[1] == "  [... 8 frames omitted]"
+        assert python[2:] == PYTHON_TRACE[-5:]
+
+        java = trim_stack_traces(JAVA_TRACE, keep_frames=3)
+        assert java == JAVA_TRACE[:4] + ["    [... 28 frames omitted]"]
+
+    def test_quoted_email_history_deduped(self):
+        """Test quoted and forwarded history lines are kept only once."""
+        deduped = dedupe_quoted_email(EMAIL)
+
+        assert deduped[:6] == EMAIL[:6]
+        assert "Please try the export again." not in deduped
+        assert deduped[-1] == "[... 2 repeated quoted email lines removed]"
+
+    def test_token_cap(self):
+        """Test the normalized description respects max_description_tokens."""
+        config = {**load_config(), "input_normalization": {"enabled": True, "max_description_tokens": 50}}
+        description = " ".join(f"word{i}" for i in range(500))
+
+        normalized, original_tokens, tokens = normalize_description(description, config)
+
+        assert tokens <= 51
+        assert original_tokens > tokens
+
+    def test_process_input_keeps_original(self, monkeypatch):
+        """Test prompts get the normalized description while the original is kept."""
+        config = {**load_config(), "input_normalization": {"enabled": True, "max_repeated_lines": 2}}
+        monkeypatch.setattr(input_handler, "load_config", lambda: config)
+        description = "\n".join(["Export keeps failing:"] + LOG_RUN + PYTHON_TRACE)
+
+        result = process_input({"ticket_id": "T1", "subject": "Export failing", "description": f"  {description}  "})
+
+        assert result["original_description"] == description
+        assert len(result["description"]) < len(description) / 3
+        assert "[... similar line repeated 38 more times]" in result["description"]
+        assert metrics.get_counter("input_tokens_saved_total") > 0
+
+    def test_missing_fields_rejected(self):
+        """Test a ticket without a description is rejected."""
+        with pytest.raises(ValueError):
+            process_input({"subject": "Help", "description": "   "})
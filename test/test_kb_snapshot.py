@@ -0,0 +1,128 @@
+import pytest
+import sys
+import os
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from benchmarks.synthetic_kb import create_workspace, remove_workspace, sample_tickets
+from nodes.retriever import rank_category, rank_category_batch, score_documents, tokenize_query
+from utils.helpers import clear_caches, load_config, load_knowledge_base
+from utils.document_store import resolve_document
+from utils.kb_snapshot import KnowledgeBaseSnapshot, build_snapshot, load_snapshot
+
+@pytest.fixture
+def workspace(monkeypatch):
+    """Synthetic knowledge base as the working directory."""
+    root = create_workspace(200)
+    monkeypatch.chdir(root)
+    clear_caches()
+    yield root
+    clear_caches()
+    remove_workspace(root)
+
+class TestKnowledgeBaseSnapshot:
+    """Test cases for the memory-mapped knowledge base snapshot."""
+
+    def test_documents_round_trip(self, workspace):
+        """Test the snapshot returns every document in knowledge base order."""
+        build_snapshot("data/knowledge_base", "data/kb_snapshot.bin")
+        snapshot = KnowledgeBaseSnapshot(Path("data/kb_snapshot.bin"))
+
+        for category in ["Billing", "Security"]:
+            assert snapshot.covers(category)
+            assert snapshot.documents(category) == load_knowledge_base(category)
+        assert not snapshot.covers("Shipping")
+
+    def test_scores_match_in_process_retrieval(self, workspace):
+        """Test snapshot scoring ranks documents exactly like score_documents."""
+        build_snapshot("data/knowledge_base", "data/kb_snapshot.bin")
+        snapshot = KnowledgeBaseSnapshot(Path("data/kb_snapshot.bin"))
+
+        for ticket in sample_tickets(8):
+            words = tokenize_query(ticket["subject"], ticket["description"])
+            for category in ["Billing", "Technical", "Security", "General"]:
+                expected = score_documents(load_knowledge_base(category), words)
+                actual = [(snapshot.document(index), score) for index, score in snapshot.score(category, words)]
+                assert actual == expected
+
+    def test_non_ascii_text(self, tmp_path):
+        """Test lowercased matching works when lowercasing changes byte lengths."""
+        kb_dir = tmp_path / "general_docs"
+        kb_dir.mkdir()
+        (kb_dir / "a.txt").write_text("ÜBERWEISUNG dauert zwei Tage", encoding="utf-8")
+        (kb_dir / "b.txt").write_text("Refunds take İstanbul office five days", encoding="utf-8")
+        build_snapshot(str(tmp_path), str(tmp_path / "kb.bin"))
+        snapshot = KnowledgeBaseSnapshot(tmp_path / "kb.bin")
+
+        documents = snapshot.documents("General")
+        for words in (["überweisung"], ["office", "refunds"], ["tage"]):
+            expected = score_documents(documents, words)
+            assert [(snapshot.document(i), s) for i, s in snapshot.score("General", words)] == expected
+
+    def test_retriever_uses_configured_snapshot(self, workspace):
+        """Test rank_category gives the same context with and without the snapshot."""
+        build_snapshot("data/knowledge_base", "data/kb_snapshot.bin")
+        config = load_config()
+        snapshot_config = {**config, "knowledge_base": {"snapshot_path": "data/kb_snapshot.bin"}}
+        words = tokenize_query(**sample_tickets(1)[0])
+
+        assert rank_category("Billing", words, snapshot_config) == rank_category("Billing", words, config)
+
+    def test_batch_ranking_on_snapshot(self, workspace):
+        """Test batch ranking over the mapped snapshot matches per-ticket ranking."""
+        build_snapshot("data/knowledge_base", "data/kb_snapshot.bin")
+        config = load_config()
+        snapshot_config = {**config, "knowledge_base": {"snapshot_path": "data/kb_snapshot.bin"}}
+        queries = [tokenize_query(**ticket) for ticket in sample_tickets(12)]
+
+        for category in ["Billing", "Security"]:
+            expected = [rank_category(category, words, config) for words in queries]
+            assert rank_category_batch(category, queries, snapshot_config) == expected
+            assert rank_category_batch(category, queries, config) == expected
+
+    def test_edited_document_reloaded(self, workspace):
+        """Test load_knowledge_base picks up a document edited in place, which leaves the directory mtime alone."""
+        documents = load_knowledge_base("Billing")
+        path = sorted((workspace / "data/knowledge_base/billing_docs").glob("*.txt"))[0]
+        directory_mtime = os.stat(path.parent).st_mtime_ns
+
+        path.write_text("Edited billing policy")
+        os.utime(path, ns=(1, 1))
+
+        assert os.stat(path.parent).st_mtime_ns == directory_mtime
+        assert load_knowledge_base("Billing") == ["Edited billing policy", *documents[1:]]
+
+    def test_stale_detection(self, workspace):
+        """Test a snapshot notices source directories changing after the build."""
+        build_snapshot("data/knowledge_base", "data/kb_snapshot.bin")
+        snapshot = KnowledgeBaseSnapshot(Path("data/kb_snapshot.bin"))
+        assert not snapshot.is_stale()
+
+        (workspace / "data/knowledge_base/billing_docs/new.txt").write_text("New billing policy")
+        os.utime(workspace / "data/knowledge_base/billing_docs", ns=(1, 1))
+        assert snapshot.is_stale()
+
+    def test_snapshot_without_document_names_is_stale(self, workspace):
+        """Test a snapshot built before documents were named is treated as stale."""
+        build_snapshot("data/knowledge_base", "data/kb_snapshot.bin")
+        snapshot = KnowledgeBaseSnapshot(Path("data/kb_snapshot.bin"))
+        assert not snapshot.is_stale()
+        assert snapshot.document_names("Billing") == sorted(path.stem for path in Path("data/knowledge_base/billing_docs").glob("*.txt"))
+
+        snapshot.names = {}
+        assert snapshot.is_stale()
+
+    def test_stale_snapshot_falls_back_to_text_files(self, workspace):
+        """Test a snapshot built before a document was added isn't served, so new documents resolve from the text files."""
+        build_snapshot("data/knowledge_base", "data/kb_snapshot.bin")
+        config = {**load_config(), "knowledge_base": {"snapshot_path": "data/kb_snapshot.bin"}}
+        assert load_snapshot(config) is not None
+
+        (workspace / "data/knowledge_base/billing_docs/000_new.txt").write_text("Refund policy for annual plans")
+        os.utime(workspace / "data/knowledge_base/billing_docs", ns=(1, 1))
+
+        assert load_snapshot(config) is None
+        assert resolve_document("Billing/000_new", config) == "Refund policy for annual plans"
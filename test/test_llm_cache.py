@@ -0,0 +1,70 @@
+import pytest
+import sys
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from langchain_core.messages import AIMessage, HumanMessage
+import utils.llm as llm_module
+from utils.llm import invoke_llm
+from utils.llm_cache import LLMResponseCache, cache_key
+from utils.metrics import metrics
+
+class CountingLLM:
+    def __init__(self, temperature=0.1):
+        self.kwargs = {"model": "gpt-4o-mini", "temperature": temperature, "max_tokens": 500}
+        self.calls = 0
+
+    def invoke(self, messages, **kwargs):
+        self.calls += 1
+        return AIMessage(content=f"APPROVED #{self.calls}")
+
+class TestLLMCache:
+    """Test cases for LLM response memoization."""
+
+    def setup_method(self):
+        metrics.reset()
+
+    def test_key_covers_parameters_and_prompt(self):
+        """Test the key changes with the prompt and the model parameters."""
+        messages = [HumanMessage(content="Review this draft")]
+
+        assert cache_key(CountingLLM(), messages) == cache_key(CountingLLM(), messages)
+        assert cache_key(CountingLLM(), messages) != cache_key(CountingLLM(temperature=0.5), messages)
+        assert cache_key(CountingLLM(), messages) != cache_key(CountingLLM(), [HumanMessage(content="Other")])
+
+    def test_lru_eviction_and_ttl(self, tmp_path):
+        """Test least recently used entries are evicted and expired ones ignored."""
+        cache = LLMResponseCache(str(tmp_path / "cache.sqlite3"), max_entries=2)
+        for key in ["a", "b"]:
+            cache.put(key, "reviewer", AIMessage(content=key))
+
+        assert cache.get("a").content == "a"  # a is now more recent than b
+        cache.put("c", "reviewer", AIMessage(content="c"))
+
+        assert len(cache) == 2
+        assert cache.get("b") is None
+        assert cache.get("a").content == "a"
+
+        expired = LLMResponseCache(str(tmp_path / "expired.sqlite3"), ttl_seconds=1e-9)
+        expired.put("a", "reviewer", AIMessage(content="a"))
+        assert expired.get("a") is None
+
+    def test_invoke_llm_memoizes_enabled_nodes(self, tmp_path, monkeypatch):
+        """Test enabled nodes reuse stored responses and other nodes always call the model."""
+        config = {"llm_cache": {"path": str(tmp_path / "cache.sqlite3"), "nodes": {"reviewer": True}}}
+        monkeypatch.setattr(llm_module, "load_config", lambda: config)
+        llm = CountingLLM()
+        messages = [HumanMessage(content="Review this draft")]
+
+        first = invoke_llm("reviewer", llm, messages)
+        second = invoke_llm("reviewer", llm, messages)
+        assert first.content == second.content == "APPROVED #1"
+        assert llm.calls == 1
+        assert metrics.get_counter("llm_cache_hits_total", node="reviewer") == 1
+
+        invoke_llm("classifier", llm, messages)
+        invoke_llm("classifier", llm, messages)
+        assert llm.calls == 3
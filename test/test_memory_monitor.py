@@ -0,0 +1,115 @@
+import pytest
+import sys
+import asyncio
+import tracemalloc
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import utils.memory_monitor as memory_monitor
+from utils.memory_monitor import MemoryMonitor, count_live_states, format_report, load_samples
+from utils.metrics import metrics
+
+def leak_states(count: int):
+    return [{"ticket_id": f"TKT-{i}", "processing_step": "completed", "context": f"context {i:04d} " * 200,
+             "failed_attempts": []} for i in range(count)]
+
+class FakeRSS:
+    def __init__(self, mb: float):
+        self.mb = mb
+
+    def __call__(self) -> int:
+        return int(self.mb * 2**20)
+
+class TestMemoryMonitor:
+    """Test cases for memory sampling and the soft memory ceiling."""
+
+    def setup_method(self):
+        metrics.reset()
+
+    def test_sample_reports_growth_sites(self, tmp_path):
+        """Test a sample attributes allocation growth to the allocating line and counts live states."""
+        monitor = MemoryMonitor(str(tmp_path), interval=3600, rss_reader=FakeRSS(100))
+        monitor.start()
+        try:
+            retained = leak_states(500)
+            sample = monitor.sample()
+        finally:
+            monitor.stop()
+            tracemalloc.stop()
+
+        assert sample["live_states"] >= 500
+        assert sample["rss_bytes"] == 100 * 2**20
+        top = sample["growth"][0]
+        assert top["site"].startswith("test/test_memory_monitor.py:")
+        assert top["size_diff"] > 500 * 2000
+        assert len(load_samples(monitor.path)) == 2
+        assert metrics.get_gauge("memory_live_states") >= 500
+        del retained
+
+    def test_soft_limit_hysteresis(self, tmp_path):
+        """Test backpressure starts at the limit and lifts only below the resume fraction."""
+        rss = FakeRSS(100)
+        monitor = MemoryMonitor(str(tmp_path), soft_limit_mb=200, resume_fraction=0.9, rss_reader=rss)
+
+        assert not monitor.over_soft_limit()
+        rss.mb = 210
+        assert monitor.over_soft_limit()
+        rss.mb = 190
+        assert monitor.over_soft_limit()
+        rss.mb = 170
+        assert not monitor.over_soft_limit()
+        assert metrics.get_counter("memory_soft_limit_hits_total") == 1
+
+    def test_wait_for_memory_blocks_until_resumed(self, tmp_path, monkeypatch):
+        """Test intake waits while over the limit and continues once RSS drops."""
+        rss = FakeRSS(300)
+        monitor = MemoryMonitor(str(tmp_path), soft_limit_mb=200, rss_reader=rss)
+        monkeypatch.setattr(memory_monitor, "get_memory_monitor", lambda: monitor)
+
+        async def release():
+            await asyncio.sleep(0.05)
+            rss.mb = 100
+
+        async def run():
+            await asyncio.gather(memory_monitor.wait_for_memory(poll_interval=0.01), release())
+
+        asyncio.run(run())
+        assert not monitor.throttled
+
+    def test_disabled_by_default(self):
+        """Test the monitor stays off, and never throttles, unless memory.enabled is set."""
+        assert memory_monitor.get_memory_monitor() is None
+        assert not memory_monitor.over_soft_limit()
+        with memory_monitor.monitor_ticket():
+            pass
+
+    def test_report_lists_top_growth(self):
+        """Test the report shows the RSS trend and ranks sites by growth at the end of the run."""
+        samples = [
+            {"elapsed_seconds": 0, "rss_bytes": 100 * 2**20, "traced_bytes": 0, "live_states": 4, "growth": []},
+            {"elapsed_seconds": 60, "rss_bytes": 300 * 2**20, "traced_bytes": 150 * 2**20, "live_states": 900,
+             "throttled": True, "growth": [
+                 {"site": "nodes/retriever.py:80", "callers": [], "size_diff": 10 * 2**20, "count_diff": 50, "size": 10 * 2**20},
+                 {"site": "utils/llm.py:120", "callers": ["nodes/reviewer.py:40"], "size_diff": 90 * 2**20,
+                  "count_diff": 900, "size": 95 * 2**20},
+             ]},
+        ]
+
+        report = format_report(samples, top=5)
+
+        assert "100.0 MB -> 300.0 MB" in report
+        assert "Live states:  4 -> 900" in report
+        lines = report.splitlines()
+        first_site = next(i for i, line in enumerate(lines) if "utils/llm.py:120" in line)
+        assert first_site < next(i for i, line in enumerate(lines) if "nodes/retriever.py:80" in line)
+        assert "<- nodes/reviewer.py:40" in lines[first_site]
+
+    def test_count_live_states(self):
+        """Test live states counts dicts shaped like ticket states."""
+        before = count_live_states()
+        states = leak_states(10)
+        assert count_live_states() - before == 10
+        del states
@@ -0,0 +1,45 @@
+import pytest
+import sys
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from utils.metrics import MetricsRegistry
+
+class TestMetrics:
+    """Test cases for the in-process metrics registry."""
+    
+    def test_counters_by_label(self):
+        """Test counters are kept per label set."""
+        registry = MetricsRegistry()
+        registry.increment("calls", node="a")
+        registry.increment("calls", 2, node="a")
+        registry.increment("calls", node="b")
+        
+        assert registry.get_counter("calls", node="a") == 3
+        assert registry.get_counter("calls", node="b") == 1
+        assert registry.get_counter("calls", node="c") == 0
+    
+    def test_histogram_percentiles(self):
+        """Test histogram percentiles over recent samples."""
+        registry = MetricsRegistry(max_samples=100)
+        for value in range(1, 101):
+            registry.observe("latency", value / 100)
+        
+        assert registry.percentile("latency", 50) == pytest.approx(0.5)
+        assert registry.percentile("latency", 99) == pytest.approx(0.99)
+    
+    def test_snapshot(self):
+        """Test the snapshot formats labels and summarizes histograms."""
+        registry = MetricsRegistry()
+        registry.increment("calls", node="a")
+        registry.set_gauge("in_flight", 4)
+        registry.observe("latency", 0.2, node="a")
+        
+        snapshot = registry.snapshot()
+        
+        assert snapshot["counters"] == {"calls{node=a}": 1.0}
+        assert snapshot["gauges"] == {"in_flight": 4}
+        assert snapshot["histograms"]["latency{node=a}"]["count"] == 1
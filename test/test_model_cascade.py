@@ -0,0 +1,89 @@
+import pytest
+import sys
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from langchain_core.messages import AIMessage
+import nodes.classifier as classifier
+import nodes.draft_generator as draft_generator
+from utils.helpers import load_config
+from utils.metrics import metrics
+from utils.model_cascade import call_cost, cascade_models, model_for_attempt, record_review_outcome
+
+CASCADE = {
+    "enabled": True,
+    "nodes": {"draft_generator": ["small", "large"], "classifier": ["small", "large"]},
+    "pricing": {"small": {"input": 1.0, "output": 2.0}, "large": {"input": 10.0, "output": 20.0}}
+}
+
+class FakeLLM:
+    def __init__(self, model: str, answers: dict):
+        self.model = model
+        self.answers = answers
+
+    def invoke(self, messages, **kwargs):
+        return AIMessage(
+            content=self.answers[self.model],
+            usage_metadata={"input_tokens": 1000, "output_tokens": 100, "total_tokens": 1100}
+        )
+
+@pytest.fixture
+def cascade_config(monkeypatch):
+    """Enable the cascade and route chat models to fakes answering per model."""
+    config = {**load_config(), "model_cascade": CASCADE, "deadline": {}}
+    answers = {}
+    for module in (classifier, draft_generator):
+        monkeypatch.setattr(module, "load_config", lambda: config)
+        monkeypatch.setattr(module, "get_chat_model", lambda model, temperature, max_tokens: FakeLLM(model, answers))
+    return answers
+
+class TestModelCascade:
+    """Test cases for the per-node model cascade."""
+
+    def setup_method(self):
+        metrics.reset()
+
+    def test_tiers_by_attempt(self):
+        """Test attempts move up the tiers and stay on the last one."""
+        config = {"llm": {"model": "default"}, "model_cascade": CASCADE}
+
+        assert [model_for_attempt("draft_generator", attempt, config) for attempt in range(3)] == ["small", "large", "large"]
+        assert cascade_models("reviewer", config) == ["default"]
+        assert cascade_models("draft_generator", {**config, "model_cascade": {**CASCADE, "enabled": False}}) == ["default"]
+
+    def test_draft_retry_uses_stronger_model(self, cascade_config):
+        """Test the first draft uses the small model and the retry the large one."""
+        cascade_config.update({"small": "Small draft", "large": "Large draft"})
+        state = {"ticket_id": "T1", "subject": "Refund", "description": "Charged twice", "category": "Billing",
+                 "context": "", "context_docs": []}
+
+        first = draft_generator.generate_draft({**state, "attempt_count": 0})
+        retry = draft_generator.generate_draft({**state, "attempt_count": 1, "reviewer_feedback": "Too vague"})
+
+        assert (first["draft_model"], first["draft_response"]) == ("small", "Small draft")
+        assert (retry["draft_model"], retry["draft_response"]) == ("large", "Large draft")
+        assert metrics.get_counter("cascade_cost_usd_total", node="draft_generator", model="large") == pytest.approx(0.012)
+
+    def test_classifier_escalates_on_invalid_category(self, cascade_config):
+        """Test the classifier only calls the large model when the small one's answer is invalid."""
+        state = {"ticket_id": "T1", "subject": "Refund", "description": "Charged twice"}
+
+        cascade_config.update({"small": "Billing", "large": "Technical"})
+        assert classifier.classify_ticket(state)["category"] == "Billing"
+        assert metrics.get_counter("cascade_calls_total", node="classifier", model="large") == 0
+
+        cascade_config.update({"small": "Payments, probably", "large": "Billing"})
+        assert classifier.classify_ticket(state)["category"] == "Billing"
+        assert metrics.get_counter("cascade_calls_total", node="classifier", model="large") == 1
+
+    def test_approval_rate_and_cost(self):
+        """Test review outcomes feed the per-model approval rate, and pricing the cost."""
+        for approved in (True, False, True, True):
+            record_review_outcome("small", approved)
+
+        assert metrics.get_gauge("cascade_approval_rate", model="small") == 0.75
+        assert call_cost("small", {"input_tokens": 1_000_000, "output_tokens": 500_000}, {"model_cascade": CASCADE}) == 2.0
+        assert call_cost("unknown", {"input_tokens": 10, "output_tokens": 10}, {"model_cascade": CASCADE}) == 0.0
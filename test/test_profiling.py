@@ -0,0 +1,74 @@
+import pytest
+import sys
+import json
+import time
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import utils.profiling as profiling
+from utils.profiling import TicketProfiler, aggregate_profiles, format_report, profiled_node
+
+def busy_node(seconds: float):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+class TestProfiling:
+    """Test cases for the ticket profiler."""
+
+    def test_slow_ticket_profile_written(self, tmp_path):
+        """Test a ticket over the threshold gets its stacks and node timings written."""
+        profiler = TicketProfiler(str(tmp_path), sample_rate=0.0, slow_threshold=0.0, interval=0.001)
+
+        profiler.start_ticket("TKT-1")
+        with profiler.node("TKT-1", "reviewer"):
+            busy_node(0.1)
+        path = profiler.finish_ticket("TKT-1")
+
+        profile = json.loads(path.read_text())
+        assert profile["reason"] == "slow"
+        assert profile["nodes"][0]["node"] == "reviewer"
+        assert profile["samples"] > 0
+        assert any("busy_node" in frame for entry in profile["stacks"] for frame in entry["stack"])
+
+    def test_fast_unsampled_ticket_discarded(self, tmp_path):
+        """Test fast tickets are dropped unless picked by the sample rate."""
+        profiler = TicketProfiler(str(tmp_path), sample_rate=0.0, slow_threshold=60.0)
+
+        profiler.start_ticket("TKT-1")
+        with profiler.node("TKT-1", "classifier"):
+            pass
+
+        assert profiler.finish_ticket("TKT-1") is None
+        assert list(tmp_path.iterdir()) == []
+
+    def test_report_aggregates_profiles(self, tmp_path):
+        """Test the report ranks functions by self and cumulative samples."""
+        for ticket_id in ["TKT-1", "TKT-2"]:
+            (tmp_path / f"{ticket_id}.json").write_text(json.dumps({
+                "ticket_id": ticket_id,
+                "nodes": [{"node": "reviewer", "offset_seconds": 0.0, "seconds": 1.5}],
+                "stacks": [
+                    {"stack": ["main", "review_draft", "invoke"], "count": 3},
+                    {"stack": ["main", "review_draft"], "count": 1},
+                ],
+            }))
+
+        aggregate = aggregate_profiles(sorted(tmp_path.glob("*.json")))
+        assert aggregate["total_samples"] == 8
+        assert aggregate["self"].most_common(1)[0] == ("invoke", 6)
+        assert aggregate["cumulative"]["review_draft"] == 8
+        assert aggregate["node_seconds"]["reviewer"] == 3.0
+
+        report = format_report(aggregate, top=2)
+        assert "invoke" in report and "reviewer" in report
+
+    def test_profiled_node_passthrough_when_disabled(self, monkeypatch):
+        """Test wrapped nodes behave normally with profiling off."""
+        monkeypatch.setattr(profiling, "get_profiler", lambda: None)
+        node = profiled_node("classifier", lambda state: {**state, "category": "Billing"})
+
+        assert node({"ticket_id": "TKT-1"}) == {"ticket_id": "TKT-1", "category": "Billing"}
@@ -0,0 +1,92 @@
+import pytest
+import sys
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from utils.prompt_assembler import (
+    build_generator_context, build_reviewer_context, compress_context, count_tokens, cited_spans
+)
+
+POLICY = """BILLING POLICIES
+
+1. REFUND POLICY
+- Full refunds available within 30 days of initial purchase
+- Refunds are processed within 5-7 business days
+
+2. PAYMENT METHODS
+- Credit cards (Visa, MasterCard, American Express)
+- Bank transfers for Enterprise customers
+
+3. ACCOUNT SUSPENSION
+- Accounts are suspended for non-payment after 7 days
+- Data is retained for 30 days after suspension"""
+
+BUDGET_CONFIG = {
+    "prompt_budget": {
+        "enabled": True,
+        "generator": {"max_context_tokens": 40, "max_feedback_tokens": 5},
+        "reviewer": {"max_context_tokens": 200, "cited_spans_only": True}
+    }
+}
+
+class TestPromptAssembler:
+    """Test cases for token-budgeted prompt assembly."""
+    
+    def test_duplicate_documents_deduplicated(self):
+        """Test repeated context is only included once."""
+        compressed = compress_context([POLICY, POLICY], "refund", max_tokens=1000)
+        
+        assert compressed.count("Full refunds available") == 1
+    
+    def test_compression_respects_budget_and_query(self):
+        """Test the most query-relevant sentences are kept within budget."""
+        compressed = compress_context([POLICY], "I want a refund for my purchase", max_tokens=30)
+        
+        assert count_tokens(compressed) <= 30
+        assert "Full refunds available within 30 days" in compressed
+        assert "MasterCard" not in compressed
+    
+    def test_cited_spans(self):
+        """Test only sentences the draft relies on are treated as cited."""
+        draft = "You can get full refunds within 30 days of your initial purchase."
+        
+        cited = [unit["text"] for unit in cited_spans([POLICY], draft)]
+        
+        assert cited == ["- Full refunds available within 30 days of initial purchase"]
+    
+    def test_disabled_budget_keeps_legacy_prompt(self):
+        """Test context and feedback are unchanged without a prompt budget."""
+        state = {"context": POLICY, "reviewer_feedback": "Mention the refund window"}
+        
+        assembled = build_generator_context(state, {})
+        
+        assert assembled == POLICY + "\n\nPrevious Reviewer Feedback: Mention the refund window"
+        assert build_reviewer_context(state, "draft", {}) == POLICY
+    
+    def test_reviewer_receives_cited_context(self):
+        """Test the reviewer sees the cited sentences instead of the full context."""
+        state = {"subject": "Refund", "description": "Refund please", "context": POLICY, "context_docs": [POLICY]}
+        draft = "Refunds are processed within 5-7 business days."
+        
+        assembled = build_reviewer_context(state, draft, BUDGET_CONFIG)
+        
+        assert "Refunds are processed within 5-7 business days" in assembled
+        assert "Bank transfers" not in assembled
+    
+    def test_generator_feedback_truncated(self):
+        """Test reviewer feedback is held to its token budget."""
+        state = {
+            "subject": "Refund",
+            "description": "Need a refund",
+            "context_docs": [POLICY],
+            "reviewer_feedback": "Please be much more specific about the refund timeline and the eligibility window"
+        }
+        
+        assembled = build_generator_context(state, BUDGET_CONFIG)
+        feedback = assembled.split("Previous Reviewer Feedback: ")[1]
+        
+        assert feedback.endswith("...")
+        assert count_tokens(feedback[:-3]) <= 5
@@ -0,0 +1,75 @@
+import pytest
+import sys
+import time
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from utils.results_store import ResultsStore, result_status
+
+def _result(ticket_id: str, category: str = "Billing", escalated: bool = False, attempts: int = 1) -> dict:
+    return {
+        "ticket_id": ticket_id,
+        "subject": f"Subject {ticket_id}",
+        "category": category,
+        "attempt_count": attempts,
+        "escalated": escalated,
+        "review_approved": not escalated,
+        "draft_response": "Your refund is on its way.",
+        "final_response": "Escalated. Reference ID: " + ticket_id if escalated else "",
+        "processing_step": "escalated" if escalated else "reviewed",
+    }
+
+class TestResultsStore:
+    """Test cases for the persistent results store."""
+
+    def test_record_and_lookup(self, tmp_path):
+        """Test results are written in the background and looked up by ID."""
+        store = ResultsStore(str(tmp_path / "results.sqlite3"), flush_interval=0.01)
+        store.record(_result("TKT-1"), latency_seconds=1.5)
+        store.record(_result("TKT-2", escalated=True, attempts=2))
+        assert store.flush(timeout=5)
+
+        resolved = store.get("TKT-1")
+        assert resolved["status"] == "resolved"
+        assert resolved["final_response"] == "Your refund is on its way."
+        assert resolved["latency_seconds"] == 1.5
+        assert store.get("TKT-2")["status"] == "escalated"
+        assert store.get("TKT-missing") is None
+
+    def test_query_and_report(self, tmp_path):
+        """Test filtered listings and per-category aggregates."""
+        store = ResultsStore(str(tmp_path / "results.sqlite3"), flush_interval=0.01)
+        for i in range(6):
+            store.record(_result(f"TKT-{i}", category="Billing" if i % 2 else "Technical",
+                                 escalated=i == 5, attempts=2 if i == 5 else 1), latency_seconds=float(i))
+        assert store.flush(timeout=5)
+
+        assert {row["ticket_id"] for row in store.query(category="Billing")} == {"TKT-1", "TKT-3", "TKT-5"}
+        assert [row["ticket_id"] for row in store.query(status="escalated")] == ["TKT-5"]
+        assert store.query(since=time.time() + 60) == []
+
+        report = {(row["category"], row["status"]): row for row in store.report()}
+        assert report[("Billing", "resolved")]["tickets"] == 2
+        assert report[("Billing", "escalated")]["avg_attempts"] == 2
+        assert report[("Technical", "resolved")]["avg_latency_seconds"] == 2.0
+
+    def test_lookups_use_indexes(self, tmp_path):
+        """Test ID lookups hit the primary key and filters use their indexes."""
+        store = ResultsStore(str(tmp_path / "results.sqlite3"))
+
+        def plan(sql, params):
+            return " ".join(row["detail"] for row in store._read(f"EXPLAIN QUERY PLAN {sql}", params))
+
+        assert "USING PRIMARY KEY" in plan("SELECT * FROM results WHERE ticket_id = ?", ("TKT-1",))
+        assert "idx_results_category" in plan(
+            "SELECT * FROM results WHERE category = ? ORDER BY created_at DESC", ("Billing",)
+        )
+
+    def test_result_status(self):
+        """Test results map to resolved, escalated or error."""
+        assert result_status(_result("TKT-1")) == "resolved"
+        assert result_status(_result("TKT-1", escalated=True)) == "escalated"
+        assert result_status({"processing_step": "error"}) == "error"
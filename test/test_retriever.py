@@ -6,7 +6,15 @@ from pathlib import Path
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
-from nodes.retriever import retrieve_context
+import nodes.retriever as retriever
+import utils.document_store as document_store
+from nodes.retriever import retrieve_context, retrieve_context_batch, prefetch_context, select_context
+from utils.document_store import document_id, resolve_documents
+from utils.helpers import load_config
+
+def context_text(state):
+    """Retrieved context as a prompt would see it."""
+    return "\n\n".join(resolve_documents(state["context_docs"], load_config()))
 
 class TestRetriever:
     """Test cases for the context retriever node."""
@@ -22,10 +30,9 @@ class TestRetriever:
         
         result = retrieve_context(state)
         
-        assert "context" in result
-        assert len(result["context"]) > 0
+        assert len(context_text(result)) > 0
+        assert all(set(ref) == {"id", "score"} for ref in result["context_docs"])
         assert result["processing_step"] == "context_retrieved"
-        assert "context_docs" in result
     
     def test_technical_context_retrieval(self):
         """Test retrieval of technical context."""
@@ -38,8 +45,7 @@ class TestRetriever:
         
         result = retrieve_context(state)
         
-        assert "context" in result
-        assert len(result["context"]) > 0
+        assert len(context_text(result)) > 0
         assert result["processing_step"] == "context_retrieved"
     
     def test_security_context_retrieval(self):
@@ -53,8 +59,7 @@ class TestRetriever:
         
         result = retrieve_context(state)
         
-        assert "context" in result
-        assert len(result["context"]) > 0
+        assert len(context_text(result)) > 0
         assert result["processing_step"] == "context_retrieved"
     
     def test_general_context_retrieval(self):
@@ -68,8 +73,7 @@ class TestRetriever:
         
         result = retrieve_context(state)
         
-        assert "context" in result
-        assert len(result["context"]) > 0
+        assert len(context_text(result)) > 0
         assert result["processing_step"] == "context_retrieved"
     
     def test_context_with_reviewer_feedback(self):
@@ -84,6 +88,72 @@ class TestRetriever:
         
         result = retrieve_context(state)
         
-        assert "context" in result
-        assert len(result["context"]) > 0
+        assert len(context_text(result)) > 0
         assert result["processing_step"] == "context_retrieved"
+
+    def test_prefetch_scores_every_category(self):
+        """Test category-agnostic prefetch keeps candidates for all categories."""
+        state = {
+            "ticket_id": "TEST-006",
+            "subject": "Refund request",
+            "description": "I need a refund for my subscription"
+        }
+        
+        result = prefetch_context(state)
+        
+        assert set(result["candidate_docs"]) == {"Billing", "Technical", "Security", "General"}
+        assert result["processing_step"] == "context_prefetched"
+    
+    def test_select_context_matches_direct_retrieval(self):
+        """Test the join step returns the same documents as retrieve_context."""
+        state = {
+            "ticket_id": "TEST-007",
+            "subject": "Refund request",
+            "description": "I need a refund for my subscription",
+            "category": "Billing"
+        }
+        
+        prefetched = {**state, **prefetch_context(state)}
+        selected = select_context(prefetched)
+        direct = retrieve_context(state)
+        
+        assert selected["context_docs"] == direct["context_docs"]
+        assert selected["context"] == direct["context"]
+        assert selected["processing_step"] == "context_retrieved"
+
+    def test_batch_matches_single_ticket_retrieval(self):
+        """Test batch retrieval returns the same context as retrieve_context per ticket."""
+        states = [
+            {"ticket_id": "TEST-008", "subject": "Refund request", "description": "I need a refund for my subscription", "category": "Billing"},
+            {"ticket_id": "TEST-009", "subject": "API error 401", "description": "Getting unauthorized errors when calling the API", "category": "Technical"},
+            {"ticket_id": "TEST-010", "subject": "Billing issue", "description": "Problem with my bill", "category": "Billing",
+             "reviewer_feedback": "Need more specific information about refund policies"},
+            {"ticket_id": "TEST-011", "subject": "Hi", "description": "Help", "category": "General"},
+            {"ticket_id": "TEST-012", "subject": "Account security", "description": "Suspicious activity on my account", "category": "Security"},
+        ]
+        
+        batch = retrieve_context_batch(states)
+        
+        assert [result["ticket_id"] for result in batch] == [state["ticket_id"] for state in states]
+        for state, result in zip(states, batch):
+            direct = retrieve_context(state)
+            assert result["context_docs"] == direct["context_docs"]
+            assert result["context"] == direct["context"]
+            assert result["processing_step"] == "context_retrieved"
+    
+    def test_batch_ranking_ties_and_repeated_words(self, monkeypatch):
+        """Test batch scores count repeated query words, keep KB order on ties and ignore cross-document hits."""
+        documents = ["Refund policy", "Invoice help", "Refund and invoice", "Nothing here", "Invoice refund"]
+        names = [f"doc_{position}" for position in range(len(documents))]
+        monkeypatch.setattr(document_store, "load_named_knowledge_base", lambda category: (names, documents))
+        config = {"knowledge_base": {}}
+        queries = [["refund", "invoice"], ["invoice", "invoice", "policy"], ["yinvoice"], ["zzzz"]]
+        
+        batch = retriever.rank_category_batch("Billing", queries, config)
+        
+        for words, (ranked, fallback) in zip(queries, batch):
+            expected = retriever.score_positions(documents, words)[:retriever.TOP_K]
+            assert ranked == [(document_id("Billing", names[position]), score) for position, score in expected]
+            assert fallback == [document_id("Billing", name) for name in names[:retriever.FALLBACK_DOCS]]
+        assert batch[2][0] == []
+
@@ -0,0 +1,106 @@
+import pytest
+import sys
+import asyncio
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from nodes.classifier import keyword_classify
+from service.scheduler import SchedulerSaturated, TicketScheduler
+from utils.helpers import load_config
+from utils.metrics import metrics
+
+def _scheduler(capacity: int = 1, max_queue: int = 100) -> TicketScheduler:
+    config = load_config()
+    scheduler_config = {
+        **config["scheduler"],
+        "bulkheads": {category: capacity for category in config["categories"]},
+        "max_queue_per_bulkhead": max_queue,
+    }
+    return TicketScheduler({**config, "scheduler": scheduler_config})
+
+class TestScheduler:
+    """Test cases for the priority scheduler and its bulkheads."""
+
+    def setup_method(self):
+        metrics.reset()
+
+    def test_keyword_classify(self):
+        """Test local classification picks the category with the most keyword hits."""
+        keywords = load_config()["keyword_classification"]["category_keywords"]
+
+        assert keyword_classify("Suspicious login activity", "Someone logged in from abroad", keywords) == "Security"
+        assert keyword_classify("Refund request", "I was charged twice on my invoice", keywords) == "Billing"
+        assert keyword_classify("Hello", "Where are your offices?", keywords) == "General"
+
+    def test_priority_classes(self):
+        """Test urgency keywords put a ticket ahead of normal tickets of its category."""
+        scheduler = _scheduler()
+
+        urgent = scheduler.classify("Production outage", "API is down with a 500 error")
+        normal = scheduler.classify("API error", "The API returns an error sometimes")
+        security = scheduler.classify("Suspicious login", "Unknown login on my account")
+
+        assert urgent["priority_class"] == "technical_urgent"
+        assert normal["priority_class"] == "technical_normal"
+        assert urgent["priority"] < normal["priority"]
+        assert security["priority"] < normal["priority"]
+
+    @pytest.mark.asyncio
+    async def test_waiters_start_in_priority_order(self):
+        """Test an urgent ticket queued after normal ones runs before them."""
+        scheduler = _scheduler(capacity=1)
+        order = []
+
+        async def work(name):
+            order.append(name)
+            await asyncio.sleep(0.01)
+
+        blocker = asyncio.create_task(scheduler.submit("API error", "Blocks the pool", lambda: work("blocker")))
+        await asyncio.sleep(0)
+        normal = asyncio.create_task(scheduler.submit("API error", "Normal", lambda: work("normal")))
+        urgent = asyncio.create_task(scheduler.submit("API outage", "Urgent production issue", lambda: work("urgent")))
+        await asyncio.gather(blocker, normal, urgent)
+
+        assert order == ["blocker", "urgent", "normal"]
+
+    @pytest.mark.asyncio
+    async def test_security_isolated_from_general_overload(self):
+        """Test a General flood does not delay Security tickets."""
+        scheduler = _scheduler(capacity=2)
+
+        async def slow():
+            await asyncio.sleep(0.05)
+
+        flood = [
+            asyncio.create_task(scheduler.submit(f"Question {i}", "Where are your offices?", slow))
+            for i in range(20)
+        ]
+        await asyncio.sleep(0)
+        security = [
+            asyncio.create_task(scheduler.submit("Suspicious login", f"Unknown login {i}", slow))
+            for i in range(2)
+        ]
+        await asyncio.gather(*security)
+
+        report = scheduler.queue_wait_report()
+        assert report["security_normal"]["p99"] < 0.02
+        assert scheduler.bulkheads["General"].waiting > 0
+
+        await asyncio.gather(*flood)
+        assert report["general_normal"]["p99"] < scheduler.queue_wait_report()["general_normal"]["p99"]
+
+    @pytest.mark.asyncio
+    async def test_full_queue_is_rejected(self):
+        """Test admission fails once a bulkhead's queue is full."""
+        scheduler = _scheduler(capacity=1, max_queue=1)
+
+        scheduler.admit("Hello", "First")
+        with pytest.raises(SchedulerSaturated):
+            scheduler.admit("Hello", "Second")
+
+        # Other categories are unaffected
+        scheduler.admit("Suspicious login", "Unknown login")
+        assert metrics.get_counter("scheduler_rejected_total", bulkhead="General") == 1
@@ -0,0 +1,86 @@
+import pytest
+import sys
+import asyncio
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from service.single_flight import SingleFlight, ticket_fingerprint
+
+class CountingProcessor:
+    """Fake process_ticket that counts graph runs."""
+    
+    def __init__(self, escalated: bool = False):
+        self.calls = 0
+        self.escalated = escalated
+    
+    async def __call__(self, subject, description, ticket_id="", tenant_id=""):
+        self.calls += 1
+        await asyncio.sleep(0.05)
+        return {
+            "ticket_id": ticket_id,
+            "category": "Technical",
+            "escalated": self.escalated,
+            "final_response": f"Reference ID: {ticket_id}" if self.escalated else "Restart your integration.",
+            "failed_attempts": [{"attempt": 1}]
+        }
+
+class TestSingleFlight:
+    """Test cases for single-flight ticket coalescing."""
+    
+    def test_fingerprint_normalization(self):
+        """Test case, punctuation and whitespace differences coalesce."""
+        assert ticket_fingerprint("API returning 500 errors!", "All  endpoints fail.") == \
+            ticket_fingerprint("api returning 500 errors", "all endpoints fail")
+        assert ticket_fingerprint("API down", "500s") != ticket_fingerprint("API down", "401s")
+    
+    @pytest.mark.asyncio
+    async def test_duplicates_share_one_run(self):
+        """Test identical in-flight tickets run the graph once with separate IDs."""
+        processor = CountingProcessor()
+        single_flight = SingleFlight(processor)
+        
+        results = await asyncio.gather(*[
+            single_flight.process("API returning 500 errors", "All endpoints fail", ticket_id=f"TKT-{i}")
+            for i in range(5)
+        ])
+        
+        assert processor.calls == 1
+        assert [r["ticket_id"] for r in results] == [f"TKT-{i}" for i in range(5)]
+        assert all(r["final_response"] == "Restart your integration." for r in results)
+        assert results[1]["coalesced_with"] == "TKT-0"
+        assert results[1]["failed_attempts"] is not results[0]["failed_attempts"]
+        assert single_flight.in_flight == 0
+    
+    @pytest.mark.asyncio
+    async def test_sequential_tickets_run_fresh(self):
+        """Test tickets arriving after completion are not coalesced."""
+        processor = CountingProcessor()
+        single_flight = SingleFlight(processor)
+        
+        await single_flight.process("Help", "Need help", ticket_id="TKT-1")
+        await single_flight.process("Help", "Need help", ticket_id="TKT-2")
+        
+        assert processor.calls == 2
+    
+    @pytest.mark.asyncio
+    async def test_escalated_reference_rewritten(self, tmp_path, monkeypatch):
+        """Test followers of an escalated ticket get their own reference ID and log row."""
+        import service.single_flight as single_flight_module
+        from utils.escalation_worker import EscalationWorker
+        log_file = tmp_path / "escalation_log.csv"
+        worker = EscalationWorker(lambda job: "unused", str(log_file), flush_interval=0.01)
+        monkeypatch.setattr(single_flight_module, "get_escalation_worker", lambda config: worker)
+        single_flight = SingleFlight(CountingProcessor(escalated=True))
+        
+        leader, follower = await asyncio.gather(
+            single_flight.process("Outage", "Everything is down", ticket_id="TKT-A"),
+            single_flight.process("Outage", "Everything is down", ticket_id="TKT-B")
+        )
+        
+        assert leader["final_response"] == "Reference ID: TKT-A"
+        assert follower["final_response"] == "Reference ID: TKT-B"
+        assert worker.flush(timeout=5)
+        assert "TKT-B" in log_file.read_text()
@@ -0,0 +1,70 @@
+import pytest
+import sys
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import nodes.speculative_drafter as speculative_drafter
+from nodes.speculative_drafter import generate_speculative_drafts, get_speculative_settings
+
+CONFIG = {
+    "llm": {"model": "gpt-4o-mini", "temperature": 0.1, "max_tokens": 1000},
+    "speculative_drafts": {
+        "enabled": True,
+        "categories": {"Security": {"num_drafts": 3, "temperatures": [0.1, 0.5]}}
+    }
+}
+
+@pytest.fixture
+def fake_nodes(monkeypatch):
+    """Replace the LLM-backed nodes with deterministic fakes."""
+    approved_temperatures = set()
+    
+    def fake_generate(state, temperature=None):
+        return {**state, "draft_response": f"draft@{temperature}", "attempt_count": state.get("attempt_count", 0) + 1}
+    
+    def fake_review(state):
+        temperature = float(state["draft_response"].split("@")[1])
+        approved = temperature in approved_temperatures
+        return {**state, "review_approved": approved, "reviewer_feedback": "ok" if approved else "too vague"}
+    
+    monkeypatch.setattr(speculative_drafter, "generate_draft", fake_generate)
+    monkeypatch.setattr(speculative_drafter, "review_draft", fake_review)
+    monkeypatch.setattr(speculative_drafter, "load_config", lambda: CONFIG)
+    return approved_temperatures
+
+class TestSpeculativeDrafter:
+    """Test cases for the speculative best-of-N drafter."""
+    
+    def test_settings_per_category(self):
+        """Test only configured categories get speculative settings."""
+        settings = get_speculative_settings("Security", CONFIG)
+        
+        assert settings["num_drafts"] == 3
+        assert settings["temperatures"] == [0.1, 0.5, 0.1]
+        assert get_speculative_settings("Billing", CONFIG) is None
+        assert get_speculative_settings("Security", {**CONFIG, "speculative_drafts": {"enabled": False}}) is None
+    
+    def test_first_approved_draft_returned(self, fake_nodes):
+        """Test an approved variant is selected and counts as one attempt."""
+        fake_nodes.add(0.5)
+        state = {"ticket_id": "TEST-001", "category": "Security", "attempt_count": 0}
+        
+        result = generate_speculative_drafts(state)
+        
+        assert result["review_approved"] is True
+        assert result["draft_response"] == "draft@0.5"
+        assert result["attempt_count"] == 1
+        assert result["processing_step"] == "reviewed"
+    
+    def test_all_rejected_combines_feedback(self, fake_nodes):
+        """Test a fully rejected round carries every variant's feedback."""
+        state = {"ticket_id": "TEST-002", "category": "Security", "attempt_count": 0}
+        
+        result = generate_speculative_drafts(state)
+        
+        assert result["review_approved"] is False
+        assert result["reviewer_feedback"].count("too vague") == 3
+        assert result["attempt_count"] == 1
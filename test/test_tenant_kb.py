@@ -0,0 +1,147 @@
+import pytest
+import os
+import sys
+import threading
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import utils.document_store as document_store
+from nodes.retriever import retrieve_context, retrieve_context_batch
+from service.single_flight import ticket_fingerprint
+from utils.document_store import resolve_documents
+from utils.kb_snapshot import build_snapshot
+from utils.metrics import metrics
+import utils.tenant_kb as tenant_kb
+from utils.tenant_kb import MIN_ENTRY_BYTES, TenantKnowledgeBases, UnknownTenant, validate_tenant_id
+
+def write_tenant(root: Path, tenant_id: str, documents: dict):
+    for category, texts in documents.items():
+        category_dir = root / tenant_id / f"{category.lower()}_docs"
+        category_dir.mkdir(parents=True)
+        for index, text in enumerate(texts):
+            (category_dir / f"doc_{index}.txt").write_text(text)
+
+@pytest.fixture
+def tenants(tmp_path, monkeypatch):
+    """Two tenants with different billing policies, served by a fresh tenant LRU."""
+    write_tenant(tmp_path, "acme", {"Billing": ["Acme refunds are issued within 3 days.", "Acme invoices monthly."]})
+    write_tenant(tmp_path, "globex", {"Billing": ["Globex refunds need manager approval.", "Globex bills yearly."]})
+    knowledge_bases = TenantKnowledgeBases(str(tmp_path), memory_budget_bytes=10 * 1024 * 1024)
+    monkeypatch.setattr(document_store, "get_tenant_knowledge_bases", lambda config: knowledge_bases)
+    return knowledge_bases
+
+def ticket(tenant_id: str) -> dict:
+    return {"ticket_id": f"T-{tenant_id}", "tenant_id": tenant_id, "category": "Billing",
+            "subject": "Refund", "description": "When will my refunds arrive?"}
+
+def documents(state: dict) -> list:
+    return resolve_documents(state["context_docs"], {})
+
+class TestTenantKnowledgeBases:
+    """Test cases for tenant-scoped knowledge bases."""
+
+    def setup_method(self):
+        metrics.reset()
+
+    def test_retrieval_uses_tenant_kb(self, tenants):
+        """Test each tenant's tickets get their own documents and untenanted tickets the shared KB."""
+        acme = retrieve_context(ticket("acme"))
+        globex = retrieve_context(ticket("globex"))
+        shared = retrieve_context(ticket(""))
+
+        assert documents(acme)[0].startswith("Acme refunds")
+        assert documents(globex)[0].startswith("Globex refunds")
+        assert not any("Acme" in doc or "Globex" in doc for doc in documents(shared))
+        assert tenants.loaded() == ["acme", "globex"]
+
+    def test_batch_groups_by_tenant(self, tenants):
+        """Test batch retrieval ranks each tenant's tickets against that tenant's documents."""
+        results = retrieve_context_batch([ticket("globex"), ticket("acme"), ticket("globex")])
+
+        assert [documents(result)[0].split()[0] for result in results] == ["Globex", "Acme", "Globex"]
+
+    def test_lru_evicts_over_budget_and_reloads(self, tmp_path):
+        """Test least recently used tenants are evicted past the budget and counted as reloads later."""
+        for tenant_id in ("a", "b", "c"):
+            write_tenant(tmp_path, tenant_id, {"Billing": [tenant_id * 40000]})
+        knowledge_bases = TenantKnowledgeBases(str(tmp_path), memory_budget_bytes=100000)
+
+        knowledge_bases.get("a")
+        knowledge_bases.get("b")
+        knowledge_bases.get("a")
+        knowledge_bases.get("c")
+
+        assert knowledge_bases.loaded() == ["a", "c"]
+        assert knowledge_bases.loaded_bytes <= 100000
+        assert metrics.get_counter("tenant_kb_evictions_total") == 1
+
+        knowledge_bases.get("b")
+        assert metrics.get_counter("tenant_kb_loads_total", reload="true") == 1
+        assert metrics.get_counter("tenant_kb_loads_total", reload="false") == 3
+        assert metrics.get_counter("tenant_kb_hits_total") == 1
+
+    def test_unknown_and_empty_tenants_bounded(self, tmp_path, monkeypatch):
+        """Test tenants without a directory are refused uncached and empty ones still count towards the budget."""
+        knowledge_bases = TenantKnowledgeBases(str(tmp_path), memory_budget_bytes=3 * MIN_ENTRY_BYTES)
+        for index in range(50):
+            with pytest.raises(UnknownTenant):
+                knowledge_bases.get(f"ghost-{index}")
+        assert knowledge_bases.loaded() == []
+        assert metrics.get_counter("tenant_kb_unknown_total") == 50
+
+        monkeypatch.setattr(tenant_kb, "MAX_EVICTED_TRACKED", 5)
+        for index in range(20):
+            (tmp_path / f"empty-{index}").mkdir()
+            knowledge_bases.get(f"empty-{index}")
+        assert knowledge_bases.loaded() == ["empty-17", "empty-18", "empty-19"]
+        assert knowledge_bases.loaded_bytes == 3 * MIN_ENTRY_BYTES
+        assert len(knowledge_bases._evicted) == 5
+
+    def test_concurrent_first_use_loads_once(self, tenants):
+        """Test simultaneous first tickets of a tenant share one load."""
+        barrier = threading.Barrier(8)
+
+        def load():
+            barrier.wait()
+            tenants.get("acme")
+
+        threads = [threading.Thread(target=load) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert metrics.get_counter("tenant_kb_loads_total", reload="false") == 1
+
+    def test_tenant_snapshot_and_missing_category(self, tmp_path):
+        """Test a tenant's own snapshot is used unless stale, and a missing category gets the usual placeholder."""
+        write_tenant(tmp_path, "initech", {"Technical": ["Initech API keys rotate weekly."]})
+        build_snapshot(str(tmp_path / "initech"), str(tmp_path / "initech" / "kb_snapshot.bin"))
+        knowledge_bases = TenantKnowledgeBases(str(tmp_path))
+
+        knowledge_base = knowledge_bases.get("initech")
+
+        assert knowledge_base.snapshot is not None
+        assert knowledge_base.documents("Technical") == ["Initech API keys rotate weekly."]
+        assert knowledge_base.documents("Billing") == ["No specific knowledge base found for Billing category."]
+
+        (tmp_path / "initech" / "technical_docs" / "doc_1.txt").write_text("Initech tokens expire hourly.")
+        os.utime(tmp_path / "initech" / "technical_docs", ns=(1, 1))
+        stale = TenantKnowledgeBases(str(tmp_path)).get("initech")
+        assert stale.snapshot is None
+        assert len(stale.documents("Technical")) == 2
+
+    def test_unsafe_tenant_ids_rejected(self):
+        """Test tenant IDs that could escape the tenants directory are refused."""
+        assert validate_tenant_id("brand-42.eu") == "brand-42.eu"
+        for tenant_id in ("../etc", "a/b", ".hidden", "", "a..b"):
+            with pytest.raises(ValueError):
+                validate_tenant_id(tenant_id)
+
+    def test_tenants_not_coalesced(self):
+        """Test identical tickets of different tenants get different single-flight keys."""
+        assert ticket_fingerprint("Refund", "Where is it?") == ticket_fingerprint("refund", "where is it")
+        assert ticket_fingerprint("Refund", "Where is it?", "acme") != ticket_fingerprint("Refund", "Where is it?", "globex")
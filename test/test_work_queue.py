@@ -0,0 +1,181 @@
+import pytest
+import asyncio
+import sys
+import time
+import multiprocessing
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from service.queue_consumer import QueueConsumer
+from service.work_queue import WorkQueue
+from utils.metrics import metrics
+
+def _lease_all(path: str, results):
+    queue = WorkQueue(path)
+    leased = []
+    while True:
+        batch = queue.lease(5)
+        if not batch:
+            break
+        leased.extend(item["ticket_id"] for item in batch)
+        for item in batch:
+            queue.ack(item)
+    results.put(leased)
+
+class TestWorkQueue:
+    """Test cases for the durable work queue and its consumer."""
+
+    def test_enqueue_lease_ack(self, tmp_path):
+        """Test tickets are leased oldest first and disappear once acked."""
+        queue = WorkQueue(str(tmp_path / "queue.sqlite3"))
+        ids = queue.enqueue_batch([
+            {"subject": f"Ticket {i}", "description": "Help"} for i in range(3)
+        ])
+
+        batch = queue.lease(2)
+        assert [item["ticket_id"] for item in batch] == ids[:2]
+        assert batch[0]["subject"] == "Ticket 0"
+
+        assert all(queue.ack(item) for item in batch)
+        assert queue.stats()["depth"] == {"ready": 1, "leased": 0, "done": 2, "dead": 0}
+
+    def test_unsafe_ticket_id_rejected(self, tmp_path):
+        """Test ticket IDs that could escape the cassette or profile directories are refused at enqueue."""
+        queue = WorkQueue(str(tmp_path / "queue.sqlite3"))
+        with pytest.raises(ValueError):
+            queue.enqueue("Refund", "Charged twice", ticket_id="../../x")
+        assert queue.stats()["depth"]["ready"] == 0
+
+    def test_nack_backoff_and_dead_letter(self, tmp_path):
+        """Test nacked tickets wait out their backoff and go dead after max_attempts."""
+        queue = WorkQueue(str(tmp_path / "queue.sqlite3"), max_attempts=2, backoff_base_seconds=0.05)
+        queue.enqueue("Refund", "Charged twice")
+
+        item = queue.lease()[0]
+        queue.nack(item, "LLM unavailable")
+        assert queue.lease() == []
+
+        time.sleep(0.06)
+        item = queue.lease()[0]
+        assert item["attempts"] == 2
+        queue.nack(item, "LLM unavailable")
+        assert queue.stats()["depth"]["dead"] == 1
+
+    def test_expired_lease_is_retried(self, tmp_path):
+        """Test a ticket leased by a crashed consumer becomes available again."""
+        path = str(tmp_path / "queue.sqlite3")
+        crashed = WorkQueue(path, lease_seconds=0.05)
+        crashed.enqueue("Refund", "Charged twice")
+        stale = crashed.lease()[0]
+
+        survivor = WorkQueue(path)
+        assert survivor.lease() == []
+        time.sleep(0.06)
+        item = survivor.lease()[0]
+
+        assert item["ticket_id"] == stale["ticket_id"]
+        assert survivor.ack(item)
+        assert not crashed.ack(stale)
+
+    def test_repeatedly_crashing_ticket_goes_dead(self, tmp_path):
+        """Test a ticket whose consumer keeps crashing goes dead after max_attempts instead of being redelivered."""
+        queue = WorkQueue(str(tmp_path / "queue.sqlite3"), lease_seconds=0.02, max_attempts=2)
+        poison = queue.enqueue("Poison", "Crashes every consumer")
+
+        for attempt in (1, 2):
+            item = queue.lease()[0]
+            assert (item["ticket_id"], item["attempts"]) == (poison, attempt)
+            time.sleep(0.03)
+
+        queue.enqueue("Refund", "Charged twice")
+        assert [item["subject"] for item in queue.lease(5)] == ["Refund"]
+        assert queue.stats()["depth"] == {"ready": 0, "leased": 1, "done": 0, "dead": 1}
+
+    def test_consumer_processes_never_share_tickets(self, tmp_path):
+        """Test concurrent consumer processes each get a disjoint set of tickets."""
+        path = str(tmp_path / "queue.sqlite3")
+        WorkQueue(path).enqueue_batch([{"subject": f"T{i}", "description": "Help"} for i in range(200)])
+
+        results = multiprocessing.Queue()
+        workers = [multiprocessing.Process(target=_lease_all, args=(path, results)) for _ in range(3)]
+        for worker in workers:
+            worker.start()
+        leased = [ticket_id for _ in workers for ticket_id in results.get(timeout=30)]
+        for worker in workers:
+            worker.join()
+
+        assert len(leased) == 200
+        assert len(set(leased)) == 200
+
+    def test_batch_enqueue_throughput(self, tmp_path):
+        """Test batch enqueues sustain thousands of tickets per second."""
+        queue = WorkQueue(str(tmp_path / "queue.sqlite3"))
+        tickets = [{"subject": f"T{i}", "description": "Help"} for i in range(5000)]
+
+        start = time.perf_counter()
+        for offset in range(0, len(tickets), 500):
+            queue.enqueue_batch(tickets[offset:offset + 500])
+        rate = len(tickets) / (time.perf_counter() - start)
+
+        assert rate > 2000
+
+    @pytest.mark.asyncio
+    async def test_consumer_acks_and_nacks(self, tmp_path):
+        """Test the consumer acks processed tickets and nacks failures."""
+        queue = WorkQueue(str(tmp_path / "queue.sqlite3"), backoff_base_seconds=60)
+        queue.enqueue("Refund", "Charged twice")
+        queue.enqueue("Broken", "This one fails")
+
+        async def processor(subject, description, ticket_id="", tenant_id=""):
+            if subject == "Broken":
+                return {"ticket_id": ticket_id, "processing_step": "error", "escalation_error": "boom"}
+            return {"ticket_id": ticket_id, "processing_step": "completed"}
+
+        consumer = QueueConsumer(queue, processor, batch_size=10)
+        assert await consumer.run_once() == 2
+        assert queue.stats()["depth"] == {"ready": 1, "leased": 0, "done": 1, "dead": 0}
+
+    @pytest.mark.asyncio
+    async def test_consumer_purges_finished_tickets(self, tmp_path):
+        """Test consumer maintenance deletes done and dead tickets past the retention only."""
+        queue = WorkQueue(str(tmp_path / "queue.sqlite3"), max_attempts=1)
+        queue.enqueue("Refund", "Charged twice")
+        queue.enqueue("Broken", "This one fails")
+
+        async def processor(subject, description, ticket_id="", tenant_id=""):
+            return {"ticket_id": ticket_id, "processing_step": "error" if subject == "Broken" else "completed"}
+
+        consumer = QueueConsumer(queue, processor, batch_size=10, retention_seconds=3600)
+        purged_before = metrics.get_counter("work_queue_purged_total")
+        await consumer.run_once()
+        consumer.maintain()
+        assert queue.stats()["depth"] == {"ready": 0, "leased": 0, "done": 1, "dead": 1}
+
+        consumer.retention_seconds = 0
+        consumer.maintain()
+        assert queue.stats()["depth"] == {"ready": 0, "leased": 0, "done": 0, "dead": 0}
+        assert metrics.get_counter("work_queue_purged_total") - purged_before == 2
+
+    @pytest.mark.asyncio
+    async def test_consumer_throttles_maintenance(self, tmp_path, monkeypatch):
+        """Test the consumer refreshes queue stats once per maintenance interval, not per batch."""
+        queue = WorkQueue(str(tmp_path / "queue.sqlite3"))
+        queue.enqueue_batch([{"subject": f"T{i}", "description": "Help"} for i in range(30)])
+        calls = []
+        monkeypatch.setattr(queue, "stats", lambda: calls.append(1))
+        processed = []
+
+        async def processor(subject, description, ticket_id="", tenant_id=""):
+            processed.append(ticket_id)
+            if len(processed) == 30:
+                consumer.stop()
+            return {"ticket_id": ticket_id, "processing_step": "completed"}
+
+        consumer = QueueConsumer(queue, processor, batch_size=5, maintenance_interval=60)
+        await asyncio.wait_for(consumer.run(), timeout=10)
+
+        assert len(processed) == 30
+        assert len(calls) == 1
@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+"""
+Record and replay of LLM interactions.
+
+In record mode every invoke_llm call made while processing a ticket is
+appended, with its latency, to a gzip-compressed JSON lines cassette per
+ticket (cassettes.dir/<ticket_id>.jsonl.gz). The first line holds the
+ticket itself, tenant included, so the cassette can be replayed on its own.
+
+In replay mode the nodes' calls are answered from the ticket's cassette,
+matched by node and call order (preferring a call with the same rendered
+prompt), after sleeping the recorded latency times latency_scale. No
+request leaves the process, so a replayed day of traffic measures the
+pipeline's own latency and CPU time against a fixed LLM.
+
+Usage:
+    python -m utils.cassettes replay [--dir DIR] [--latency-scale S] [--concurrency N] [--output PATH]
+    python -m utils.cassettes info [--dir DIR]
+"""
+
+import argparse
+import asyncio
+import contextvars
+import gzip
+import json
+import os
+import sys
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from langchain_core.messages import messages_from_dict, messages_to_dict
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from utils.logger import setup_logger
+from utils.helpers import load_config, validate_ticket_id
+from utils.metrics import metrics, percentile
+
+logger = setup_logger("cassettes")
+
+MODES = ("off", "record", "replay")
+
+_active: contextvars.ContextVar[Optional["Cassette"]] = contextvars.ContextVar("cassette", default=None)
+_overrides: Dict[str, Any] = {}
+
+class CassetteMiss(LookupError):
+    """A replayed ticket made an LLM call its cassette has no recording for."""
+
+def cassette_settings(config: Dict[str, Any]) -> Dict[str, Any]:
+    """The cassettes section with defaults filled in and CLI overrides applied."""
+    settings = {"mode": "off", "dir": "data/cassettes", "latency_scale": 1.0}
+    settings.update(config.get("cassettes", {}))
+    settings.update(_overrides)
+    return settings
+
+def cassette_path(directory: str, ticket_id: str) -> Path:
+    return Path(directory) / f"{validate_ticket_id(ticket_id)}.jsonl.gz"
+
+def read_cassette(path: Path) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+    """The ticket line and the recorded calls of a cassette."""
+    ticket, calls = {}, []
+    with gzip.open(path, "rt", encoding="utf-8") as file:
+        for line in file:
+            entry = json.loads(line)
+            if entry["type"] == "ticket":
+                ticket = entry
+            else:
+                calls.append(entry)
+    return ticket, calls
+
+class Cassette:
+    """
+    One ticket's recorded LLM calls.
+
+    Args:
+        path: Cassette file
+        mode: record or replay
+        latency_scale: Multiplier on recorded latencies when replaying
+    """
+
+    def __init__(self, path: Path, mode: str, latency_scale: float = 1.0):
+        self.path = path
+        self.mode = mode
+        self.latency_scale = latency_scale
+        self._lock = threading.Lock()
+        self._sequence: Dict[str, int] = defaultdict(int)
+        self._pending: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+
+        if mode == "replay" and path.exists():
+            _, calls = read_cassette(path)
+            for call in sorted(calls, key=lambda call: call["seq"]):
+                self._pending[call["node"]].append(call)
+
+    def _append(self, entry: Dict[str, Any]):
+        # Each append is its own gzip member; readers see one continuous stream
+        with gzip.open(self.path, "at", encoding="utf-8") as file:
+            file.write(json.dumps(entry, default=str) + "\n")
+
+    def start(self, ticket_id: str, subject: str, description: str, tenant_id: str = ""):
+        """Begin a recording with the ticket the calls belong to."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path.unlink(missing_ok=True)
+        self._append({"type": "ticket", "ticket_id": ticket_id, "subject": subject, "description": description,
+                      "tenant_id": tenant_id, "recorded_at": time.time()})
+
+    def record(self, node: str, key: str, model: str, latency: float, response: Any):
+        """Append one call to the cassette."""
+        with self._lock:
+            entry = {
+                "type": "call",
+                "node": node,
+                "seq": self._sequence[node],
+                "key": key,
+                "model": model,
+                "latency": round(latency, 4),
+                "response": messages_to_dict([response])[0],
+            }
+            self._sequence[node] += 1
+            self._append(entry)
+        metrics.increment("cassette_recorded_calls_total", node=node)
+
+    def replay(self, node: str, key: str) -> Any:
+        """
+        Serve the node's next recorded call, after its scaled latency.
+
+        Raises:
+            CassetteMiss: The node has no recorded calls left
+        """
+
+        with self._lock:
+            pending = self._pending[node]
+            if not pending:
+                metrics.increment("cassette_misses_total", node=node)
+                raise CassetteMiss(f"No recorded {node} call left in {self.path.name}")
+            # Concurrent calls of one node may complete in any order; match the prompt first
+            index = next((i for i, call in enumerate(pending) if call["key"] == key), None)
+            if index is None:
+                metrics.increment("cassette_prompt_mismatches_total", node=node)
+                index = 0
+            call = pending.pop(index)
+
+        delay = call["latency"] * self.latency_scale
+        if delay > 0:
+            time.sleep(delay)
+        metrics.increment("cassette_replayed_calls_total", node=node)
+        return messages_from_dict([call["response"]])[0]
+
+def active_cassette() -> Optional[Cassette]:
+    """The cassette of the ticket being processed in this context, if any."""
+    return _active.get()
+
+@contextmanager
+def cassette_session(ticket_id: str, subject: str, description: str,
+                     tenant_id: str = "") -> Iterator[Optional[Cassette]]:
+    """
+    Record or replay the LLM calls made inside this block for a ticket.
+
+    Yields None when cassettes.mode is off. A replayed ticket without a
+    cassette gets an empty one, so its calls fail instead of reaching the API.
+    """
+
+    settings = cassette_settings(load_config())
+    mode = settings["mode"]
+    if mode not in MODES:
+        logger.warning(f"Unknown cassette mode '{mode}', using 'off'")
+        mode = "off"
+    path = cassette_path(settings["dir"], ticket_id)
+
+    if mode == "off":
+        yield None
+        return
+    if mode == "replay" and not path.exists():
+        logger.warning(f"No cassette for ticket {ticket_id}; its LLM calls will miss")
+
+    cassette = Cassette(path, mode, settings["latency_scale"])
+    if mode == "record":
+        cassette.start(ticket_id, subject, description, tenant_id)
+
+    token = _active.set(cassette)
+    try:
+        yield cassette
+    finally:
+        _active.reset(token)
+
+async def replay_directory(directory: str, latency_scale: float, concurrency: int) -> Dict[str, Any]:
+    """
+    Replay every cassette in a directory through process_ticket.
+
+    Returns:
+        Wall time, CPU time and per-ticket latency, with the pipeline's own
+        overhead (latency minus replayed LLM time) reported separately
+    """
+
+    from main import process_ticket
+
+    _overrides.update({"mode": "replay", "dir": directory, "latency_scale": latency_scale})
+    # Clients are still constructed, but replayed calls never reach them
+    os.environ.setdefault("OPENAI_API_KEY", "replay")
+    recordings = [read_cassette(path) for path in sorted(Path(directory).glob("*.jsonl.gz"))]
+    recordings = [(ticket, calls) for ticket, calls in recordings if ticket]
+    nodes = {call["node"] for _, calls in recordings for call in calls}
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies, overheads = [], []
+
+    async def replay_one(ticket: Dict[str, Any], calls: List[Dict[str, Any]]):
+        async with semaphore:
+            start = time.perf_counter()
+            await process_ticket(ticket["subject"], ticket["description"], ticket["ticket_id"],
+                                 tenant_id=ticket.get("tenant_id", ""))
+            latency = time.perf_counter() - start
+            latencies.append(latency)
+            overheads.append(max(0.0, latency - sum(call["latency"] for call in calls) * latency_scale))
+
+    metrics.reset()
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+    await asyncio.gather(*(replay_one(ticket, calls) for ticket, calls in recordings))
+    wall = time.perf_counter() - wall_start
+    cpu = time.process_time() - cpu_start
+
+    count = len(latencies)
+    return {
+        "tickets": count,
+        "latency_scale": latency_scale,
+        "concurrency": concurrency,
+        "wall_seconds": wall,
+        "cpu_seconds": cpu,
+        "cpu_ms_per_ticket": cpu / count * 1000 if count else 0.0,
+        "p50_latency_ms": percentile(latencies, 50) * 1000,
+        "p95_latency_ms": percentile(latencies, 95) * 1000,
+        "p50_overhead_ms": percentile(overheads, 50) * 1000,
+        "p95_overhead_ms": percentile(overheads, 95) * 1000,
+        "replayed_calls": sum(metrics.get_counter("cassette_replayed_calls_total", node=node) for node in nodes),
+        "misses": sum(metrics.get_counter("cassette_misses_total", node=node) for node in nodes),
+    }
+
+def main():
+    settings = cassette_settings(load_config())
+    parser = argparse.ArgumentParser(description="Replay recorded LLM traffic")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    replay_parser = subparsers.add_parser("replay", help="Run every recorded ticket against replayed LLM calls")
+    replay_parser.add_argument("--dir", default=settings["dir"])
+    replay_parser.add_argument("--latency-scale", type=float, default=settings["latency_scale"],
+                               help="Multiplier on recorded latencies; 0 measures pipeline overhead alone")
+    replay_parser.add_argument("--concurrency", type=int, default=8)
+    replay_parser.add_argument("--output", help="Also write the report as JSON")
+
+    info_parser = subparsers.add_parser("info", help="Summarize recorded cassettes")
+    info_parser.add_argument("--dir", default=settings["dir"])
+
+    args = parser.parse_args()
+
+    if args.command == "info":
+        calls_per_node: Dict[str, int] = defaultdict(int)
+        latency_per_node: Dict[str, float] = defaultdict(float)
+        paths = sorted(Path(args.dir).glob("*.jsonl.gz"))
+        for path in paths:
+            for call in read_cassette(path)[1]:
+                calls_per_node[call["node"]] += 1
+                latency_per_node[call["node"]] += call["latency"]
+        print(f"{len(paths)} cassettes in {args.dir}")
+        for node, count in sorted(calls_per_node.items()):
+            print(f"  {node:<16} {count:>7} calls  {latency_per_node[node] / count * 1000:>8.1f} ms mean latency")
+        return
+
+    report = asyncio.run(replay_directory(args.dir, args.latency_scale, args.concurrency))
+    print(json.dumps(report, indent=2))
+    if args.output:
+        Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+        Path(args.output).write_text(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, Optional
+from utils.logger import setup_logger
+from utils.metrics import metrics
+
+logger = setup_logger("circuit_breaker")
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+STATE_GAUGE = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+class CircuitOpen(Exception):
+    """An LLM call was refused because the circuit breaker is open."""
+
+class CircuitBreaker:
+    """
+    Shared closed/open/half-open breaker over LLM calls.
+
+    Closed: calls go through and their outcomes are kept for window_seconds.
+    Once the window holds at least min_calls outcomes and the failed fraction
+    reaches error_rate_threshold, the breaker opens and every call fails fast.
+    After open_seconds it turns half-open and lets half_open_max_calls probe
+    calls through; a successful probe closes it, a failed one reopens it.
+
+    Args:
+        window_seconds: Age of the outcomes the error rate is computed over
+        min_calls: Outcomes needed in the window before the breaker may open
+        error_rate_threshold: Failed fraction that opens the breaker
+        open_seconds: Time spent open before probing
+        half_open_max_calls: Concurrent probe calls allowed while half-open
+    """
+
+    def __init__(self, window_seconds: float = 30.0, min_calls: int = 10, error_rate_threshold: float = 0.5,
+                 open_seconds: float = 15.0, half_open_max_calls: int = 2):
+        self.window_seconds = window_seconds
+        self.min_calls = min_calls
+        self.error_rate_threshold = error_rate_threshold
+        self.open_seconds = open_seconds
+        self.half_open_max_calls = half_open_max_calls
+        self._state = CLOSED
+        self._outcomes: deque = deque()
+        self._opened_at = 0.0
+        self._probes = 0
+        self._lock = threading.Lock()
+
+    def _transition(self, state: str):
+        logger.warning(f"LLM circuit breaker {self._state} -> {state}")
+        self._state = state
+        metrics.increment("circuit_breaker_transitions_total", to=state)
+        metrics.set_gauge("circuit_breaker_state", STATE_GAUGE[state])
+
+    def _refresh(self, now: float):
+        if self._state == OPEN and now - self._opened_at >= self.open_seconds:
+            self._probes = 0
+            self._transition(HALF_OPEN)
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            self._refresh(time.monotonic())
+            return self._state
+
+    def is_open(self) -> bool:
+        """Whether calls are currently failing fast; half-open counts as not open."""
+        return self.state == OPEN
+
+    def allow(self) -> bool:
+        """Reserve a call; every allowed call must be followed by record_success or record_failure."""
+        with self._lock:
+            self._refresh(time.monotonic())
+            if self._state == CLOSED:
+                return True
+            if self._state == HALF_OPEN and self._probes < self.half_open_max_calls:
+                self._probes += 1
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            if self._state == HALF_OPEN:
+                self._outcomes.clear()
+                self._transition(CLOSED)
+            elif self._state == CLOSED:
+                self._add_outcome(True)
+
+    def record_failure(self):
+        with self._lock:
+            if self._state == HALF_OPEN:
+                self._opened_at = time.monotonic()
+                self._transition(OPEN)
+            elif self._state == CLOSED:
+                self._add_outcome(False)
+                failures = sum(1 for _, ok in self._outcomes if not ok)
+                if len(self._outcomes) >= self.min_calls and failures / len(self._outcomes) >= self.error_rate_threshold:
+                    self._opened_at = time.monotonic()
+                    self._transition(OPEN)
+
+    def _add_outcome(self, ok: bool):
+        now = time.monotonic()
+        self._outcomes.append((now, ok))
+        while self._outcomes and now - self._outcomes[0][0] > self.window_seconds:
+            self._outcomes.popleft()
+
+_breaker: Optional[CircuitBreaker] = None
+_breaker_lock = threading.Lock()
+
+def get_circuit_breaker(config: Dict[str, Any]) -> Optional[CircuitBreaker]:
+    """The process-wide breaker shared by every node, or None when circuit_breaker is disabled."""
+    global _breaker
+    breaker_config = config.get("circuit_breaker", {})
+    if not breaker_config.get("enabled", False):
+        return None
+    with _breaker_lock:
+        if _breaker is None:
+            _breaker = CircuitBreaker(
+                window_seconds=breaker_config.get("window_seconds", 30),
+                min_calls=breaker_config.get("min_calls", 10),
+                error_rate_threshold=breaker_config.get("error_rate_threshold", 0.5),
+                open_seconds=breaker_config.get("open_seconds", 15),
+                half_open_max_calls=breaker_config.get("half_open_max_calls", 2)
+            )
+        return _breaker
+
+def circuit_open(config: Dict[str, Any]) -> bool:
+    """Whether LLM calls are failing fast, so tickets should take the degraded path."""
+    breaker = get_circuit_breaker(config)
+    return breaker is not None and breaker.is_open()
@@ -0,0 +1,52 @@
+import time
+from typing import Any, Dict, Optional
+from utils.logger import setup_logger
+from utils.metrics import metrics
+
+logger = setup_logger("deadlines")
+
+class DeadlineExceeded(Exception):
+    """Raised when a ticket has no time left for another LLM call."""
+
+def ticket_deadline(config: Dict[str, Any]) -> float:
+    """
+    Absolute deadline (epoch seconds) for a ticket starting now.
+
+    Returns 0.0, meaning no deadline, when deadline.budget_seconds is unset or 0.
+    """
+    budget = config.get("deadline", {}).get("budget_seconds", 0)
+    return time.time() + budget if budget else 0.0
+
+def remaining_seconds(state: Dict[str, Any]) -> Optional[float]:
+    """Seconds left before the ticket's deadline, or None if it has none."""
+    deadline = state.get("deadline") or 0.0
+    if not deadline:
+        return None
+    return deadline - time.time()
+
+def llm_timeout(state: Dict[str, Any], node: str, reserve: float = 0.0) -> Optional[float]:
+    """
+    Timeout for a node's next LLM call, keeping `reserve` seconds for later steps.
+
+    Args:
+        state: Graph state carrying the deadline
+        node: Node name used for logs and metrics
+        reserve: Seconds to hold back, e.g. for the escalation message
+
+    Returns:
+        Seconds the call may take, or None if the ticket has no deadline
+
+    Raises:
+        DeadlineExceeded: If nothing is left once the reserve is held back
+    """
+
+    remaining = remaining_seconds(state)
+    if remaining is None:
+        return None
+
+    available = remaining - reserve
+    if available <= 0:
+        metrics.increment("deadline_exceeded_total", node=node)
+        logger.warning(f"Ticket {state.get('ticket_id')} has no time left for {node} ({remaining:.1f}s remaining)")
+        raise DeadlineExceeded(f"Deadline exceeded before {node}")
+    return available
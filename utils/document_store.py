@@ -0,0 +1,118 @@
+"""
+Shared document store behind retrieved context.
+
+Graph state doesn't carry document text. Retrieval stores references, i.e.
+{"id": ..., "score": ...} entries, in context_docs. The text is looked up
+here only when a prompt is rendered. Lookups go through the knowledge bases
+every worker already holds: the cached shared knowledge base files, the
+memory-mapped snapshot, or the tenant LRU.
+
+Document IDs name a document within its knowledge base:
+    {category}/{name}               shared knowledge base
+    {tenant_id}/{category}/{name}   a tenant's knowledge base
+
+name is the document's file name without .txt, which the snapshot stores
+too, so an ID keeps resolving to the same document when others are added
+to or removed from its category, and stops resolving once its own file is
+removed. A category without documents has one placeholder named "*".
+"""
+
+from typing import Any, Dict, List, Optional, Tuple, Union
+from utils.logger import setup_logger
+from utils.helpers import load_named_knowledge_base
+from utils.kb_snapshot import KnowledgeBaseSnapshot, load_snapshot
+from utils.metrics import metrics
+from utils.tenant_kb import get_tenant_knowledge_bases
+
+logger = setup_logger("document_store")
+
+DocumentRef = Dict[str, Any]
+
+def knowledge_base_source(category: str, config: Dict[str, Any],
+                          tenant_id: str = "") -> Tuple[Optional[KnowledgeBaseSnapshot], Optional[List[str]], List[str]]:
+    """
+    Where a category's documents come from for a ticket.
+
+    Tickets with a tenant_id use that tenant's knowledge base (loaded on
+    first use and kept in the tenant LRU); others use the shared one.
+
+    Returns:
+        (snapshot covering the category, None, document names) or
+        (None, the category's documents, document names), names in document order
+    """
+
+    if tenant_id:
+        knowledge_base = get_tenant_knowledge_bases(config).get(tenant_id)
+        snapshot = knowledge_base.snapshot
+        if snapshot is not None and snapshot.covers(category):
+            return snapshot, None, snapshot.document_names(category)
+        names, documents = knowledge_base.named_documents(category)
+        return None, documents, names
+
+    snapshot = load_snapshot(config)
+    if snapshot is not None and snapshot.covers(category):
+        return snapshot, None, snapshot.document_names(category)
+    names, documents = load_named_knowledge_base(category)
+    return None, documents, names
+
+def document_id(category: str, name: str, tenant_id: str = "") -> str:
+    """ID of a category's document with the given name."""
+    return f"{tenant_id}/{category}/{name}" if tenant_id else f"{category}/{name}"
+
+def parse_document_id(doc_id: str) -> Tuple[str, str, str]:
+    """
+    Split a document ID.
+
+    Returns:
+        (tenant_id, category, name); tenant_id is empty for the shared knowledge base
+
+    Raises:
+        ValueError: If doc_id isn't a document ID
+    """
+    parts = doc_id.split("/")
+    if len(parts) == 2:
+        parts.insert(0, "")
+    if len(parts) != 3 or not all(parts[1:]):
+        raise ValueError(f"Invalid document id '{doc_id}'")
+    return parts[0], parts[1], parts[2]
+
+def resolve_document(doc_id: str, config: Dict[str, Any]) -> str:
+    """
+    Text of a document.
+
+    Raises:
+        KeyError: If the document no longer exists
+    """
+
+    tenant_id, category, name = parse_document_id(doc_id)
+    snapshot, documents, names = knowledge_base_source(category, config, tenant_id)
+    if snapshot is not None:
+        try:
+            position = snapshot.position(category, name)
+        except KeyError:
+            raise KeyError(f"Document {doc_id} not found")
+        first, _ = snapshot.categories[category.lower()]
+        return snapshot.document(first + position)
+    if name not in names:
+        raise KeyError(f"Document {doc_id} not found")
+    return documents[names.index(name)]
+
+def resolve_documents(refs: List[Union[DocumentRef, str]], config: Dict[str, Any]) -> List[str]:
+    """
+    Texts for context_docs entries, in order.
+
+    References whose document has since been removed are skipped. Plain
+    strings are taken as document text, for callers that build state by hand.
+    """
+
+    texts = []
+    for ref in refs:
+        if isinstance(ref, str):
+            texts.append(ref)
+            continue
+        try:
+            texts.append(resolve_document(ref["id"], config))
+        except (LookupError, ValueError) as e:
+            metrics.increment("document_store_misses_total")
+            logger.warning(f"Skipping context document: {str(e)}")
+    return texts
@@ -0,0 +1,142 @@
+import contextvars
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List
+from utils.logger import setup_logger
+from utils.helpers import save_escalations_to_log
+from utils.metrics import metrics
+
+logger = setup_logger("escalation_worker")
+
+class EscalationWorker:
+    """
+    Background thread that writes escalation summaries and log rows.
+
+    Jobs are collected into batches of up to batch_size (or whatever arrived
+    within flush_interval), their summaries generated concurrently with
+    retries, and the batch appended to the escalation log in one write.
+    Queued jobs are flushed at interpreter exit, before concurrent.futures
+    shuts its pools down; a batch that still finds the summary pool closed
+    is summarized on the worker thread.
+
+    Args:
+        summarize: Callable(job) -> summary text; may raise to trigger a retry
+        log_file: Escalation log CSV
+        batch_size: Maximum jobs per batch
+        flush_interval: Seconds to wait for more jobs before processing a partial batch
+        max_retries: Retries per summary and per log write
+        retry_backoff: Seconds before the first retry; doubles per retry
+        fallback_message: Summary used when every attempt fails; formatted with ticket_id
+        shutdown_timeout: Seconds to wait for queued jobs at exit
+    """
+
+    def __init__(self, summarize: Callable[[Dict[str, Any]], str], log_file: str,
+                 batch_size: int = 8, flush_interval: float = 0.5, max_retries: int = 3,
+                 retry_backoff: float = 1.0, fallback_message: str = "", shutdown_timeout: float = 30.0):
+        self.summarize = summarize
+        self.log_file = log_file
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.fallback_message = fallback_message
+        self.shutdown_timeout = shutdown_timeout
+        self._queue: "queue.Queue[Dict[str, Any]]" = queue.Queue()
+        self._pool = ThreadPoolExecutor(max_workers=batch_size, thread_name_prefix="escalation-summary")
+        self._thread = None
+        self._start_lock = threading.Lock()
+
+    def submit(self, job: Dict[str, Any]):
+        """Queue an escalation; returns immediately."""
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="escalation-worker", daemon=True)
+                self._thread.start()
+                # Runs before concurrent.futures' own exit hook (registered at
+                # import, called in reverse order), so the summary pool is still up
+                threading._register_atexit(self.flush)
+        job["queued_at"] = time.perf_counter()
+        # Summaries run in the caller's context, e.g. its ticket's cassette session
+        job["caller_context"] = contextvars.copy_context()
+        self._queue.put(job)
+        metrics.set_gauge("escalation_queue_depth", self._queue.qsize())
+
+    def flush(self, timeout: float = None) -> bool:
+        """
+        Wait until every queued escalation has been written.
+
+        Returns:
+            False if jobs were still pending when the timeout passed
+        """
+
+        deadline = time.monotonic() + (self.shutdown_timeout if timeout is None else timeout)
+        while self._queue.unfinished_tasks:
+            if time.monotonic() >= deadline:
+                logger.error(f"{self._queue.unfinished_tasks} escalations still pending after flush timeout")
+                return False
+            time.sleep(0.01)
+        return True
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            batch_deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                remaining = batch_deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            try:
+                self._process_batch(batch)
+            except Exception as e:
+                logger.error(f"Escalation batch of {len(batch)} failed: {str(e)}")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+                metrics.set_gauge("escalation_queue_depth", self._queue.qsize())
+
+    def _with_retries(self, action: Callable[[], Any], description: str) -> Any:
+        for attempt in range(self.max_retries + 1):
+            try:
+                return action()
+            except Exception as e:
+                if attempt == self.max_retries:
+                    raise
+                metrics.increment("escalation_retries_total")
+                logger.warning(f"{description} failed (attempt {attempt + 1}), retrying: {str(e)}")
+                time.sleep(self.retry_backoff * 2 ** attempt)
+
+    def _summary(self, job: Dict[str, Any]) -> str:
+        if job.get("escalation_message"):
+            return job["escalation_message"]
+        try:
+            context = job.get("caller_context") or contextvars.copy_context()
+            return self._with_retries(lambda: context.run(self.summarize, job),
+                                      f"Escalation summary for ticket {job['ticket_id']}")
+        except Exception as e:
+            logger.error(f"Escalation summary failed for ticket {job['ticket_id']}: {str(e)}")
+            metrics.increment("escalation_jobs_total", status="fallback")
+            return self.fallback_message.format(ticket_id=job["ticket_id"])
+
+    def _process_batch(self, batch: List[Dict[str, Any]]):
+        metrics.observe("escalation_batch_size", len(batch))
+        try:
+            summaries = list(self._pool.map(self._summary, batch))
+        except RuntimeError:
+            # The pool refuses new work once the interpreter is shutting down
+            summaries = [self._summary(job) for job in batch]
+
+        rows = [{**job, "escalation_message": summary} for job, summary in zip(batch, summaries)]
+        self._with_retries(lambda: save_escalations_to_log(rows, self.log_file), "Escalation log write")
+
+        now = time.perf_counter()
+        for job in batch:
+            metrics.observe("escalation_background_seconds", now - job["queued_at"])
+        metrics.increment("escalation_jobs_total", len(batch), status="written")
+        logger.info(f"Wrote {len(batch)} escalations to {self.log_file}")
@@ -0,0 +1,205 @@
+import contextvars
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from utils.logger import setup_logger
+from utils.metrics import metrics, percentile
+
+logger = setup_logger("hedging")
+
+class Hedger:
+    """
+    Hedged requests for slow LLM calls.
+
+    Each call runs in a worker thread. If it is still running after the
+    percentile-th latency of recent calls to the same node and model, a
+    duplicate request is sent and whichever succeeds first is returned. Time spent waiting for a worker doesn't count towards the
+    delay, so a busy pool doesn't cause hedges. The other request is
+    cancelled if it hasn't started yet; a request already on the wire can't
+    be aborted from a thread, so its response is discarded and its worker
+    stays busy until the request returns.
+
+    The pool therefore caps concurrent hedged LLM requests at max_workers,
+    counting primaries, hedges and discarded requests still in flight. Size
+    it above the number of threads that call the LLM at once
+    (get_hedger defaults it to twice service.executor_threads).
+
+    Hedges are paid for from a token bucket that earns budget_fraction of a
+    token per call, so over time at most that fraction of extra requests is
+    sent, with bursts of up to max_burst hedges after quiet periods.
+
+    Args:
+        percentile: Latency percentile after which a call is hedged
+        min_samples: Latencies needed for a node/model before it is hedged
+        window: Recent latencies kept per node/model
+        budget_fraction: Extra requests allowed per request (0.05 = 5%)
+        max_burst: Most hedge tokens that can be saved up
+        max_workers: Threads shared by all in-flight requests, the cap on concurrent hedged LLM requests
+    """
+
+    def __init__(self, percentile: float = 95, min_samples: int = 20, window: int = 200,
+                 budget_fraction: float = 0.05, max_burst: float = 10, max_workers: int = 32):
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.window = window
+        self.budget_fraction = budget_fraction
+        self.max_burst = max_burst
+        self._lock = threading.Lock()
+        self._latencies: Dict[Tuple[str, str], deque] = {}
+        self._tokens = 0.0
+        self._requests = 0
+        self._hedges = 0
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="llm-hedge")
+
+    def hedge_delay(self, node: str, model: str) -> Optional[float]:
+        """Seconds to wait before hedging a call, or None while there are too few latencies."""
+        with self._lock:
+            samples = list(self._latencies.get((node, model), ()))
+        if len(samples) < self.min_samples:
+            return None
+        return percentile(samples, self.percentile)
+
+    def _record_latency(self, node: str, model: str, latency: float):
+        with self._lock:
+            samples = self._latencies.get((node, model))
+            if samples is None:
+                samples = self._latencies[(node, model)] = deque(maxlen=self.window)
+            samples.append(latency)
+
+    def _take_token(self) -> bool:
+        with self._lock:
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            self._hedges += 1
+            return True
+
+    def _submit(self, call: Callable[[], Any]) -> Future:
+        # Run in the caller's context so contextvars (e.g. the cassette session) carry over
+        return self._executor.submit(contextvars.copy_context().run, call)
+
+    @property
+    def hedge_rate(self) -> float:
+        """Extra requests sent per request so far."""
+        with self._lock:
+            return self._hedges / self._requests if self._requests else 0.0
+
+    def call(self, node: str, model: str, request: Callable[[], Any]) -> Any:
+        """
+        Run request, hedging it once if it is slow and the budget allows.
+
+        Args:
+            node: Node name, for latency tracking and metrics labels
+            model: Model name, for latency tracking
+            request: Makes one LLM request and returns the response
+
+        Returns:
+            The first successful response; if every request failed, the primary's error is raised
+        """
+
+        with self._lock:
+            self._requests += 1
+            self._tokens = min(self.max_burst, self._tokens + self.budget_fraction)
+
+        delay = self.hedge_delay(node, model)
+        start = time.perf_counter()
+        started = threading.Event()
+        running_since = []
+
+        def run_primary():
+            running_since.append(time.perf_counter())
+            started.set()
+            return request()
+
+        primary = self._submit(run_primary)
+
+        def primary_done(future: Future):
+            # The primary's latency, whether or not a hedge beat it, is what p99
+            # improvement is measured against; the hedge delay is estimated from
+            # its running time alone, without the wait for a worker
+            now = time.perf_counter()
+            metrics.observe("llm_primary_latency_seconds", now - start, node=node)
+            if running_since:
+                metrics.observe("llm_hedge_pool_wait_seconds", running_since[0] - start, node=node)
+            if not future.cancelled() and future.exception() is None:
+                self._record_latency(node, model, now - running_since[0])
+
+        primary.add_done_callback(primary_done)
+
+        futures: List[Future] = [primary]
+        if delay is not None:
+            started.wait()
+            wait(futures, timeout=max(0.0, running_since[0] + delay - time.perf_counter()))
+            if not primary.done():
+                if self._take_token():
+                    metrics.increment("llm_hedges_total", node=node)
+                    logger.info(f"Hedging {node} call after {delay:.2f}s")
+                    futures.append(self._submit(request))
+                else:
+                    metrics.increment("llm_hedge_budget_exhausted_total", node=node)
+
+        pending = set(futures)
+        winner = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            successful = [future for future in done if future.exception() is None]
+            if successful:
+                winner = successful[0]
+                break
+
+        for future in pending:
+            future.cancel()
+
+        metrics.observe("llm_hedged_latency_seconds", time.perf_counter() - start, node=node)
+        metrics.set_gauge("llm_hedge_rate", self.hedge_rate)
+
+        if winner is None:
+            return primary.result()
+        if winner is not primary:
+            metrics.increment("llm_hedge_wins_total", node=node)
+        return winner.result()
+
+def hedging_report(nodes: List[str]) -> Dict[str, Dict[str, float]]:
+    """
+    p99 of the primary requests' own latency against the latency callers saw, per node.
+
+    Returns:
+        Per node: primary_p99, hedged_p99, improvement (fraction of primary_p99 saved), hedges and wins
+    """
+
+    report = {}
+    for node in nodes:
+        primary = metrics.percentile("llm_primary_latency_seconds", 99, node=node)
+        hedged = metrics.percentile("llm_hedged_latency_seconds", 99, node=node)
+        report[node] = {
+            "primary_p99": primary,
+            "hedged_p99": hedged,
+            "improvement": (primary - hedged) / primary if primary else 0.0,
+            "hedges": metrics.get_counter("llm_hedges_total", node=node),
+            "wins": metrics.get_counter("llm_hedge_wins_total", node=node),
+        }
+    return report
+
+_hedger: Optional[Hedger] = None
+_hedger_lock = threading.Lock()
+
+def get_hedger(node: str, config: Dict[str, Any]) -> Optional[Hedger]:
+    """The process-wide hedger if hedging is enabled for node, else None."""
+    global _hedger
+    hedging_config = config.get("hedging", {})
+    if not hedging_config.get("enabled", False) or node not in hedging_config.get("nodes", []):
+        return None
+    with _hedger_lock:
+        if _hedger is None:
+            _hedger = Hedger(
+                percentile=hedging_config.get("percentile", 95),
+                min_samples=hedging_config.get("min_samples", 20),
+                window=hedging_config.get("window", 200),
+                budget_fraction=hedging_config.get("budget_fraction", 0.05),
+                max_burst=hedging_config.get("max_burst", 10),
+                # Room for a primary from every node thread plus hedges and discarded requests
+                max_workers=hedging_config.get("max_workers") or 2 * config.get("service", {}).get("executor_threads", 64)
+            )
+        return _hedger
@@ -1,67 +1,160 @@
 import yaml
 import csv
 import os
+import re
+import threading
+import uuid
 from pathlib import Path
-from typing import Dict, Any, List
+from typing import Dict, Any, Callable, List, Tuple
 import pandas as pd
 from datetime import datetime
 
-def load_config(config_path: str = "config/settings.yaml") -> Dict[str, Any]:
-    """Load configuration from YAML file."""
-    with open(config_path, 'r') as file:
+# Parsed files keyed by absolute path, invalidated when the file's version (by default its mtime) changes
+_file_cache: Dict[str, Tuple[Any, Any]] = {}
+_file_cache_lock = threading.Lock()
+
+def _mtime(path: str) -> int:
+    return os.stat(path).st_mtime_ns
+
+def _cached_load(path: Path, loader: Callable[[Path], Any], version: Callable[[str], Any] = _mtime) -> Any:
+    """Load a file once and reuse the result until its version changes on disk."""
+    resolved = str(path.resolve())
+    current = version(resolved)
+    cached = _file_cache.get(resolved)
+    if cached is not None and cached[0] == current:
+        return cached[1]
+    value = loader(Path(resolved))
+    with _file_cache_lock:
+        _file_cache[resolved] = (current, value)
+    return value
+
+def clear_caches():
+    """Drop cached config, prompts and knowledge bases."""
+    with _file_cache_lock:
+        _file_cache.clear()
+
+def _read_yaml(path: Path) -> Dict[str, Any]:
+    with open(path, 'r') as file:
         return yaml.safe_load(file)
 
+def _read_prompt(path: Path) -> str:
+    with open(path, 'r') as file:
+        return file.read().strip()
+
+def load_config(config_path: str = "config/settings.yaml") -> Dict[str, Any]:
+    """Load configuration from YAML file (cached; treat the result as read-only)."""
+    return _cached_load(Path(config_path), _read_yaml)
+
 def load_prompt_template(prompt_name: str) -> str:
     """Load prompt template from file."""
-    prompt_path = Path(f"prompts/{prompt_name}")
-    with open(prompt_path, 'r') as file:
-        return file.read().strip()
+    return _cached_load(Path(f"prompts/{prompt_name}"), _read_prompt)
+
+_escalation_log_lock = threading.Lock()
 
 def save_to_escalation_log(ticket_data: Dict[str, Any], log_file: str = "data/escalation_log.csv"):
     """Save failed ticket to escalation log."""
+    save_escalations_to_log([ticket_data], log_file)
+
+def save_escalations_to_log(tickets: List[Dict[str, Any]], log_file: str = "data/escalation_log.csv"):
+    """Append several failed tickets to the escalation log in one write."""
     
     # Ensure directory exists
     os.makedirs(os.path.dirname(log_file), exist_ok=True)
     
     # Prepare row data
-    row_data = {
-        'timestamp': datetime.now().isoformat(),
+    timestamp = datetime.now().isoformat()
+    rows = [{
+        'timestamp': timestamp,
         'ticket_id': ticket_data.get('ticket_id', 'unknown'),
         'subject': ticket_data.get('subject', ''),
-        'description': ticket_data.get('description', ''),
+        'description': ticket_data.get('original_description') or ticket_data.get('description', ''),
         'category': ticket_data.get('category', ''),
         'failed_attempts': ticket_data.get('failed_attempts', 0),
         'final_error': ticket_data.get('final_error', ''),
         'escalation_message': ticket_data.get('escalation_message', '')
-    }
+    } for ticket_data in tickets]
     
-    # Check if file exists to determine if we need headers
-    file_exists = os.path.exists(log_file)
-    
-    # Write to CSV
-    with open(log_file, 'a', newline='', encoding='utf-8') as csvfile:
-        fieldnames = list(row_data.keys())
-        writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-        
-        if not file_exists:
-            writer.writeheader()
+    # Writers in other threads (the escalation worker) share the file
+    with _escalation_log_lock:
+        # Check if file exists to determine if we need headers
+        file_exists = os.path.exists(log_file)
         
-        writer.writerow(row_data)
+        # Write to CSV
+        with open(log_file, 'a', newline='', encoding='utf-8') as csvfile:
+            fieldnames = list(rows[0].keys())
+            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
+            
+            if not file_exists:
+                writer.writeheader()
+            
+            writer.writerows(rows)
 
-def load_knowledge_base(category: str) -> List[str]:
-    """Load knowledge base documents for a specific category."""
+# Name of the placeholder document returned for a category with no documents;
+# not a valid file name on every platform, so it can't clash with a real one
+PLACEHOLDER_DOCUMENT = "*"
+
+def _read_named_documents(kb_path: Path) -> Tuple[List[str], List[str]]:
+    names, documents = [], []
+    # Sorted by file name so every process and the snapshot list documents in the same order
+    for file_path in sorted(kb_path.glob("*.txt")):
+        with open(file_path, 'r', encoding='utf-8') as file:
+            names.append(file_path.stem)
+            documents.append(file.read().strip())
+    return names, documents
+
+def _read_knowledge_base(kb_path: Path) -> List[str]:
+    return _read_named_documents(kb_path)[1]
+
+def _knowledge_base_version(kb_path: str) -> Tuple[Tuple[str, int], ...]:
+    # Each document's own mtime, so edits in place are picked up as well as added or removed files
+    return tuple(sorted((entry.name, entry.stat().st_mtime_ns) for entry in os.scandir(kb_path) if entry.name.endswith(".txt")))
+
+def load_named_knowledge_base(category: str) -> Tuple[List[str], List[str]]:
+    """
+    Load a category's document names (file names without .txt) and texts.
+    
+    A category without documents gets one placeholder document named
+    PLACEHOLDER_DOCUMENT. Documents are cached until a file in the category
+    directory is added, removed or modified.
+    
+    Returns:
+        (names, documents), in the same order
+    """
     kb_path = Path(f"data/knowledge_base/{category.lower()}_docs")
     
     if not kb_path.exists():
-        return [f"No specific knowledge base found for {category} category."]
+        return [PLACEHOLDER_DOCUMENT], [f"No specific knowledge base found for {category} category."]
     
-    documents = []
-    for file_path in kb_path.glob("*.txt"):
-        with open(file_path, 'r', encoding='utf-8') as file:
-            documents.append(file.read().strip())
+    names, documents = _cached_load(kb_path, _read_named_documents, _knowledge_base_version)
+    
+    if not documents:
+        return [PLACEHOLDER_DOCUMENT], [f"No documents found in {category} knowledge base."]
+    return names, documents
+
+def load_knowledge_base(category: str) -> List[str]:
+    """
+    Load knowledge base documents for a specific category.
     
-    return documents if documents else [f"No documents found in {category} knowledge base."]
+    Documents are cached until a file in the category directory is added,
+    removed or modified.
+    """
+    return load_named_knowledge_base(category)[1]
 
 def create_ticket_id() -> str:
     """Generate a unique ticket ID."""
-    return f"TKT-{datetime.now().strftime('%Y%m%d%H%M%S')}"
+    # The random suffix keeps IDs unique when many tickets arrive in the same second
+    return f"TKT-{datetime.now().strftime('%Y%m%d%H%M%S')}-{uuid.uuid4().hex[:6]}"
+
+# Ticket IDs name cassette and profile files, so keep them to one safe path segment
+_TICKET_ID = re.compile(r"^[A-Za-z0-9][A-Za-z0-9_.-]{0,127}$")
+
+def validate_ticket_id(ticket_id: str) -> str:
+    """
+    Check a ticket ID is safe to use as a file name.
+
+    Raises:
+        ValueError: For IDs with path separators, leading dots or other characters
+    """
+    if not _TICKET_ID.match(ticket_id) or ".." in ticket_id:
+        raise ValueError(f"Invalid ticket_id '{ticket_id}'")
+    return ticket_id
@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""
+Memory-mapped knowledge base snapshot.
+
+`build` compiles data/knowledge_base into one binary file that worker
+processes map read-only, so every worker shares the same page-cache copy
+instead of loading its own Python strings. Opening a snapshot only parses a
+small header; document text is decoded when a document is actually returned.
+
+Layout (little-endian):
+    magic           8 bytes, b"KBSNAP01"
+    header length   uint32
+    header          JSON: document count, category ranges, document names, source mtimes
+    padding         to an 8-byte boundary
+    text offsets    uint64[n + 1], into the data region
+    lower offsets   uint64[n + 1], into the data region
+    data region     UTF-8 text of every document, then its lowercased copy
+
+Keyword scoring runs directly on the lowercased copy with mmap.find, which
+matches the substring semantics of nodes.retriever.score_documents. The
+retriever has no token postings or embeddings to store, so the snapshot
+holds none.
+
+Usage:
+    python -m utils.kb_snapshot build [--kb-dir data/knowledge_base] [--output PATH]
+    python -m utils.kb_snapshot info [--snapshot PATH]
+"""
+
+import argparse
+import json
+import mmap
+import os
+import struct
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from utils.logger import setup_logger
+from utils.helpers import _cached_load, _read_named_documents, load_config
+
+logger = setup_logger("kb_snapshot")
+
+MAGIC = b"KBSNAP01"
+PREAMBLE = struct.Struct("<8sI")
+DEFAULT_KB_DIR = "data/knowledge_base"
+DEFAULT_SNAPSHOT = "data/kb_snapshot.bin"
+
+def _pad(length: int) -> int:
+    return (8 - length % 8) % 8
+
+def build_snapshot(kb_dir: str = DEFAULT_KB_DIR, output: str = DEFAULT_SNAPSHOT) -> Dict[str, List[int]]:
+    """
+    Compile every {category}_docs directory under kb_dir into a snapshot file.
+
+    Documents keep the order load_knowledge_base returns them in, and their
+    names are stored so document IDs resolve by name. The file is
+    written next to the output and renamed into place, so running workers
+    never see a partial snapshot.
+
+    Returns:
+        Category ranges as {category: [first document, document count]}
+    """
+
+    kb_root = Path(kb_dir)
+    texts: List[bytes] = []
+    lowered: List[bytes] = []
+    categories: Dict[str, List[int]] = {}
+    names: Dict[str, List[str]] = {}
+    sources: Dict[str, int] = {}
+
+    for category_dir in sorted(kb_root.glob("*_docs")):
+        if not category_dir.is_dir():
+            continue
+        category_names, documents = _read_named_documents(category_dir)
+        category = category_dir.name[:-len("_docs")]
+        categories[category] = [len(texts), len(documents)]
+        names[category] = category_names
+        sources[category_dir.name] = os.stat(category_dir).st_mtime_ns
+        for document in documents:
+            texts.append(document.encode("utf-8"))
+            lowered.append(document.lower().encode("utf-8"))
+
+    header = json.dumps({"documents": len(texts), "categories": categories, "names": names,
+                         "sources": sources}).encode("utf-8")
+
+    text_offsets = np.zeros(len(texts) + 1, dtype="<u8")
+    lower_offsets = np.zeros(len(texts) + 1, dtype="<u8")
+    text_offsets[1:] = np.cumsum([len(text) for text in texts], dtype="<u8")
+    lower_offsets[1:] = np.cumsum([len(text) for text in lowered], dtype="<u8")
+    lower_offsets += text_offsets[-1]
+
+    output_path = Path(output)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = output_path.with_name(output_path.name + ".tmp")
+    with open(temp_path, "wb") as file:
+        file.write(PREAMBLE.pack(MAGIC, len(header)))
+        file.write(header)
+        file.write(b"\0" * _pad(PREAMBLE.size + len(header)))
+        file.write(text_offsets.tobytes())
+        file.write(lower_offsets.tobytes())
+        for text in texts:
+            file.write(text)
+        for text in lowered:
+            file.write(text)
+    os.replace(temp_path, output_path)
+
+    logger.info(f"Built knowledge base snapshot {output_path} with {len(texts)} documents")
+    return categories
+
+class KnowledgeBaseSnapshot:
+    """
+    Read-only view of a snapshot file, shared between processes through the page cache.
+
+    Args:
+        path: Snapshot file built by build_snapshot
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        with open(self.path, "rb") as file:
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, header_length = PREAMBLE.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{self.path} is not a knowledge base snapshot")
+        header_end = PREAMBLE.size + header_length
+        header = json.loads(self._map[PREAMBLE.size:header_end])
+
+        self.document_count = header["documents"]
+        self.categories: Dict[str, List[int]] = header["categories"]
+        self.sources: Dict[str, int] = header["sources"]
+        # Snapshots built before documents were named have no names; is_stale() reports them
+        self.names: Dict[str, List[str]] = header.get("names", {})
+        self._positions = {category: {name: position for position, name in enumerate(names)}
+                           for category, names in self.names.items()}
+        self.stale_warned = False
+
+        # Offset arrays are views onto the mapping, not copies
+        offsets_start = header_end + _pad(header_end)
+        count = self.document_count + 1
+        self._text_offsets = np.frombuffer(self._map, dtype="<u8", count=count, offset=offsets_start)
+        self._lower_offsets = np.frombuffer(self._map, dtype="<u8", count=count, offset=offsets_start + count * 8)
+        self._data_start = offsets_start + 2 * count * 8
+
+    def is_stale(self, kb_dir: str = DEFAULT_KB_DIR) -> bool:
+        """Whether a source directory changed since the snapshot was built, or it predates document names."""
+        if self.names.keys() != self.categories.keys():
+            return True
+        for name, mtime in self.sources.items():
+            source = Path(kb_dir) / name
+            if not source.exists() or os.stat(source).st_mtime_ns != mtime:
+                return True
+        return False
+
+    def covers(self, category: str) -> bool:
+        """Whether the snapshot holds documents for a category."""
+        return self.categories.get(category.lower(), [0, 0])[1] > 0
+
+    def document_names(self, category: str) -> List[str]:
+        """A category's document names, in document order."""
+        return self.names[category.lower()]
+
+    def position(self, category: str, name: str) -> int:
+        """
+        Position of a named document within its category.
+
+        Raises:
+            KeyError: If the category has no document of that name
+        """
+        return self._positions[category.lower()][name]
+
+    def _range(self, category: str) -> range:
+        first, count = self.categories[category.lower()]
+        return range(first, first + count)
+
+    def document(self, index: int) -> str:
+        """Decode one document's text."""
+        start = self._data_start + int(self._text_offsets[index])
+        end = self._data_start + int(self._text_offsets[index + 1])
+        return self._map[start:end].decode("utf-8")
+
+    def documents(self, category: str) -> List[str]:
+        """Decode every document of a category."""
+        return [self.document(index) for index in self._range(category)]
+
+    def lowercase_corpus(self, category: str) -> Tuple[mmap.mmap, np.ndarray]:
+        """
+        The mapping and the bounds of a category's lowercased documents.
+
+        Document i of the category spans bounds[i]:bounds[i + 1] of the
+        returned mapping, ready for find() without decoding any text.
+        """
+
+        first, count = self.categories[category.lower()]
+        bounds = self._lower_offsets[first:first + count + 1].astype(np.int64) + self._data_start
+        return self._map, bounds
+
+    def score(self, category: str, search_words: List[str]) -> List[Tuple[int, int]]:
+        """
+        Score a category's documents by keyword overlap, like score_documents.
+
+        Returns:
+            (document index, score) pairs with a positive score, best first,
+            ties in knowledge base order
+        """
+
+        needles = [word.encode("utf-8") for word in search_words]
+        first, count = self.categories[category.lower()]
+        bounds = (self._lower_offsets[first:first + count + 1] + self._data_start).tolist()
+        scored = []
+        for position in range(count):
+            start, end = bounds[position], bounds[position + 1]
+            score = sum(1 for needle in needles if self._map.find(needle, start, end) != -1)
+            if score > 0:
+                scored.append((first + position, score))
+
+        scored.sort(key=lambda item: item[1], reverse=True)
+        return scored
+
+def load_snapshot(config: Dict) -> Optional[KnowledgeBaseSnapshot]:
+    """
+    The configured snapshot (knowledge_base.snapshot_path), or None.
+
+    The mapping is reopened when the snapshot file is replaced by a rebuild.
+    A snapshot built before documents were added to or removed from the
+    knowledge base is not used: it would miss documents the text files have
+    (or serve ones they no longer have), so callers fall back to those until
+    the snapshot is rebuilt.
+    """
+
+    snapshot_path = config.get("knowledge_base", {}).get("snapshot_path", "")
+    if not snapshot_path or not Path(snapshot_path).exists():
+        return None
+    snapshot = _cached_load(Path(snapshot_path), KnowledgeBaseSnapshot)
+    if snapshot.is_stale():
+        if not snapshot.stale_warned:
+            snapshot.stale_warned = True
+            logger.warning(f"Knowledge base snapshot {snapshot_path} is stale; using the text files until it is rebuilt")
+        return None
+    return snapshot
+
+def main():
+    parser = argparse.ArgumentParser(description="Knowledge base snapshot tools")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    build_parser = subparsers.add_parser("build", help="Compile the knowledge base into a snapshot file")
+    build_parser.add_argument("--kb-dir", default=DEFAULT_KB_DIR)
+    build_parser.add_argument("--output", default=None, help="Snapshot path (default: knowledge_base.snapshot_path)")
+
+    info_parser = subparsers.add_parser("info", help="Describe a snapshot file")
+    info_parser.add_argument("--snapshot", default=None)
+    info_parser.add_argument("--kb-dir", default=DEFAULT_KB_DIR)
+
+    args = parser.parse_args()
+    configured = load_config().get("knowledge_base", {}).get("snapshot_path") or DEFAULT_SNAPSHOT
+
+    if args.command == "build":
+        categories = build_snapshot(args.kb_dir, args.output or configured)
+        for category, (_, count) in categories.items():
+            print(f"{category}: {count} documents")
+    else:
+        snapshot = KnowledgeBaseSnapshot(Path(args.snapshot or configured))
+        print(f"{snapshot.path}: {snapshot.document_count} documents, {snapshot.path.stat().st_size} bytes")
+        for category, (_, count) in snapshot.categories.items():
+            print(f"  {category}: {count} documents")
+        if snapshot.is_stale(args.kb_dir):
+            print("Snapshot is stale; rebuild it with: python -m utils.kb_snapshot build")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+import time
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+from langchain.schema import BaseMessage, HumanMessage, SystemMessage
+from langchain_openai import ChatOpenAI
+from utils.logger import setup_logger
+from utils.helpers import load_config, load_prompt_template
+from utils.cassettes import active_cassette
+from utils.circuit_breaker import CircuitOpen, get_circuit_breaker
+from utils.hedging import get_hedger
+from utils.llm_cache import cache_key, get_llm_cache, model_parameters
+from utils.metrics import metrics
+
+logger = setup_logger("llm")
+
+PROMPT_LAYOUTS = ("legacy", "cached_prefix")
+
+@lru_cache(maxsize=32)
+def get_chat_model(model: str, temperature: float, max_tokens: int) -> ChatOpenAI:
+    """
+    Return a shared chat model client for the given parameters.
+
+    Clients (and their HTTP connection pools) are created once per parameter
+    set instead of on every node call, so they stay warm across tickets.
+    """
+    return ChatOpenAI(model=model, temperature=temperature, max_tokens=max_tokens)
+
+def build_messages(prompt: str, config: Dict[str, Any], **fields: Any) -> List[BaseMessage]:
+    """
+    Render a node's prompt as chat messages.
+
+    The legacy layout sends prompts/{prompt}_prompt.txt as one user message,
+    with the ticket fields ahead of the instructions. The cached_prefix layout
+    sends the static prompts/{prompt}_system.txt as the system message and only
+    the ticket fields in prompts/{prompt}_user.txt, so every request starts with
+    an identical prefix that provider-side prompt caching can reuse.
+
+    Args:
+        prompt: Prompt family (classifier, generator, reviewer, escalation)
+        config: Loaded settings
+        **fields: Template fields
+
+    Returns:
+        Messages ready for the chat model
+    """
+
+    layout = config.get("prompts", {}).get("layout", "legacy")
+
+    if layout == "cached_prefix":
+        system_prompt = load_prompt_template(f"{prompt}_system.txt")
+        user_prompt = load_prompt_template(f"{prompt}_user.txt").format(**fields)
+        return [SystemMessage(content=system_prompt), HumanMessage(content=user_prompt)]
+
+    if layout != "legacy":
+        logger.warning(f"Unknown prompt layout '{layout}', using 'legacy'")
+
+    prompt_text = load_prompt_template(f"{prompt}_prompt.txt").format(**fields)
+    return [HumanMessage(content=prompt_text)]
+
+def extract_token_usage(response: Any) -> Dict[str, int]:
+    """
+    Read input, output and cached input token counts from a chat response.
+
+    Prefers LangChain's usage_metadata and falls back to the raw OpenAI
+    token_usage block; missing values count as zero.
+    """
+
+    usage = getattr(response, "usage_metadata", None) or {}
+    if usage:
+        details = usage.get("input_token_details") or {}
+        return {
+            "input_tokens": usage.get("input_tokens", 0) or 0,
+            "output_tokens": usage.get("output_tokens", 0) or 0,
+            "cached_tokens": details.get("cache_read", 0) or 0,
+        }
+
+    token_usage = (getattr(response, "response_metadata", None) or {}).get("token_usage") or {}
+    details = token_usage.get("prompt_tokens_details") or {}
+    return {
+        "input_tokens": token_usage.get("prompt_tokens", 0) or 0,
+        "output_tokens": token_usage.get("completion_tokens", 0) or 0,
+        "cached_tokens": details.get("cached_tokens", 0) or 0,
+    }
+
+def record_llm_usage(node: str, response: Any, latency: float):
+    """Record call latency and token counts for a node's LLM call."""
+    usage = extract_token_usage(response)
+    metrics.increment("llm_calls_total", node=node)
+    metrics.observe("llm_latency_seconds", latency, node=node)
+    metrics.increment("llm_input_tokens_total", usage["input_tokens"], node=node)
+    metrics.increment("llm_output_tokens_total", usage["output_tokens"], node=node)
+    metrics.increment("llm_cached_tokens_total", usage["cached_tokens"], node=node)
+
+def invoke_llm(node: str, llm: Any, messages: List[BaseMessage], timeout: Optional[float] = None) -> Any:
+    """
+    Invoke a chat model on behalf of a node and record its metrics.
+
+    When llm_cache is enabled for the node, a response stored for the same
+    model, parameters and rendered prompt is returned without calling the model.
+    Inside a cassette session the call is recorded to, or replayed from, the
+    ticket's cassette. Calls to the model go through the shared circuit
+    breaker and fail fast with CircuitOpen while it is open. Nodes listed in
+    hedging.nodes send a second request when the first is slow.
+
+    Args:
+        node: Node name used as the metrics label
+        llm: Chat model
+        messages: Prompt messages
+        timeout: Optional total seconds the call may take, e.g. from the ticket deadline
+
+    Returns:
+        The model response
+    """
+
+    cassette = active_cassette()
+    if cassette is not None and cassette.mode == "replay":
+        start = time.perf_counter()
+        response = cassette.replay(node, cache_key(llm, messages))
+        record_llm_usage(node, response, time.perf_counter() - start)
+        return response
+
+    start = time.perf_counter()
+    response = _invoke(node, llm, messages, timeout)
+    if cassette is not None:
+        cassette.record(node, cache_key(llm, messages), model_parameters(llm).get("model", ""),
+                        time.perf_counter() - start, response)
+    return response
+
+def _invoke(node: str, llm: Any, messages: List[BaseMessage], timeout: Optional[float]) -> Any:
+    config = load_config()
+    cache = get_llm_cache(node, config)
+    if cache is not None:
+        key = cache_key(llm, messages)
+        cached = cache.get(key)
+        if cached is not None:
+            metrics.increment("llm_cache_hits_total", node=node)
+            return cached
+        metrics.increment("llm_cache_misses_total", node=node)
+
+    kwargs = {}
+    if timeout is not None:
+        # The OpenAI client retries failed requests with the same per-request
+        # timeout, so split the budget across every attempt it may make
+        retries = getattr(getattr(llm, "root_client", None), "max_retries", 0) or 0
+        kwargs["timeout"] = timeout / (retries + 1)
+
+    breaker = get_circuit_breaker(config)
+    if breaker is not None and not breaker.allow():
+        metrics.increment("llm_circuit_rejected_total", node=node)
+        raise CircuitOpen(f"LLM circuit breaker is open, {node} call refused")
+
+    hedger = get_hedger(node, config)
+    start = time.perf_counter()
+    try:
+        if hedger is not None:
+            response = hedger.call(node, model_parameters(llm).get("model", ""),
+                                   lambda: llm.invoke(messages, **kwargs))
+        else:
+            response = llm.invoke(messages, **kwargs)
+    except Exception:
+        metrics.increment("llm_errors_total", node=node)
+        if breaker is not None:
+            breaker.record_failure()
+        raise
+
+    if breaker is not None:
+        breaker.record_success()
+    record_llm_usage(node, response, time.perf_counter() - start)
+
+    if cache is not None:
+        cache.put(key, node, response)
+    return response
@@ -0,0 +1,136 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from langchain_core.messages import BaseMessage, messages_from_dict, messages_to_dict
+from utils.logger import setup_logger
+
+logger = setup_logger("llm_cache")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS llm_responses (
+    key TEXT PRIMARY KEY,
+    node TEXT NOT NULL,
+    response TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    last_used_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_llm_responses_last_used ON llm_responses (last_used_at);
+"""
+
+def model_parameters(llm: Any) -> Dict[str, Any]:
+    """Parameters that change a chat model's output, for the cache key."""
+    if hasattr(llm, "model_name"):
+        return {
+            "model": llm.model_name,
+            "temperature": getattr(llm, "temperature", None),
+            "max_tokens": getattr(llm, "max_tokens", None),
+        }
+    # Test doubles keep their constructor arguments instead
+    return dict(getattr(llm, "kwargs", {}))
+
+def cache_key(llm: Any, messages: List[BaseMessage]) -> str:
+    """Hash of the model, its parameters and the rendered prompt."""
+    payload = {
+        "params": model_parameters(llm),
+        "messages": [[message.type, message.content] for message in messages],
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+class LLMResponseCache:
+    """
+    SQLite-backed store of LLM responses with LRU eviction and a TTL.
+
+    Args:
+        path: Database file
+        max_entries: Entries kept; the least recently used are evicted beyond this
+        ttl_seconds: Age after which an entry is ignored and removed (0 keeps entries forever)
+    """
+
+    def __init__(self, path: str, max_entries: int = 10000, ttl_seconds: float = 0):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached response for a key, or None on a miss."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response, created_at FROM llm_responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+
+            response, created_at = row
+            if self.ttl_seconds and now - created_at > self.ttl_seconds:
+                self._conn.execute("DELETE FROM llm_responses WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+
+            self._conn.execute("UPDATE llm_responses SET last_used_at = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+
+        return messages_from_dict([json.loads(response)])[0]
+
+    def put(self, key: str, node: str, response: Any):
+        """Store a response and evict the least recently used entries beyond max_entries."""
+        now = time.time()
+        serialized = json.dumps(messages_to_dict([response])[0], default=str)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_responses (key, node, response, created_at, last_used_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, node, serialized, now, now)
+            )
+            self._conn.execute(
+                "DELETE FROM llm_responses WHERE key IN ("
+                "SELECT key FROM llm_responses ORDER BY last_used_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+            self._conn.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM llm_responses").fetchone()[0]
+
+    def clear(self):
+        """Remove every entry."""
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_responses")
+            self._conn.commit()
+
+@lru_cache(maxsize=8)
+def _open_cache(path: str, max_entries: int, ttl_seconds: float) -> LLMResponseCache:
+    return LLMResponseCache(path, max_entries, ttl_seconds)
+
+def get_llm_cache(node: str, config: Dict[str, Any]) -> Optional[LLMResponseCache]:
+    """
+    The response cache for a node, or None if memoization is off for it.
+
+    Args:
+        node: Node name, matched against llm_cache.nodes
+        config: Loaded settings
+
+    Returns:
+        Shared cache instance for the configured database
+    """
+
+    cache_config = config.get("llm_cache", {})
+    if not cache_config.get("nodes", {}).get(node, False):
+        return None
+    return _open_cache(
+        cache_config.get("path", "data/llm_cache.sqlite3"),
+        cache_config.get("max_entries", 10000),
+        cache_config.get("ttl_seconds", 0)
+    )
@@ -0,0 +1,332 @@
+#!/usr/bin/env python3
+"""
+Memory instrumentation for long-running batch processes.
+
+While memory.enabled is on, a background thread periodically records the
+process RSS, the number of ticket states still alive and a tracemalloc
+snapshot diffed by allocation site against the first snapshot of the run.
+Each sample is appended as a JSON line to a per-run file in
+memory.output_dir. Intake (the queue consumer and the HTTP service) checks
+over_soft_limit() and pauses or sheds while RSS is above
+memory.soft_limit_mb.
+
+Usage:
+    python -m utils.memory_monitor report [--file PATH] [--dir logs/memory] [--top 20]
+"""
+
+import argparse
+import asyncio
+import atexit
+import gc
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from utils.logger import setup_logger
+from utils.helpers import load_config
+from utils.metrics import metrics
+
+logger = setup_logger("memory_monitor")
+
+# Allocations made by the instrumentation itself or by the import system
+SNAPSHOT_FILTERS = [
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+]
+
+def read_rss() -> int:
+    """Resident set size of this process in bytes (peak RSS where /proc is unavailable)."""
+    try:
+        with open("/proc/self/statm") as file:
+            return int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Kilobytes on Linux, bytes on macOS
+        return peak if sys.platform == "darwin" else peak * 1024
+
+def count_live_states() -> int:
+    """Ticket state dicts still reachable anywhere in the process."""
+    return sum(
+        1 for obj in gc.get_objects()
+        if type(obj) is dict and "processing_step" in obj and "ticket_id" in obj
+    )
+
+def _site_label(frame) -> str:
+    path = Path(frame.filename)
+    location = f"{path.parent.name}/{path.name}" if path.parent.name else path.name
+    return f"{location}:{frame.lineno}"
+
+class MemoryMonitor:
+    """
+    Periodic memory sampler with a soft RSS ceiling.
+
+    Args:
+        output_dir: Directory the per-run sample file is written to
+        interval: Seconds between samples
+        frames: Stack frames recorded per allocation (1 = allocation line only)
+        top: Allocation sites kept per sample
+        soft_limit_mb: RSS above which intake backs off; 0 disables the ceiling
+        resume_fraction: Intake resumes once RSS falls below this fraction of the limit
+        rss_reader: Function returning the current RSS in bytes
+    """
+
+    def __init__(self, output_dir: str = "logs/memory", interval: float = 30.0, frames: int = 1,
+                 top: int = 25, soft_limit_mb: float = 0, resume_fraction: float = 0.9,
+                 rss_reader: Callable[[], int] = read_rss):
+        self.output_dir = Path(output_dir)
+        self.interval = interval
+        self.frames = frames
+        self.top = top
+        self.soft_limit = int(soft_limit_mb * 1024 * 1024)
+        self.resume_fraction = resume_fraction
+        self.rss_reader = rss_reader
+        self.path = self.output_dir / f"run-{datetime.now().strftime('%Y%m%d-%H%M%S')}-{os.getpid()}.jsonl"
+        self.tickets_in_flight = 0
+        self.throttled = False
+        self._lock = threading.Lock()
+        self._baseline: Optional[tracemalloc.Snapshot] = None
+        self._started = time.time()
+        self._sampler: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+
+    def start(self):
+        """Start tracing allocations and the background sampler."""
+        with self._lock:
+            if self._sampler is not None:
+                return
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(self.frames)
+            self._baseline = tracemalloc.take_snapshot().filter_traces(SNAPSHOT_FILTERS)
+            self._sampler = threading.Thread(target=self._sample_loop, name="memory-monitor", daemon=True)
+            self._sampler.start()
+            atexit.register(self.stop)
+        logger.info(f"Memory monitor writing samples every {self.interval}s to {self.path}")
+
+    def stop(self):
+        """Take a final sample and stop the sampler."""
+        if self._sampler is None or self._stopping.is_set():
+            return
+        self._stopping.set()
+        self.sample()
+
+    def _sample_loop(self):
+        while not self._stopping.wait(self.interval):
+            try:
+                self.sample()
+            except Exception as e:
+                logger.error(f"Memory sample failed: {str(e)}")
+
+    def sample(self) -> Dict[str, Any]:
+        """
+        Record RSS, live states and allocation growth since the run started.
+
+        Returns:
+            The sample, as appended to the run file
+        """
+
+        rss = self.rss_reader()
+        live_states = count_live_states()
+        record = {
+            "timestamp": time.time(),
+            "elapsed_seconds": time.time() - self._started,
+            "rss_bytes": rss,
+            "live_states": live_states,
+            "tickets_in_flight": self.tickets_in_flight,
+            "throttled": self.throttled,
+            "traced_bytes": 0,
+            "growth": [],
+        }
+
+        if tracemalloc.is_tracing() and self._baseline is not None:
+            snapshot = tracemalloc.take_snapshot().filter_traces(SNAPSHOT_FILTERS)
+            record["traced_bytes"] = tracemalloc.get_traced_memory()[0]
+            key_type = "traceback" if self.frames > 1 else "lineno"
+            for diff in snapshot.compare_to(self._baseline, key_type)[:self.top]:
+                # Frames run from the outermost caller to the allocating line
+                frames = list(diff.traceback)
+                record["growth"].append({
+                    "site": _site_label(frames[-1]),
+                    "callers": [_site_label(frame) for frame in reversed(frames[:-1])],
+                    "size_diff": diff.size_diff,
+                    "count_diff": diff.count_diff,
+                    "size": diff.size,
+                })
+
+        metrics.set_gauge("memory_rss_bytes", rss)
+        metrics.set_gauge("memory_traced_bytes", record["traced_bytes"])
+        metrics.set_gauge("memory_live_states", live_states)
+
+        try:
+            self.output_dir.mkdir(parents=True, exist_ok=True)
+            with self._lock, open(self.path, "a", encoding="utf-8") as file:
+                file.write(json.dumps(record) + "\n")
+        except Exception as e:
+            logger.error(f"Failed to write memory sample to {self.path}: {str(e)}")
+        return record
+
+    def over_soft_limit(self) -> bool:
+        """
+        Whether intake should back off.
+
+        Turns on when RSS reaches the soft limit and off again only once it
+        drops below resume_fraction of it, so intake doesn't flap at the edge.
+        """
+
+        if not self.soft_limit:
+            return False
+
+        rss = self.rss_reader()
+        with self._lock:
+            if self.throttled:
+                self.throttled = rss >= self.soft_limit * self.resume_fraction
+            elif rss >= self.soft_limit:
+                self.throttled = True
+                metrics.increment("memory_soft_limit_hits_total")
+                logger.warning(f"RSS {rss / 2**20:.0f} MB reached the soft limit of "
+                               f"{self.soft_limit / 2**20:.0f} MB; applying backpressure to intake")
+                # Give back whatever garbage is waiting before intake checks again
+                gc.collect()
+            throttled = self.throttled
+        metrics.set_gauge("memory_throttled", int(throttled))
+        return throttled
+
+    @contextmanager
+    def ticket(self) -> Iterator[None]:
+        """Count a ticket as in flight inside this block."""
+        with self._lock:
+            self.tickets_in_flight += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.tickets_in_flight -= 1
+
+_monitor: Optional[MemoryMonitor] = None
+_monitor_lock = threading.Lock()
+
+def get_memory_monitor() -> Optional[MemoryMonitor]:
+    """The process-wide memory monitor, started on first use, or None when memory.enabled is off."""
+    global _monitor
+    if _monitor is None:
+        memory_config = load_config().get("memory", {})
+        if not memory_config.get("enabled", False):
+            return None
+        with _monitor_lock:
+            if _monitor is None:
+                monitor = MemoryMonitor(
+                    output_dir=memory_config.get("output_dir", "logs/memory"),
+                    interval=memory_config.get("interval_seconds", 30),
+                    frames=memory_config.get("tracemalloc_frames", 1),
+                    top=memory_config.get("top_sites", 25),
+                    soft_limit_mb=memory_config.get("soft_limit_mb", 0),
+                    resume_fraction=memory_config.get("resume_fraction", 0.9),
+                )
+                monitor.start()
+                _monitor = monitor
+    return _monitor
+
+@contextmanager
+def monitor_ticket() -> Iterator[None]:
+    """Count the ticket processed inside this block as in flight, if monitoring is enabled."""
+    monitor = get_memory_monitor()
+    if monitor is None:
+        yield
+        return
+    with monitor.ticket():
+        yield
+
+def over_soft_limit() -> bool:
+    """Whether intake should shed or pause new tickets for memory."""
+    monitor = get_memory_monitor()
+    return monitor is not None and monitor.over_soft_limit()
+
+async def wait_for_memory(poll_interval: float = None):
+    """Block intake while RSS is above the soft limit."""
+    if not over_soft_limit():
+        return
+    poll_interval = poll_interval or load_config().get("memory", {}).get("backpressure_poll_seconds", 1.0)
+    start = time.perf_counter()
+    while over_soft_limit():
+        await asyncio.sleep(poll_interval)
+    waited = time.perf_counter() - start
+    metrics.observe("memory_backpressure_seconds", waited)
+    logger.info(f"Intake resumed after {waited:.1f}s of memory backpressure")
+
+def load_samples(path: Path) -> List[Dict[str, Any]]:
+    """Read a run file, skipping lines that are incomplete or unreadable."""
+    samples = []
+    with open(path, "r", encoding="utf-8") as file:
+        for line in file:
+            try:
+                samples.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue
+    return samples
+
+def format_report(samples: List[Dict[str, Any]], top: int = 20) -> str:
+    """Render RSS, live state and traced memory trends plus the top allocation growth sites."""
+    first, last = samples[0], samples[-1]
+    mb = 2 ** 20
+    lines = [
+        f"Samples: {len(samples)}  Duration: {last['elapsed_seconds'] - first['elapsed_seconds']:.0f}s",
+        f"RSS:          {first['rss_bytes'] / mb:.1f} MB -> {last['rss_bytes'] / mb:.1f} MB "
+        f"(peak {max(s['rss_bytes'] for s in samples) / mb:.1f} MB)",
+        f"Traced:       {first['traced_bytes'] / mb:.1f} MB -> {last['traced_bytes'] / mb:.1f} MB",
+        f"Live states:  {first['live_states']} -> {last['live_states']} "
+        f"(peak {max(s['live_states'] for s in samples)})",
+        f"Throttled:    {sum(1 for s in samples if s.get('throttled'))} of {len(samples)} samples",
+        "",
+        f"Top {top} allocation sites by growth since the start of the run:",
+        f"{'growth MB':>10} {'blocks':>10} {'total MB':>9}  site",
+    ]
+    for entry in sorted(last["growth"], key=lambda e: e["size_diff"], reverse=True)[:top]:
+        callers = f"  <- {' <- '.join(entry['callers'])}" if entry["callers"] else ""
+        lines.append(f"{entry['size_diff'] / mb:>10.2f} {entry['count_diff']:>+10} "
+                     f"{entry['size'] / mb:>9.2f}  {entry['site']}{callers}")
+    return "\n".join(lines)
+
+def main():
+    parser = argparse.ArgumentParser(description="Memory monitor tools")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    report_parser = subparsers.add_parser("report", help="Show memory trends and top allocation growth for a run")
+    report_parser.add_argument("--file", default=None, help="Run file (default: the latest run in --dir)")
+    report_parser.add_argument("--dir", default=None, help="Sample directory (default: memory.output_dir)")
+    report_parser.add_argument("--top", type=int, default=20, help="Allocation sites to list")
+
+    args = parser.parse_args()
+
+    if args.file:
+        path = Path(args.file)
+    else:
+        sample_dir = Path(args.dir or load_config().get("memory", {}).get("output_dir", "logs/memory"))
+        runs = sorted(sample_dir.glob("run-*.jsonl"), key=lambda p: p.stat().st_mtime)
+        if not runs:
+            print(f"No memory samples found in {sample_dir}")
+            sys.exit(1)
+        path = runs[-1]
+
+    samples = load_samples(path)
+    if not samples:
+        print(f"No samples in {path}")
+        sys.exit(1)
+
+    print(f"Run: {path}")
+    print(format_report(samples, args.top))
+
+if __name__ == "__main__":
+    main()
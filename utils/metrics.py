@@ -0,0 +1,109 @@
+import math
+import threading
+from collections import deque
+from typing import Any, Dict, List, Tuple
+
+def _key(name: str, labels: Dict[str, Any]) -> Tuple[str, Tuple[Tuple[str, str], ...]]:
+    return name, tuple(sorted((label, str(value)) for label, value in labels.items()))
+
+def _format_key(key: Tuple[str, Tuple[Tuple[str, str], ...]]) -> str:
+    name, labels = key
+    if not labels:
+        return name
+    return name + "{" + ",".join(f"{label}={value}" for label, value in labels) + "}"
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of a list of values."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+class MetricsRegistry:
+    """
+    Thread-safe in-process metrics: counters, gauges and histograms.
+
+    Histograms keep a rolling window of recent samples for percentiles plus
+    an all-time count and sum.
+    """
+
+    def __init__(self, max_samples: int = 2048):
+        self.max_samples = max_samples
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._gauges = {}
+        self._histograms = {}
+
+    def increment(self, name: str, value: float = 1.0, **labels: Any):
+        """Add to a counter."""
+        key = _key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0.0) + value
+
+    def set_gauge(self, name: str, value: float, **labels: Any):
+        """Set a gauge to its current value."""
+        with self._lock:
+            self._gauges[_key(name, labels)] = value
+
+    def observe(self, name: str, value: float, **labels: Any):
+        """Record a histogram sample."""
+        key = _key(name, labels)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = {"count": 0, "sum": 0.0, "samples": deque(maxlen=self.max_samples)}
+                self._histograms[key] = histogram
+            histogram["count"] += 1
+            histogram["sum"] += value
+            histogram["samples"].append(value)
+
+    def get_counter(self, name: str, **labels: Any) -> float:
+        """Current value of a counter (0 if never incremented)."""
+        with self._lock:
+            return self._counters.get(_key(name, labels), 0.0)
+
+    def get_gauge(self, name: str, **labels: Any) -> float:
+        """Current value of a gauge (0 if never set)."""
+        with self._lock:
+            return self._gauges.get(_key(name, labels), 0.0)
+
+    def percentile(self, name: str, pct: float, **labels: Any) -> float:
+        """Percentile over the recent samples of a histogram."""
+        with self._lock:
+            histogram = self._histograms.get(_key(name, labels))
+            samples = list(histogram["samples"]) if histogram else []
+        return percentile(samples, pct)
+
+    def sample_count(self, name: str, **labels: Any) -> int:
+        """Number of recent samples held for a histogram."""
+        with self._lock:
+            histogram = self._histograms.get(_key(name, labels))
+            return len(histogram["samples"]) if histogram else 0
+
+    def snapshot(self) -> Dict[str, Any]:
+        """JSON-serializable view of every metric."""
+        with self._lock:
+            counters = {_format_key(key): value for key, value in self._counters.items()}
+            gauges = {_format_key(key): value for key, value in self._gauges.items()}
+            histograms = {}
+            for key, histogram in self._histograms.items():
+                ordered = sorted(histogram["samples"])
+                histograms[_format_key(key)] = {
+                    "count": histogram["count"],
+                    "sum": histogram["sum"],
+                    "p50": percentile(ordered, 50),
+                    "p95": percentile(ordered, 95),
+                    "p99": percentile(ordered, 99),
+                }
+        return {"counters": counters, "gauges": gauges, "histograms": histograms}
+
+    def reset(self):
+        """Drop every metric."""
+        with self._lock:
+            self._counters.clear()
+            self._gauges.clear()
+            self._histograms.clear()
+
+# Shared registry for the whole process
+metrics = MetricsRegistry()
@@ -0,0 +1,65 @@
+import time
+from typing import Any, Dict, List, Optional
+from langchain.schema import BaseMessage
+from utils.logger import setup_logger
+from utils.llm import extract_token_usage, invoke_llm
+from utils.metrics import metrics
+
+logger = setup_logger("model_cascade")
+
+def cascade_models(node: str, config: Dict[str, Any]) -> List[str]:
+    """
+    Models a node may use, cheapest first.
+
+    Returns model_cascade.nodes[node] when the cascade is enabled and the node
+    is listed, otherwise just llm.model.
+    """
+    cascade_config = config.get("model_cascade", {})
+    models = cascade_config.get("nodes", {}).get(node) if cascade_config.get("enabled", False) else None
+    return list(models) if models else [config["llm"]["model"]]
+
+def model_for_attempt(node: str, attempt: int, config: Dict[str, Any]) -> str:
+    """Model for a 0-based attempt; attempts past the last tier stay on it."""
+    models = cascade_models(node, config)
+    return models[min(attempt, len(models) - 1)]
+
+def call_cost(model: str, usage: Dict[str, int], config: Dict[str, Any]) -> float:
+    """USD cost of a call from model_cascade.pricing (per 1M tokens); 0 for unpriced models."""
+    price = config.get("model_cascade", {}).get("pricing", {}).get(model)
+    if not price:
+        return 0.0
+    return (usage["input_tokens"] * price.get("input", 0) + usage["output_tokens"] * price.get("output", 0)) / 1_000_000
+
+def invoke_tier(node: str, model: str, llm: Any, messages: List[BaseMessage], config: Dict[str, Any],
+                timeout: Optional[float] = None) -> Any:
+    """
+    Call invoke_llm and record latency and cost for the model's cascade tier.
+
+    Args:
+        node: Node name
+        model: Model the llm client was created for
+        llm: Chat model
+        messages: Prompt messages
+        config: Loaded settings
+        timeout: Optional seconds the call may take
+
+    Returns:
+        The model response
+    """
+
+    start = time.perf_counter()
+    response = invoke_llm(node, llm, messages, timeout=timeout)
+    latency = time.perf_counter() - start
+
+    metrics.increment("cascade_calls_total", node=node, model=model)
+    metrics.observe("cascade_latency_seconds", latency, node=node, model=model)
+    metrics.increment("cascade_cost_usd_total", call_cost(model, extract_token_usage(response), config),
+                      node=node, model=model)
+    return response
+
+def record_review_outcome(model: str, approved: bool):
+    """Track how often drafts from each model are approved."""
+    metrics.increment("cascade_reviews_total", model=model, approved=str(approved).lower())
+    approved_count = metrics.get_counter("cascade_reviews_total", model=model, approved="true")
+    total = approved_count + metrics.get_counter("cascade_reviews_total", model=model, approved="false")
+    metrics.set_gauge("cascade_approval_rate", approved_count / total, model=model)
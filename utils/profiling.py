@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+"""
+Sampling profiler for slow tickets.
+
+While profiling is enabled, a background thread samples the Python stack of
+every thread that is running a graph node and attributes the samples to that
+node's ticket. When the ticket finishes, its profile and node timings are
+written to profiling.output_dir if it exceeded slow_threshold_seconds, or if
+it was picked by sample_rate; otherwise they are discarded.
+
+Usage:
+    python -m utils.profiling report [--dir logs/profiles] [--top 20]
+"""
+
+import argparse
+import json
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from utils.logger import setup_logger
+from utils.helpers import load_config, validate_ticket_id
+from utils.metrics import metrics
+
+logger = setup_logger("profiling")
+
+MAX_STACK_DEPTH = 64
+
+def _frame_label(code) -> str:
+    path = Path(code.co_filename)
+    location = f"{path.parent.name}/{path.name}" if path.parent.name else path.name
+    return f"{code.co_name} ({location}:{code.co_firstlineno})"
+
+class TicketProfiler:
+    """
+    Per-ticket stack sampler.
+
+    Args:
+        output_dir: Directory profiles are written to
+        sample_rate: Fraction of tickets profiled regardless of latency
+        slow_threshold: Seconds after which a ticket's profile is always written
+        interval: Seconds between stack samples
+    """
+
+    def __init__(self, output_dir: str = "logs/profiles", sample_rate: float = 0.0,
+                 slow_threshold: float = 20.0, interval: float = 0.01):
+        self.output_dir = Path(output_dir)
+        self.sample_rate = sample_rate
+        self.slow_threshold = slow_threshold
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._tickets: Dict[str, Dict[str, Any]] = {}
+        self._threads: Dict[int, str] = {}
+        self._sampler: Optional[threading.Thread] = None
+
+    def start_ticket(self, ticket_id: str):
+        """Begin collecting samples and node timings for a ticket."""
+        with self._lock:
+            self._tickets[ticket_id] = {"start": time.perf_counter(), "nodes": [], "stacks": Counter(), "samples": 0}
+            if self._sampler is None:
+                self._sampler = threading.Thread(target=self._sample_loop, name="ticket-profiler", daemon=True)
+                self._sampler.start()
+
+    def finish_ticket(self, ticket_id: str) -> Optional[Path]:
+        """
+        Stop collecting for a ticket and write its profile if it was slow or sampled.
+
+        Returns:
+            Path of the written profile, or None if it was discarded
+        """
+
+        with self._lock:
+            record = self._tickets.pop(ticket_id, None)
+        if record is None:
+            return None
+
+        latency = time.perf_counter() - record["start"]
+        if latency >= self.slow_threshold:
+            reason = "slow"
+        elif random.random() < self.sample_rate:
+            reason = "sampled"
+        else:
+            return None
+
+        profile = {
+            "ticket_id": ticket_id,
+            "reason": reason,
+            "latency_seconds": latency,
+            "interval_seconds": self.interval,
+            "samples": record["samples"],
+            "nodes": record["nodes"],
+            "stacks": [
+                {"stack": list(stack), "count": count}
+                for stack, count in record["stacks"].most_common()
+            ],
+        }
+
+        try:
+            self.output_dir.mkdir(parents=True, exist_ok=True)
+            path = self.output_dir / f"{validate_ticket_id(ticket_id)}.json"
+            path.write_text(json.dumps(profile, indent=2))
+        except Exception as e:
+            logger.error(f"Failed to write profile for ticket {ticket_id}: {str(e)}")
+            return None
+
+        metrics.increment("profiles_written_total", reason=reason)
+        logger.info(f"Wrote {reason} profile for ticket {ticket_id} ({latency:.2f}s) to {path}")
+        return path
+
+    @contextmanager
+    def node(self, ticket_id: str, name: str) -> Iterator[None]:
+        """Attribute the current thread's samples to a ticket while a node runs, and time it."""
+        with self._lock:
+            record = self._tickets.get(ticket_id)
+            if record is None:
+                tracked = False
+            else:
+                tracked = True
+                thread_id = threading.get_ident()
+                previous = self._threads.get(thread_id)
+                self._threads[thread_id] = ticket_id
+
+        if not tracked:
+            yield
+            return
+
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            with self._lock:
+                if previous is None:
+                    self._threads.pop(thread_id, None)
+                else:
+                    self._threads[thread_id] = previous
+                record["nodes"].append({
+                    "node": name,
+                    "offset_seconds": start - record["start"],
+                    "seconds": end - start,
+                })
+
+    def _sample_loop(self):
+        while True:
+            time.sleep(self.interval)
+            with self._lock:
+                active = dict(self._threads)
+            if not active:
+                continue
+
+            frames = sys._current_frames()
+            samples = []
+            for thread_id, ticket_id in active.items():
+                frame = frames.get(thread_id)
+                stack = []
+                while frame is not None and len(stack) < MAX_STACK_DEPTH:
+                    stack.append(_frame_label(frame.f_code))
+                    frame = frame.f_back
+                if stack:
+                    samples.append((ticket_id, tuple(reversed(stack))))
+
+            with self._lock:
+                for ticket_id, stack in samples:
+                    record = self._tickets.get(ticket_id)
+                    if record is not None:
+                        record["stacks"][stack] += 1
+                        record["samples"] += 1
+
+_profiler: Optional[TicketProfiler] = None
+_profiler_lock = threading.Lock()
+
+def get_profiler() -> Optional[TicketProfiler]:
+    """The process-wide profiler, or None when profiling.enabled is off."""
+    global _profiler
+    if _profiler is None:
+        profiling_config = load_config().get("profiling", {})
+        if not profiling_config.get("enabled", False):
+            return None
+        with _profiler_lock:
+            if _profiler is None:
+                _profiler = TicketProfiler(
+                    output_dir=profiling_config.get("output_dir", "logs/profiles"),
+                    sample_rate=profiling_config.get("sample_rate", 0.0),
+                    slow_threshold=profiling_config.get("slow_threshold_seconds", 20.0),
+                    interval=profiling_config.get("interval_seconds", 0.01),
+                )
+    return _profiler
+
+@contextmanager
+def profile_ticket(ticket_id: str) -> Iterator[None]:
+    """Profile everything the graph does for a ticket inside this block."""
+    profiler = get_profiler()
+    if profiler is None:
+        yield
+        return
+
+    profiler.start_ticket(ticket_id)
+    try:
+        yield
+    finally:
+        profiler.finish_ticket(ticket_id)
+
+def profiled_node(name: str, node: Callable[[Dict[str, Any]], Dict[str, Any]]):
+    """Wrap a graph node so its time and stack samples are attributed to the ticket."""
+
+    def wrapper(state: Dict[str, Any]) -> Dict[str, Any]:
+        profiler = get_profiler()
+        if profiler is None:
+            return node(state)
+        with profiler.node(state.get("ticket_id", ""), name):
+            return node(state)
+
+    wrapper.__name__ = node.__name__
+    return wrapper
+
+def aggregate_profiles(paths: List[Path]) -> Dict[str, Any]:
+    """
+    Combine written profiles into per-function and per-node totals.
+
+    Self samples count the function at the top of the stack; cumulative
+    samples count every function on the stack once.
+    """
+
+    self_samples = Counter()
+    cumulative_samples = Counter()
+    node_seconds = Counter()
+    node_calls = Counter()
+    total_samples = 0
+    tickets = 0
+
+    for path in paths:
+        try:
+            profile = json.loads(path.read_text())
+        except Exception as e:
+            logger.warning(f"Skipping unreadable profile {path}: {str(e)}")
+            continue
+
+        tickets += 1
+        for entry in profile.get("stacks", []):
+            stack, count = entry["stack"], entry["count"]
+            total_samples += count
+            self_samples[stack[-1]] += count
+            for function in set(stack):
+                cumulative_samples[function] += count
+        for timing in profile.get("nodes", []):
+            node_seconds[timing["node"]] += timing["seconds"]
+            node_calls[timing["node"]] += 1
+
+    return {
+        "tickets": tickets,
+        "total_samples": total_samples,
+        "self": self_samples,
+        "cumulative": cumulative_samples,
+        "node_seconds": node_seconds,
+        "node_calls": node_calls,
+    }
+
+def format_report(aggregate: Dict[str, Any], top: int = 20) -> str:
+    """Render the top-N hot functions and node totals as text."""
+    total = aggregate["total_samples"] or 1
+    lines = [f"Profiles: {aggregate['tickets']}  Samples: {aggregate['total_samples']}", ""]
+
+    for title, counter in (("Self", aggregate["self"]), ("Cumulative", aggregate["cumulative"])):
+        lines.append(f"Top {top} functions by {title.lower()} samples:")
+        lines.append(f"{'samples':>9} {'%':>6}  function")
+        for function, count in counter.most_common(top):
+            lines.append(f"{count:>9} {100 * count / total:>5.1f}%  {function}")
+        lines.append("")
+
+    lines.append("Node time:")
+    lines.append(f"{'seconds':>9} {'calls':>6}  node")
+    for node, seconds in aggregate["node_seconds"].most_common():
+        lines.append(f"{seconds:>9.2f} {aggregate['node_calls'][node]:>6}  {node}")
+    return "\n".join(lines)
+
+def main():
+    parser = argparse.ArgumentParser(description="Ticket profile tools")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    report_parser = subparsers.add_parser("report", help="Aggregate profiles into a hot-function report")
+    report_parser.add_argument("--dir", default=None, help="Profile directory (default: profiling.output_dir)")
+    report_parser.add_argument("--top", type=int, default=20, help="Functions to list")
+
+    args = parser.parse_args()
+
+    profile_dir = Path(args.dir or load_config().get("profiling", {}).get("output_dir", "logs/profiles"))
+    paths = sorted(profile_dir.glob("*.json"))
+    if not paths:
+        print(f"No profiles found in {profile_dir}")
+        sys.exit(1)
+
+    print(format_report(aggregate_profiles(paths), args.top))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,304 @@
+import re
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+from utils.logger import setup_logger
+from utils.document_store import resolve_documents
+
+logger = setup_logger("prompt_assembler")
+
+DEFAULT_ENCODING = "cl100k_base"
+
+_SENTENCE_SPLIT = re.compile(r"(?<=[.!?])\s+(?=[A-Z0-9\"'(])")
+_HEADING = re.compile(r"^(\d+\.\s+)?[A-Z0-9][A-Z0-9 &/,'()-]+:?$")
+_WORD = re.compile(r"[a-z0-9]+")
+_NUMBER = re.compile(r"\d+(?:[.,-]\d+)*")
+_STOPWORDS = {
+    "about", "after", "also", "been", "before", "could", "from", "have", "into", "more", "please",
+    "should", "that", "their", "them", "there", "these", "they", "this", "those", "were", "what",
+    "when", "which", "will", "with", "within", "would", "your"
+}
+
+@lru_cache(maxsize=8)
+def _get_encoding(encoding_name: str):
+    """Load a tiktoken encoding once; None if it is unavailable (e.g. offline)."""
+    try:
+        import tiktoken
+        return tiktoken.get_encoding(encoding_name)
+    except Exception as e:
+        logger.warning(f"tiktoken encoding '{encoding_name}' unavailable, estimating tokens: {str(e)}")
+        return None
+
+def count_tokens(text: str, encoding_name: str = DEFAULT_ENCODING) -> int:
+    """
+    Count tokens with tiktoken.
+
+    Falls back to a 4-characters-per-token estimate when the encoding
+    cannot be loaded, so budgets still apply without network access.
+    """
+    if not text:
+        return 0
+    encoding = _get_encoding(encoding_name)
+    if encoding is None:
+        return max(1, (len(text) + 3) // 4)
+    return len(encoding.encode(text, disallowed_special=()))
+
+def truncate_to_tokens(text: str, max_tokens: int, encoding_name: str = DEFAULT_ENCODING) -> str:
+    """Cut text down to at most max_tokens tokens."""
+    if count_tokens(text, encoding_name) <= max_tokens:
+        return text
+    encoding = _get_encoding(encoding_name)
+    if encoding is None:
+        return text[:max_tokens * 4].rstrip() + "..."
+    return encoding.decode(encoding.encode(text, disallowed_special=())[:max_tokens]).rstrip() + "..."
+
+def _content_words(text: str) -> set:
+    return {word for word in _WORD.findall(text.lower()) if len(word) > 3 and not word.isdigit() and word not in _STOPWORDS}
+
+def _normalize(text: str) -> str:
+    return " ".join(_WORD.findall(text.lower()))
+
+def split_units(documents: List[str]) -> List[Dict[str, Any]]:
+    """
+    Split documents into sentence-level units.
+
+    Knowledge base documents are line oriented (section headings followed by
+    bullet points), so each line is split into sentences and every sentence
+    remembers the heading of the section it belongs to.
+
+    Args:
+        documents: Context documents
+
+    Returns:
+        Units with doc, order, heading and text keys, in document order
+    """
+
+    units = []
+    order = 0
+
+    for doc_index, document in enumerate(documents):
+        heading = None
+        for line in document.splitlines():
+            line = line.strip()
+            if not line:
+                continue
+            if _HEADING.match(line) and not line.startswith("-"):
+                heading = line
+                continue
+            for sentence in _SENTENCE_SPLIT.split(line):
+                sentence = sentence.strip()
+                if sentence:
+                    units.append({"doc": doc_index, "order": order, "heading": heading, "text": sentence})
+                    order += 1
+
+    return units
+
+def _dedupe(units: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    seen = set()
+    unique = []
+    for unit in units:
+        key = _normalize(unit["text"])
+        if key and key not in seen:
+            seen.add(key)
+            unique.append(unit)
+    return unique
+
+def _render(units: List[Dict[str, Any]]) -> str:
+    """Render selected units in original order, grouped by document and heading."""
+    blocks = []
+    current_doc = None
+    current_heading = None
+    lines = []
+
+    for unit in sorted(units, key=lambda u: u["order"]):
+        if unit["doc"] != current_doc:
+            if lines:
+                blocks.append("\n".join(lines))
+            lines = []
+            current_doc = unit["doc"]
+            current_heading = None
+        if unit["heading"] and unit["heading"] != current_heading:
+            lines.append(unit["heading"])
+            current_heading = unit["heading"]
+        lines.append(unit["text"])
+
+    if lines:
+        blocks.append("\n".join(lines))
+    return "\n\n".join(blocks)
+
+def _select_within_budget(units: List[Dict[str, Any]], scores: List[float], max_tokens: int,
+                          encoding_name: str) -> List[Dict[str, Any]]:
+    """Greedily keep the highest scoring units that fit in the token budget."""
+    ranked = sorted(zip(units, scores), key=lambda pair: (-pair[1], pair[0]["order"]))
+    selected = []
+    used = 0
+    headings = set()
+
+    for unit, score in ranked:
+        cost = count_tokens(unit["text"], encoding_name) + 1
+        if unit["heading"] and (unit["doc"], unit["heading"]) not in headings:
+            cost += count_tokens(unit["heading"], encoding_name) + 1
+        if used + cost > max_tokens:
+            continue
+        selected.append(unit)
+        used += cost
+        if unit["heading"]:
+            headings.add((unit["doc"], unit["heading"]))
+
+    return selected
+
+def compress_context(documents: List[str], query: str, max_tokens: int,
+                     encoding_name: str = DEFAULT_ENCODING) -> str:
+    """
+    Deduplicate context and extract the sentences most relevant to the query.
+
+    Context that already fits in the budget is only deduplicated.
+
+    Args:
+        documents: Retrieved context documents
+        query: Ticket text (and reviewer feedback) to rank sentences against
+        max_tokens: Token budget for the returned context
+        encoding_name: tiktoken encoding used for counting
+
+    Returns:
+        Compressed context text
+    """
+
+    units = _dedupe(split_units(documents))
+    rendered = _render(units)
+    if count_tokens(rendered, encoding_name) <= max_tokens:
+        return rendered
+
+    # Same keyword-overlap notion of relevance as the retriever
+    query_words = [word for word in query.lower().split() if len(word) > 3]
+    scores = [sum(1 for word in query_words if word in unit["text"].lower()) for unit in units]
+
+    return _render(_select_within_budget(units, scores, max_tokens, encoding_name))
+
+def cited_spans(documents: List[str], draft: str, min_overlap: float = 0.6) -> List[Dict[str, Any]]:
+    """
+    Find the context sentences a draft actually relies on.
+
+    A sentence counts as cited when enough of its content words appear in the
+    draft, or when the draft repeats one of its figures (prices, durations)
+    alongside some of its wording.
+
+    Args:
+        documents: Context documents
+        draft: Draft response
+        min_overlap: Fraction of a sentence's content words that must appear in the draft
+
+    Returns:
+        Cited units with an overlap score
+    """
+
+    draft_words = _content_words(draft)
+    draft_numbers = set(_NUMBER.findall(draft))
+    cited = []
+
+    for unit in _dedupe(split_units(documents)):
+        unit_words = _content_words(unit["text"])
+        if not unit_words:
+            continue
+        shared = unit_words & draft_words
+        overlap = len(shared) / len(unit_words)
+        repeats_figure = overlap >= min_overlap / 2 and bool(set(_NUMBER.findall(unit["text"])) & draft_numbers)
+        if overlap >= min_overlap or repeats_figure:
+            cited.append({**unit, "score": overlap})
+
+    return cited
+
+def _budget_config(config: Dict[str, Any], node: str) -> Optional[Dict[str, Any]]:
+    budget_config = config.get("prompt_budget", {})
+    if not budget_config.get("enabled", False):
+        return None
+    return {"encoding": budget_config.get("encoding", DEFAULT_ENCODING), **budget_config.get(node, {})}
+
+def _context_documents(state: Dict[str, Any], config: Dict[str, Any]) -> List[str]:
+    # context_docs holds document references; the text is only looked up here,
+    # when a prompt is rendered. context is fallback text (e.g. a retrieval error).
+    documents = resolve_documents(state.get("context_docs") or [], config)
+    return documents or [state.get("context", "")]
+
+def build_generator_context(state: Dict[str, Any], config: Dict[str, Any]) -> str:
+    """
+    Assemble the context section of the generator prompt.
+
+    Without a prompt_budget this is the retrieved documents followed by the
+    previous reviewer feedback, exactly as before.
+
+    Args:
+        state: Graph state containing context and reviewer feedback
+        config: Loaded settings
+
+    Returns:
+        Context text for the generator prompt
+    """
+
+    documents = _context_documents(state, config)
+    context = "\n\n".join(documents)
+    reviewer_feedback = state.get("reviewer_feedback", "")
+    budget = _budget_config(config, "generator")
+
+    if budget is None:
+        if reviewer_feedback:
+            context += f"\n\nPrevious Reviewer Feedback: {reviewer_feedback}"
+        return context
+
+    encoding_name = budget["encoding"]
+    if reviewer_feedback and "max_feedback_tokens" in budget:
+        reviewer_feedback = truncate_to_tokens(reviewer_feedback, budget["max_feedback_tokens"], encoding_name)
+
+    query = f"{state.get('subject', '')} {state.get('description', '')} {reviewer_feedback}"
+    assembled = compress_context(documents, query, budget.get("max_context_tokens", 1200), encoding_name)
+
+    if reviewer_feedback:
+        assembled += f"\n\nPrevious Reviewer Feedback: {reviewer_feedback}"
+
+    logger.info(
+        f"Generator context for ticket {state.get('ticket_id')}: "
+        f"{count_tokens(context, encoding_name)} -> {count_tokens(assembled, encoding_name)} tokens"
+    )
+    return assembled
+
+def build_reviewer_context(state: Dict[str, Any], draft_response: str, config: Dict[str, Any]) -> str:
+    """
+    Assemble the context section of the reviewer prompt.
+
+    With cited_spans_only the reviewer only sees the context sentences the
+    draft draws on instead of the full context a second time; if the draft
+    cites nothing, the query-ranked compressed context is used.
+
+    Args:
+        state: Graph state containing context
+        draft_response: Draft under review
+        config: Loaded settings
+
+    Returns:
+        Context text for the reviewer prompt
+    """
+
+    documents = _context_documents(state, config)
+    context = "\n\n".join(documents)
+    budget = _budget_config(config, "reviewer")
+    if budget is None:
+        return context
+
+    encoding_name = budget["encoding"]
+    max_tokens = budget.get("max_context_tokens", 600)
+    assembled = ""
+
+    if budget.get("cited_spans_only", False):
+        cited = cited_spans(documents, draft_response, budget.get("min_overlap", 0.6))
+        if cited:
+            selected = _select_within_budget(cited, [unit["score"] for unit in cited], max_tokens, encoding_name)
+            assembled = _render(selected)
+
+    if not assembled:
+        query = f"{state.get('subject', '')} {state.get('description', '')}"
+        assembled = compress_context(documents, query, max_tokens, encoding_name)
+
+    logger.info(
+        f"Reviewer context for ticket {state.get('ticket_id')}: "
+        f"{count_tokens(context, encoding_name)} -> {count_tokens(assembled, encoding_name)} tokens"
+    )
+    return assembled
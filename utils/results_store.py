@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+Persistent store of processed ticket results.
+
+process_ticket hands each result to a background writer, which inserts
+rows in batched transactions into a WAL-mode SQLite database, so requests
+never wait on disk writes. ticket_id is the primary key of a WITHOUT ROWID
+table, so a lookup by ID is a single B-tree search (a handful of page reads
+even at tens of millions of rows); category, status and timestamp are
+indexed for listings and reports.
+
+Usage:
+    python -m utils.results_store get TICKET_ID
+    python -m utils.results_store list [--category C] [--status S] [--since-hours H] [--limit N]
+    python -m utils.results_store report [--since-hours H]
+"""
+
+import argparse
+import atexit
+import json
+import queue
+import sqlite3
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from utils.logger import setup_logger
+from utils.helpers import load_config
+from utils.metrics import metrics
+
+logger = setup_logger("results_store")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    ticket_id TEXT PRIMARY KEY,
+    subject TEXT NOT NULL,
+    category TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL,
+    final_response TEXT NOT NULL,
+    draft_model TEXT NOT NULL,
+    error TEXT NOT NULL,
+    latency_seconds REAL,
+    created_at REAL NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_results_created ON results (created_at);
+CREATE INDEX IF NOT EXISTS idx_results_category ON results (category, created_at);
+CREATE INDEX IF NOT EXISTS idx_results_status ON results (status, created_at);
+"""
+
+COLUMNS = ["ticket_id", "subject", "category", "status", "attempts", "final_response",
+           "draft_model", "error", "latency_seconds", "created_at"]
+
+def result_status(result: Dict[str, Any]) -> str:
+    """resolved, escalated or error."""
+    if result.get("processing_step") == "error":
+        return "error"
+    return "escalated" if result.get("escalated") else "resolved"
+
+def result_row(result: Dict[str, Any], latency_seconds: Optional[float] = None) -> tuple:
+    """Flatten a process_ticket result into a results row."""
+    error = next((result[key] for key in (
+        "escalation_error", "generation_error", "review_error", "retrieval_error", "classification_error"
+    ) if result.get(key)), "")
+    return (
+        result.get("ticket_id", ""),
+        result.get("subject", ""),
+        result.get("category", "") or "",
+        result_status(result),
+        result.get("attempt_count", 0),
+        # Approved tickets end at the reviewer, so their response is the approved draft
+        result.get("final_response") or (result.get("draft_response", "") if result.get("review_approved") else ""),
+        result.get("draft_model", "") or "",
+        error,
+        latency_seconds,
+        time.time(),
+    )
+
+class ResultsStore:
+    """
+    SQLite results table with a batching background writer.
+
+    Args:
+        path: Database file
+        batch_size: Maximum rows per write transaction
+        flush_interval: Seconds to wait for more rows before writing a partial batch
+    """
+
+    def __init__(self, path: str, batch_size: int = 500, flush_interval: float = 1.0):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: "queue.Queue[tuple]" = queue.Queue()
+        self._writer = None
+        self._start_lock = threading.Lock()
+        self._read_lock = threading.Lock()
+
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._reader = self._connect()
+        self._reader.executescript(SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def record(self, result: Dict[str, Any], latency_seconds: Optional[float] = None):
+        """Queue a result for the background writer; returns immediately."""
+        with self._start_lock:
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._write_loop, name="results-writer", daemon=True)
+                self._writer.start()
+                atexit.register(self.flush)
+        self._queue.put(result_row(result, latency_seconds))
+        metrics.set_gauge("results_store_queue_depth", self._queue.qsize())
+
+    def flush(self, timeout: float = 30.0) -> bool:
+        """Wait until every queued result is written; False on timeout."""
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks:
+            if time.monotonic() >= deadline:
+                logger.error(f"{self._queue.unfinished_tasks} results still unwritten after flush timeout")
+                return False
+            time.sleep(0.01)
+        return True
+
+    def _write_loop(self):
+        conn = self._connect()
+        placeholders = ", ".join("?" for _ in COLUMNS)
+        statement = f"INSERT OR REPLACE INTO results ({', '.join(COLUMNS)}) VALUES ({placeholders})"
+
+        while True:
+            batch = [self._queue.get()]
+            batch_deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                remaining = batch_deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            start = time.perf_counter()
+            try:
+                with conn:
+                    conn.executemany(statement, batch)
+                metrics.increment("results_store_rows_written_total", len(batch))
+                metrics.observe("results_store_batch_seconds", time.perf_counter() - start)
+            except Exception as e:
+                metrics.increment("results_store_write_errors_total")
+                logger.error(f"Failed to write {len(batch)} results: {str(e)}")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+                metrics.set_gauge("results_store_queue_depth", self._queue.qsize())
+
+    def _read(self, sql: str, params: tuple = ()) -> List[Dict[str, Any]]:
+        with self._read_lock:
+            return [dict(row) for row in self._reader.execute(sql, params).fetchall()]
+
+    def get(self, ticket_id: str) -> Optional[Dict[str, Any]]:
+        """The stored result for a ticket, or None."""
+        rows = self._read("SELECT * FROM results WHERE ticket_id = ?", (ticket_id,))
+        return rows[0] if rows else None
+
+    def query(self, category: str = None, status: str = None, since: float = None,
+              until: float = None, limit: int = 100) -> List[Dict[str, Any]]:
+        """Most recent results matching every given filter."""
+        clauses, params = [], []
+        for clause, value in (("category = ?", category), ("status = ?", status),
+                              ("created_at >= ?", since), ("created_at < ?", until)):
+            if value is not None:
+                clauses.append(clause)
+                params.append(value)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        return self._read(f"SELECT * FROM results {where} ORDER BY created_at DESC LIMIT ?", (*params, limit))
+
+    def report(self, since: float = None) -> List[Dict[str, Any]]:
+        """Ticket counts, average attempts and latency per category and status."""
+        where, params = ("WHERE created_at >= ?", (since,)) if since is not None else ("", ())
+        return self._read(
+            f"""
+            SELECT category, status, COUNT(*) AS tickets,
+                   AVG(attempts) AS avg_attempts, AVG(latency_seconds) AS avg_latency_seconds
+            FROM results {where}
+            GROUP BY category, status
+            ORDER BY category, status
+            """,
+            params
+        )
+
+_stores: Dict[str, ResultsStore] = {}
+_stores_lock = threading.Lock()
+
+def get_results_store(config: Dict[str, Any]) -> Optional[ResultsStore]:
+    """The shared store for results_store.path, or None when disabled."""
+    store_config = config.get("results_store", {})
+    if not store_config.get("enabled", False):
+        return None
+    path = store_config.get("path", "data/results.sqlite3")
+    with _stores_lock:
+        if path not in _stores:
+            _stores[path] = ResultsStore(
+                path,
+                batch_size=store_config.get("batch_size", 500),
+                flush_interval=store_config.get("flush_interval_seconds", 1.0)
+            )
+        return _stores[path]
+
+def record_result(result: Dict[str, Any], latency_seconds: Optional[float] = None):
+    """Queue a processed ticket for the results store if it is enabled."""
+    try:
+        store = get_results_store(load_config())
+        if store is not None:
+            store.record(result, latency_seconds)
+    except Exception as e:
+        logger.error(f"Failed to queue result for ticket {result.get('ticket_id')}: {str(e)}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Query processed ticket results")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    get_parser = subparsers.add_parser("get", help="Show one ticket's result")
+    get_parser.add_argument("ticket_id")
+
+    list_parser = subparsers.add_parser("list", help="List recent results")
+    list_parser.add_argument("--category")
+    list_parser.add_argument("--status", choices=["resolved", "escalated", "error"])
+    list_parser.add_argument("--since-hours", type=float)
+    list_parser.add_argument("--limit", type=int, default=20)
+
+    report_parser = subparsers.add_parser("report", help="Aggregate results per category and status")
+    report_parser.add_argument("--since-hours", type=float)
+
+    args = parser.parse_args()
+    config = load_config()
+    store = ResultsStore(config.get("results_store", {}).get("path", "data/results.sqlite3"))
+    since = time.time() - args.since_hours * 3600 if getattr(args, "since_hours", None) else None
+
+    if args.command == "get":
+        row = store.get(args.ticket_id)
+        if row is None:
+            print(f"No result stored for {args.ticket_id}")
+            sys.exit(1)
+        print(json.dumps(row, indent=2))
+    elif args.command == "list":
+        for row in store.query(args.category, args.status, since=since, limit=args.limit):
+            print(f"{row['ticket_id']}  {row['category']:<10} {row['status']:<9} attempts={row['attempts']}  {row['subject'][:50]}")
+    else:
+        print(f"{'category':<12} {'status':<10} {'tickets':>8} {'attempts':>9} {'latency_s':>10}")
+        for row in store.report(since):
+            latency = f"{row['avg_latency_seconds']:.2f}" if row["avg_latency_seconds"] is not None else "-"
+            print(f"{row['category']:<12} {row['status']:<10} {row['tickets']:>8} {row['avg_attempts']:>9.2f} {latency:>10}")
+
+if __name__ == "__main__":
+    main()
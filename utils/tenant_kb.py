@@ -0,0 +1,223 @@
+import re
+import sys
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from utils.logger import setup_logger
+from utils.helpers import PLACEHOLDER_DOCUMENT, _read_named_documents
+from utils.kb_snapshot import KnowledgeBaseSnapshot
+from utils.metrics import metrics
+
+logger = setup_logger("tenant_kb")
+
+SNAPSHOT_NAME = "kb_snapshot.bin"
+
+# Floor on what a loaded knowledge base is charged against the memory budget,
+# so tenants with few or no documents still count towards eviction
+MIN_ENTRY_BYTES = 16 * 1024
+
+# Evicted tenants remembered to label their next load as a reload
+MAX_EVICTED_TRACKED = 10000
+
+# Tenant IDs become directory names, so keep them to one safe path segment
+_TENANT_ID = re.compile(r"^[A-Za-z0-9][A-Za-z0-9_.-]{0,127}$")
+
+def validate_tenant_id(tenant_id: str) -> str:
+    """
+    Check a tenant ID is safe to use as a directory name.
+
+    Raises:
+        ValueError: For IDs with path separators, leading dots or other characters
+    """
+    if not _TENANT_ID.match(tenant_id) or ".." in tenant_id:
+        raise ValueError(f"Invalid tenant_id '{tenant_id}'")
+    return tenant_id
+
+class UnknownTenant(LookupError):
+    """Raised for a tenant_id with no knowledge base directory."""
+
+class TenantKnowledgeBase:
+    """
+    One tenant's knowledge base.
+
+    Uses {path}/kb_snapshot.bin (built with python -m utils.kb_snapshot
+    build --kb-dir {path} --output {path}/kb_snapshot.bin) when present and
+    not stale, otherwise reads every {category}_docs directory under path.
+
+    Args:
+        tenant_id: Tenant the knowledge base belongs to
+        path: The tenant's knowledge base directory
+    """
+
+    def __init__(self, tenant_id: str, path: Path):
+        self.tenant_id = tenant_id
+        self.path = Path(path)
+        self.snapshot: Optional[KnowledgeBaseSnapshot] = None
+        self._documents: Dict[str, Tuple[List[str], List[str]]] = {}
+
+        snapshot_path = self.path / SNAPSHOT_NAME
+        if snapshot_path.exists():
+            snapshot = KnowledgeBaseSnapshot(snapshot_path)
+            if not snapshot.is_stale(str(self.path)):
+                self.snapshot = snapshot
+                # Charged at its full size: pages that scoring touches count towards RSS
+                self.size_bytes = max(MIN_ENTRY_BYTES, snapshot_path.stat().st_size)
+                return
+            logger.warning(f"Knowledge base snapshot for tenant {tenant_id} is stale; reading its text files")
+
+        if not self.path.is_dir():
+            logger.warning(f"No knowledge base directory for tenant {tenant_id} at {self.path}")
+        for category_dir in sorted(self.path.glob("*_docs")):
+            if category_dir.is_dir():
+                self._documents[category_dir.name[:-len("_docs")].lower()] = _read_named_documents(category_dir)
+        self.size_bytes = max(MIN_ENTRY_BYTES, sum(sys.getsizeof(doc) for _, docs in self._documents.values() for doc in docs))
+
+    def named_documents(self, category: str) -> Tuple[List[str], List[str]]:
+        """A category's document names and texts, with the same placeholders load_named_knowledge_base returns."""
+        if self.snapshot is not None and self.snapshot.covers(category):
+            return self.snapshot.document_names(category), self.snapshot.documents(category)
+        if category.lower() not in self._documents:
+            return [PLACEHOLDER_DOCUMENT], [f"No specific knowledge base found for {category} category."]
+        names, documents = self._documents[category.lower()]
+        if not documents:
+            return [PLACEHOLDER_DOCUMENT], [f"No documents found in {category} knowledge base."]
+        return names, documents
+
+    def documents(self, category: str) -> List[str]:
+        """A category's documents, with the same placeholders load_knowledge_base returns."""
+        return self.named_documents(category)[1]
+
+class TenantKnowledgeBases:
+    """
+    Lazily loaded per-tenant knowledge bases, kept in an LRU under a memory budget.
+
+    A tenant's knowledge base is loaded on its first ticket. Once the loaded
+    knowledge bases together exceed the budget, the least recently used are
+    evicted (never the one just loaded) and reloaded on their tenant's next
+    ticket. Each is charged at least MIN_ENTRY_BYTES. Concurrent first tickets
+    of one tenant share a single load. Tenants without a directory under root
+    are refused rather than cached.
+
+    Args:
+        root: Directory holding one knowledge base directory per tenant
+        memory_budget_bytes: Size of loaded knowledge bases above which the LRU evicts
+    """
+
+    def __init__(self, root: str = "data/tenants", memory_budget_bytes: int = 256 * 1024 * 1024):
+        self.root = Path(root)
+        self.memory_budget_bytes = memory_budget_bytes
+        self._lock = threading.Lock()
+        self._loaded: "OrderedDict[str, TenantKnowledgeBase]" = OrderedDict()
+        self._loading: Dict[str, threading.Lock] = {}
+        self._evicted: "OrderedDict[str, None]" = OrderedDict()
+        self.loaded_bytes = 0
+
+    def _hit(self, tenant_id: str) -> Optional[TenantKnowledgeBase]:
+        knowledge_base = self._loaded.get(tenant_id)
+        if knowledge_base is not None:
+            self._loaded.move_to_end(tenant_id)
+        return knowledge_base
+
+    def knows(self, tenant_id: str) -> bool:
+        """Whether the tenant has a knowledge base directory."""
+        return (self.root / validate_tenant_id(tenant_id)).is_dir()
+
+    def get(self, tenant_id: str) -> TenantKnowledgeBase:
+        """
+        The tenant's knowledge base, loading it if it isn't in memory.
+
+        Raises:
+            ValueError: If tenant_id isn't a safe directory name
+            UnknownTenant: If the tenant has no knowledge base directory
+        """
+        validate_tenant_id(tenant_id)
+
+        with self._lock:
+            knowledge_base = self._hit(tenant_id)
+            if knowledge_base is not None:
+                metrics.increment("tenant_kb_hits_total")
+                return knowledge_base
+            load_lock = self._loading.setdefault(tenant_id, threading.Lock())
+
+        with load_lock:
+            with self._lock:
+                knowledge_base = self._hit(tenant_id)
+            if knowledge_base is not None:
+                # Loaded by a concurrent ticket of the same tenant
+                metrics.increment("tenant_kb_hits_total")
+                return knowledge_base
+
+            if not self.knows(tenant_id):
+                with self._lock:
+                    self._loading.pop(tenant_id, None)
+                metrics.increment("tenant_kb_unknown_total")
+                raise UnknownTenant(f"No knowledge base for tenant '{tenant_id}'")
+
+            start = time.perf_counter()
+            knowledge_base = TenantKnowledgeBase(tenant_id, self.root / tenant_id)
+            elapsed = time.perf_counter() - start
+
+            with self._lock:
+                reload = tenant_id in self._evicted
+                self._evicted.pop(tenant_id, None)
+                self._loaded[tenant_id] = knowledge_base
+                self.loaded_bytes += knowledge_base.size_bytes
+                self._loading.pop(tenant_id, None)
+                self._evict()
+                loaded_tenants, loaded_bytes = len(self._loaded), self.loaded_bytes
+
+        metrics.increment("tenant_kb_loads_total", reload=str(reload).lower())
+        metrics.observe("tenant_kb_load_seconds", elapsed)
+        metrics.set_gauge("tenant_kb_loaded_tenants", loaded_tenants)
+        metrics.set_gauge("tenant_kb_loaded_bytes", loaded_bytes)
+        logger.info(f"{'Reloaded' if reload else 'Loaded'} knowledge base for tenant {tenant_id} "
+                    f"({knowledge_base.size_bytes} bytes) in {elapsed * 1000:.1f}ms")
+        return knowledge_base
+
+    def _evict(self):
+        # Caller holds self._lock
+        while self.loaded_bytes > self.memory_budget_bytes and len(self._loaded) > 1:
+            tenant_id, knowledge_base = self._loaded.popitem(last=False)
+            self.loaded_bytes -= knowledge_base.size_bytes
+            self._remember_evicted(tenant_id)
+            metrics.increment("tenant_kb_evictions_total")
+            logger.info(f"Evicted knowledge base for tenant {tenant_id} ({knowledge_base.size_bytes} bytes)")
+
+    def evict(self, tenant_id: str) -> bool:
+        """Drop a tenant's knowledge base, e.g. after its documents changed; returns whether it was loaded."""
+        with self._lock:
+            knowledge_base = self._loaded.pop(tenant_id, None)
+            if knowledge_base is None:
+                return False
+            self.loaded_bytes -= knowledge_base.size_bytes
+            self._remember_evicted(tenant_id)
+            return True
+
+    def _remember_evicted(self, tenant_id: str):
+        # Caller holds self._lock
+        self._evicted[tenant_id] = None
+        self._evicted.move_to_end(tenant_id)
+        while len(self._evicted) > MAX_EVICTED_TRACKED:
+            self._evicted.popitem(last=False)
+
+    def loaded(self) -> List[str]:
+        """Tenants currently in memory, least recently used first."""
+        with self._lock:
+            return list(self._loaded)
+
+_tenant_kbs: Optional[TenantKnowledgeBases] = None
+_tenant_kbs_lock = threading.Lock()
+
+def get_tenant_knowledge_bases(config: Dict[str, Any]) -> TenantKnowledgeBases:
+    """The process-wide tenant knowledge base LRU."""
+    global _tenant_kbs
+    with _tenant_kbs_lock:
+        if _tenant_kbs is None:
+            tenants_config = config.get("tenants", {})
+            _tenant_kbs = TenantKnowledgeBases(
+                root=tenants_config.get("root", "data/tenants"),
+                memory_budget_bytes=int(tenants_config.get("memory_budget_mb", 256) * 1024 * 1024)
+            )
+        return _tenant_kbs